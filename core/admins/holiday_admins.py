@@ -2,6 +2,9 @@ from django.contrib import admin
 from core.models.holiday_models import (
     PublicHoliday,
     PublicHolidayCalendar,
+    CountryHoliday,
+    CountryHolidaySync,
+    HolidayOverride,
 )
 
 # Custom Admin Configuration for PublicHolidayCalendar Model
@@ -23,4 +26,30 @@ class PublicHolidayAdmin(admin.ModelAdmin):
     search_fields = ("name", "calendar__user__email")
     ordering = ("-date",)
     date_hierarchy = "date"
-    autocomplete_fields = ("calendar",)
\ No newline at end of file
+    autocomplete_fields = ("calendar",)
+
+
+@admin.register(CountryHoliday)
+class CountryHolidayAdmin(admin.ModelAdmin):
+    list_display = ("name", "local_name", "date", "country_code", "year")
+    list_filter = ("country_code", "year")
+    search_fields = ("name", "local_name", "country_code")
+    ordering = ("-date",)
+    date_hierarchy = "date"
+
+
+@admin.register(CountryHolidaySync)
+class CountryHolidaySyncAdmin(admin.ModelAdmin):
+    list_display = ("country_code", "year", "holiday_count", "synced_at")
+    list_filter = ("year",)
+    search_fields = ("country_code",)
+    ordering = ("country_code", "year")
+
+
+@admin.register(HolidayOverride)
+class HolidayOverrideAdmin(admin.ModelAdmin):
+    list_display = ("calendar", "date", "name", "is_removed")
+    list_filter = ("is_removed",)
+    search_fields = ("name", "calendar__user__email")
+    ordering = ("-date",)
+    autocomplete_fields = ("calendar",)
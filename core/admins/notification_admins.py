@@ -2,8 +2,9 @@ from django.contrib import admin
 from django.utils.text import Truncator
 from django.utils import timezone
 from datetime import timedelta
+from collections import Counter
 
-from core.models.notification_models import Notification
+from core.models.notification_models import Notification, NotificationCounter
 
 
 @admin.register(Notification)
@@ -61,7 +62,10 @@ class NotificationAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected notifications as unread")
     def mark_as_unread(self, request, queryset):
+        unread = queryset.filter(is_read=True, channel="system")
+        deltas = Counter(unread.values_list("user_id", flat=True))
         updated = queryset.filter(is_read=True).update(is_read=False, read_at=None)
+        NotificationCounter.add(deltas)
         self.message_user(request, f"Marked {updated} notification(s) as unread.")
 
     @admin.action(description="Mark selected notifications as sent (set sent_at)")
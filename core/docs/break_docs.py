@@ -81,18 +81,36 @@ break_plan_action = swagger_auto_schema(
 
 
 recommend_breaks_schema = swagger_auto_schema(
-    request_body=BreakRecommendationSerializer,
+    manual_parameters=[
+        openapi.Parameter(
+            'limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+            description='Number of suggestions to generate (1-10, default 3)',
+        ),
+    ],
     responses={
-        200: openapi.Response(
-            description="Break recommendation generated successfully."
+        201: openapi.Response(
+            description="Ranked break suggestions generated successfully.",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'data': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT, description='BreakSuggestion'),
+                    ),
+                },
+            ),
         ),
-        400: "Invalid input",
+        400: "No leave balance set up, or no leave days remaining",
         500: "Internal server error"
     },
-    operation_summary="Generate personalized break recommendations",
+    operation_summary="Generate personalized break suggestions",
     operation_description=(
-        "This endpoint uses ML models to predict ideal break duration and "
-        "seasonal preferences based on user input."
+        "Loads the user's leave balance, working pattern, blackout and special "
+        "dates, public holidays, metrics and latest mood once, and returns up "
+        "to `limit` non-overlapping suggestions, best first. Candidates come "
+        "from the ML model, holiday bridges, the leave optimizer and wellness "
+        "heuristics. Each one is saved as a BreakSuggestion."
     ),
-    tags=["Break Recommendations"]
-)
\ No newline at end of file
+    tags=["Break Suggestions"]
+)
@@ -1,5 +1,5 @@
 from drf_yasg.utils import swagger_auto_schema
-from core.serializers.holiday_serializers import PublicHolidaySerializer
+from core.serializers.holiday_serializers import PublicHolidaySerializer, HolidaySerializer
 
 
 
@@ -44,5 +44,5 @@ upcoming_holidays_get = swagger_auto_schema(
         "Retrieve the next 10 upcoming holidays from the logged-in user's holiday calendar. "
         "Results are ordered by date in ascending order."
     ),
-    responses={200: PublicHolidaySerializer(many=True)},
+    responses={200: HolidaySerializer(many=True)},
 )
\ No newline at end of file
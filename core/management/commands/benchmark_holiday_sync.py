@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.services.holiday_service import HolidayService
+from core.utils.holiday_client import HolidayApiClient
+from core.utils.holiday_providers import LibraryHolidayProvider, NagerHolidayProvider
+
+
+class Command(BaseCommand):
+    help = 'Benchmark holiday sync wall-time per provider (local holidays library vs date.nager.at)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', nargs='+', default=['US', 'GB', 'DE', 'FR', 'NG', 'KE', 'JP', 'BR'])
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--skip-network', action='store_true',
+                            help='Only time the local provider')
+
+    def handle(self, *args, **options):
+        countries = options['countries']
+        years = HolidayService.years_to_sync()[:1]
+        years = list(range(years[0], years[0] + options['years']))
+
+        # Nager with an empty disk cache, so every fetch is a real round trip
+        cache_dir = tempfile.mkdtemp()
+        candidates = [('library', LibraryHolidayProvider())]
+        if not options['skip_network']:
+            candidates.append(('nager', NagerHolidayProvider(HolidayApiClient(cache_dir=cache_dir))))
+
+        try:
+            timings = {}
+            for name, provider in candidates:
+                # Each provider syncs into an empty store; rolled back afterwards
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    results = HolidayService.sync_countries(countries, years, providers=[provider])
+                    stored = sum(r['stored'] for r in results.values())
+                    failed = sum(len(r['failed_years']) for r in results.values())
+                    timings[name] = time.perf_counter() - start
+                    transaction.set_rollback(True)
+                HolidayService.invalidate()
+
+                self.stdout.write(
+                    f'{name:8} {timings[name] * 1000:9.1f} ms  '
+                    f'({len(countries)} countries x {len(years)} years, {stored} holidays, {failed} failed)'
+                )
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        if 'nager' in timings:
+            self.stdout.write(self.style.SUCCESS(
+                f"Speedup: {timings['nager'] / timings['library']:.1f}x"
+            ))
@@ -0,0 +1,92 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from core.signals import update_location_on_login
+from core.utils.contry_code_resolution import update_user_location
+from core.utils.country_locator import get_country_locator
+
+User = get_user_model()
+
+# (X-Timezone, X-Coordinates) sent by the app; some clients only send coordinates
+LOCATIONS = [
+    ('Europe/Berlin', '52.52,13.40'),
+    ('Asia/Tokyo', '35.68,139.69'),
+    (None, '6.52,3.38'),
+    ('America/New_York', '40.71,-74.01'),
+    (None, '-33.87,151.21'),
+    ('Europe/Madrid', '40.42,-3.70'),
+]
+
+
+def synchronous_update(sender, request, user, **kwargs):
+    """The login receiver as it was: resolve and save on the request path."""
+    timezone = request.headers.get('X-Timezone')
+    coords = request.headers.get('X-Coordinates')
+    update_user_location(user, timezone=timezone, coords=coords)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login latency with location resolved on the request path vs in a background task'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--logins', type=int, default=5,
+                            help='Logins per user, all from the same place')
+
+    def handle(self, *args, **options):
+        users, logins = options['users'], options['logins']
+        factory = RequestFactory()
+        # Both modes start with the locator loaded
+        get_country_locator()
+
+        receivers = [('synchronous', synchronous_update), ('deferred', update_location_on_login)]
+        latencies = {}
+        for name, receiver in receivers:
+            user_logged_in.disconnect(update_location_on_login)
+            user_logged_in.connect(receiver)
+            cache.clear()
+            try:
+                # Everything is rolled back at the end, so the on-commit task
+                # publish isn't part of the deferred timings
+                with transaction.atomic():
+                    ids = [
+                        User.objects.create_user(email=f'login-benchmark-{i}@example.com').pk
+                        for i in range(users)
+                    ]
+                    timings = []
+                    for _ in range(logins):
+                        for i, user_id in enumerate(ids):
+                            timezone, coords = LOCATIONS[i % len(LOCATIONS)]
+                            headers = {'HTTP_X_COORDINATES': coords}
+                            if timezone:
+                                headers['HTTP_X_TIMEZONE'] = timezone
+                            request = factory.post('/api/auth/login/', **headers)
+
+                            start = time.perf_counter()
+                            user = User.objects.get(pk=user_id)
+                            user_logged_in.send(sender=User, request=request, user=user)
+                            timings.append(time.perf_counter() - start)
+                    transaction.set_rollback(True)
+            finally:
+                user_logged_in.disconnect(receiver)
+                user_logged_in.connect(update_location_on_login)
+            cache.clear()
+
+            latencies[name] = timings
+            cuts = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f'{name:12} p50 {cuts[49] * 1000:7.2f} ms  p99 {cuts[98] * 1000:7.2f} ms  '
+                f'({users} users x {logins} logins)'
+            )
+
+        p99 = {name: statistics.quantiles(t, n=100)[98] for name, t in latencies.items()}
+        self.stdout.write(self.style.SUCCESS(
+            f"p99 speedup: {p99['synchronous'] / p99['deferred']:.1f}x"
+        ))
@@ -0,0 +1,100 @@
+import smtplib
+import socketserver
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.email_utils import SMTPConnectionPool
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP stand-in: accepts everything, stores nothing."""
+
+    def handle(self):
+        self.server.connections += 1
+        # Stands in for the TLS handshake + AUTH a real relay costs
+        time.sleep(self.server.connect_latency)
+        self.wfile.write(b"220 localhost stand-in\r\n")
+
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.server.received += 1
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+
+            command = line[:4].upper()
+            if command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_latency):
+        super().__init__(("127.0.0.1", 0), _SinkHandler)
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.received = 0
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pooled SMTP sending against a connection-per-message baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500)
+        parser.add_argument('--max-messages', type=int, default=100,
+                            help='Per-connection message limit for the pool')
+        parser.add_argument('--connect-latency-ms', type=float, default=20.0,
+                            help='Simulated handshake/login cost per connection')
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        server = _SinkServer(options['connect_latency_ms'] / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+        payload = "Subject: benchmark\r\n\r\nHello from the benchmark.\r\n"
+        messages = [("bench@example.com", [f"user{i}@example.com"], payload) for i in range(count)]
+
+        def connect():
+            return smtplib.SMTP(host, port, timeout=10)
+
+        try:
+            # Baseline: what send_notification_email used to do per email
+            start = time.perf_counter()
+            for from_addr, to_addrs, body in messages:
+                conn = connect()
+                conn.sendmail(from_addr, to_addrs, body)
+                conn.quit()
+            baseline = time.perf_counter() - start
+            baseline_connections = server.connections
+
+            server.connections = 0
+            pool = SMTPConnectionPool(connect=connect, max_messages=options['max_messages'])
+            start = time.perf_counter()
+            results = pool.send_many(messages)
+            pooled = time.perf_counter() - start
+            pool.close_all()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(
+            f'per-message: {count / baseline:8.1f} msg/s  ({baseline_connections} connections)'
+        )
+        self.stdout.write(
+            f'pooled:      {count / pooled:8.1f} msg/s  ({server.connections} connections, '
+            f'{sum(results)}/{count} sent)'
+        )
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {baseline / pooled:.1f}x'))
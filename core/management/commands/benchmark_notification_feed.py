@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models.notification_models import Notification
+from core.serializers.notification_serializers import NotificationSerializer
+from core.views.notification_views import NotificationListAPIView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the paginated notification feed against the full unpaginated list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        count = options['notifications']
+        repeat = options['repeat']
+
+        # Everything is rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email='feed-benchmark@example.com', password='benchmark'
+            )
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user=user,
+                        event='weekly_digest',
+                        title='Your Weekly Break Summary 📊',
+                        message='You took 2 breaks, earned 40 points.',
+                        metadata={'digest': {'breaks_taken': 2, 'points': 40, 'mood_trend': 'steady'}},
+                        status='sent',
+                    )
+                    for _ in range(count)
+                ],
+                batch_size=1000,
+            )
+
+            def old_list():
+                qs = Notification.objects.filter(user=user)
+                return JSONRenderer().render(NotificationSerializer(qs, many=True).data)
+
+            factory = APIRequestFactory()
+            view = NotificationListAPIView.as_view()
+
+            def page(cursor=None):
+                request = factory.get('/api/notifications/', {'cursor': cursor} if cursor else {})
+                force_authenticate(request, user=user)
+                response = view(request)
+                return JSONRenderer().render(response.data), response.data['data']['next_cursor']
+
+            def timed(fn):
+                best, result = None, None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    result = fn()
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                return best, result
+
+            old_time, old_body = timed(old_list)
+            first_time, (first_body, cursor) = timed(page)
+
+            # A deep page: walk halfway down, then time one more page
+            for _ in range(count // 2 // 20):
+                _, cursor = page(cursor)
+            deep_time, _ = timed(lambda: page(cursor))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'full list:  {len(old_body) / 1024:10.1f} KiB  {old_time * 1000:8.1f} ms')
+        self.stdout.write(f'first page: {len(first_body) / 1024:10.1f} KiB  {first_time * 1000:8.1f} ms')
+        self.stdout.write(f'deep page:  {len(first_body) / 1024:10.1f} KiB  {deep_time * 1000:8.1f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'First page is {len(old_body) / len(first_body):.0f}x smaller, '
+            f'{old_time / first_time:.0f}x faster'
+        ))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.firebase_utils import FakePushTransport, send_firebase_push_batch
+
+
+class Command(BaseCommand):
+    help = 'Benchmark batched FCM sends against one request per token (fake transport)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=2000)
+        parser.add_argument('--latency-ms', type=float, default=5.0,
+                            help='Simulated round trip per FCM request')
+
+    def handle(self, *args, **options):
+        count = options['tokens']
+        latency = options['latency_ms'] / 1000
+
+        # Digest-style traffic: one payload per notification, a few devices per user
+        messages = [
+            {
+                "token": f"token-{i}",
+                "title": "Your Weekly Break Summary",
+                "body": "Here's how you did with breaks this week!",
+                "data": {"notification_id": str(i // 3)},
+            }
+            for i in range(count)
+        ]
+
+        transport = FakePushTransport(latency=latency)
+        start = time.perf_counter()
+        for m in messages:
+            transport.send_each([m])
+        baseline = time.perf_counter() - start
+        baseline_calls = len(transport.calls)
+
+        transport = FakePushTransport(latency=latency)
+        start = time.perf_counter()
+        results = send_firebase_push_batch(messages, transport=transport)
+        batched = time.perf_counter() - start
+
+        self.stdout.write(
+            f'per-token: {count / baseline:10.1f} pushes/s  ({baseline_calls} requests)'
+        )
+        self.stdout.write(
+            f'batched:   {count / batched:10.1f} pushes/s  ({len(transport.calls)} requests, '
+            f'{sum(results)}/{count} delivered)'
+        )
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {baseline / batched:.1f}x'))
@@ -0,0 +1,75 @@
+# core/ml_engine/decay_estimator.py
+
+import numpy as np
+
+
+# -------------------------------------------------
+# PURE ESTIMATOR (NO DJANGO)
+# -------------------------------------------------
+class DecayedEstimator:
+    """
+    Exponentially time-decayed sums.
+
+    Each observation contributes ``value * exp(-age / time_constant)``.
+    The state is a plain dict of sums plus the time they were last
+    advanced, so it can live in a JSON column and be updated in O(1).
+    ``backfill`` computes the same sums from history with NumPy.
+
+    Observations dated after the state's time are not counted yet: they
+    wait in a ``pending`` dict (``defer``) and are added by ``release``
+    once the state is advanced past them, so streaming and backfilled
+    sums agree whenever they are compared.
+    """
+
+    def __init__(self, time_constant_days: float):
+        self.time_constant = time_constant_days * 86400.0
+
+    def weight(self, age_seconds):
+        """Decay factor for an age (scalar or array)."""
+        return np.exp(-np.asarray(age_seconds, dtype=float) / self.time_constant)
+
+    def advance(self, sums: dict, elapsed_seconds: float) -> dict:
+        """Decay every sum forward by ``elapsed_seconds``."""
+        factor = float(self.weight(elapsed_seconds))
+        return {key: value * factor for key, value in sums.items()}
+
+    def observe(self, sums: dict, key: str, value: float, age_seconds: float = 0.0) -> dict:
+        """Add one observation that happened ``age_seconds`` ago."""
+        if age_seconds < 0:
+            raise ValueError("Observation is in the future; defer it instead")
+        sums[key] = sums.get(key, 0.0) + value * float(self.weight(age_seconds))
+        return sums
+
+    def defer(self, pending: dict, key: str, value: float, event_ts: float) -> dict:
+        """Hold an observation at epoch ``event_ts`` until the state reaches it."""
+        slot = f"{key}@{event_ts!r}"
+        total = pending.get(slot, 0.0) + value
+        if abs(total) < 1e-12:
+            # Reverted before it happened
+            pending.pop(slot, None)
+        else:
+            pending[slot] = total
+        return pending
+
+    def release(self, sums: dict, pending: dict, now_ts: float) -> dict:
+        """Move deferred observations at or before ``now_ts`` into ``sums``."""
+        for slot in list(pending):
+            key, event_ts = slot.rsplit("@", 1)
+            event_ts = float(event_ts)
+            if event_ts <= now_ts:
+                self.observe(sums, key, pending.pop(slot), age_seconds=now_ts - event_ts)
+        return sums
+
+    def backfill(self, now_ts: float, timestamps, values) -> float:
+        """
+        Decayed sum of ``values`` observed at epoch ``timestamps``,
+        as seen at ``now_ts``. Later timestamps are left out; ``defer``
+        them.
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.broadcast_to(np.asarray(values, dtype=float), timestamps.shape)
+        past = timestamps <= now_ts
+        if not past.any():
+            return 0.0
+
+        return float(np.dot(values[past], self.weight(now_ts - timestamps[past])))
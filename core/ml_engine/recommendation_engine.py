@@ -0,0 +1,406 @@
+# core/ml_engine/recommendation_engine.py
+
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+
+import numpy as np
+
+from .breaks_engine import generate_break_recommendation
+
+
+SEASON_MONTHS = {
+    "winter": (12, 1, 2),
+    "spring": (3, 4, 5),
+    "summer": (6, 7, 8),
+    "fall": (9, 10, 11),
+}
+
+# Leave days per break, by preferred break style
+BREAK_LEAVE_RANGE = {
+    "short": (1, 2),
+    "long": (4, 10),
+    "mixed": (1, 5),
+}
+BREAK_STYLES = {
+    "short_frequent": "short",
+    "long_weekends": "short",
+    "long_infrequent": "long",
+    "extended_breaks": "long",
+}
+
+NEGATIVE_MOODS = {"sad", "angry", "anxious"}
+
+# Mon-Fri, anchored on a Monday
+STANDARD_WEEK = (True, True, True, True, True, False, False)
+STANDARD_WEEK_ANCHOR = date(2024, 1, 1)
+
+# Never suggest a break starting sooner than this
+MIN_LEAD_DAYS = 3
+
+SOURCE_WEIGHTS = {
+    "ml": 30,
+    "holiday": 25,
+    "special_date": 25,
+    "optimizer": 20,
+    "wellness": 20,
+}
+
+# Score taken off for each already-picked candidate from the same generator
+REPEAT_SOURCE_PENALTY = 15
+
+
+# -------------------------------------------------
+# CONTEXT + CANDIDATES (NO DJANGO)
+# -------------------------------------------------
+@dataclass(frozen=True)
+class UserContext:
+    """
+    Everything the generators need about one user, loaded once by the
+    service layer. ``work_cycle`` is a repeating on/off pattern starting
+    at ``cycle_anchor`` (a Mon-Fri week by default).
+    """
+    today: date
+    leave_balance: int | None
+    metrics: dict
+    break_type: str = "mixed"
+    work_cycle: tuple = STANDARD_WEEK
+    cycle_anchor: date = STANDARD_WEEK_ANCHOR
+    blackouts: tuple = ()
+    special_dates: tuple = ()
+    holidays: tuple = ()
+    recent_mood: str | None = None
+    horizon_days: int = 180
+
+
+@dataclass
+class Candidate:
+    source: str
+    start: date
+    end: date
+    leave_days: int
+    title: str
+    description: str
+    reason: str
+    score: float = 0.0
+    based_on_mood: bool = False
+    based_on_workload: bool = False
+    based_on_preferences: bool = False
+    season: str | None = None
+
+    @property
+    def rest_days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def overlaps(self, other) -> bool:
+        return self.start <= other.end and other.start <= self.end
+
+
+# -------------------------------------------------
+# SHARED DAY MASK
+# -------------------------------------------------
+class DayMask:
+    """
+    Per-day boolean arrays over the planning horizon, built once and shared
+    by every generator. Prefix sums make any window's leave cost, blackout
+    overlap and holiday count O(1), and ``windows`` evaluates every start
+    position for a given length in one vectorized step.
+    """
+
+    def __init__(self, ctx: UserContext):
+        n = ctx.horizon_days
+        self.start = ctx.today
+        self.size = n
+
+        offsets = (ctx.today - ctx.cycle_anchor).days + np.arange(n)
+        cycle = np.asarray(ctx.work_cycle, dtype=bool)
+        self.workday = cycle[offsets % len(cycle)]
+
+        self.holiday = self._flags(d for d, _ in ctx.holidays)
+
+        self.blackout = np.zeros(n, dtype=bool)
+        for start, end in ctx.blackouts:
+            i, j = max(self.index(start), 0), min(self.index(end), n - 1)
+            if i <= j:
+                self.blackout[i:j + 1] = True
+
+        # Days that actually consume leave
+        self.leave = self.workday & ~self.holiday
+
+        self.months = np.array(
+            [(ctx.today + timedelta(days=i)).month for i in range(n)]
+        )
+
+        self._leave_cs = _prefix(self.leave)
+        self._blackout_cs = _prefix(self.blackout)
+        self._holiday_cs = _prefix(self.holiday)
+
+    def _flags(self, days):
+        flags = np.zeros(self.size, dtype=bool)
+        for d in days:
+            i = self.index(d)
+            if 0 <= i < self.size:
+                flags[i] = True
+        return flags
+
+    def index(self, d: date) -> int:
+        return (d - self.start).days
+
+    def day(self, i) -> date:
+        return self.start + timedelta(days=int(i))
+
+    def windows(self, length: int):
+        """(leave cost, blocked, holiday count) for every start of a ``length``-day window."""
+        return (
+            self._leave_cs[length:] - self._leave_cs[:-length],
+            (self._blackout_cs[length:] - self._blackout_cs[:-length]) > 0,
+            self._holiday_cs[length:] - self._holiday_cs[:-length],
+        )
+
+    def leave_between(self, i: int, j: int) -> int:
+        return int(self._leave_cs[j + 1] - self._leave_cs[i])
+
+    def blocked(self, i: int, j: int) -> bool:
+        return bool(self._blackout_cs[j + 1] - self._blackout_cs[i])
+
+    def widen(self, i: int, j: int, floor: int = MIN_LEAD_DAYS):
+        """Stretch a window over adjacent free days (weekends, holidays)."""
+        while i - 1 >= floor and not self.leave[i - 1] and not self.blackout[i - 1]:
+            i -= 1
+        while j + 1 < self.size and not self.leave[j + 1] and not self.blackout[j + 1]:
+            j += 1
+        return i, j
+
+
+def _prefix(flags):
+    return np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+
+
+def _best_windows(ctx, mask, lengths, k, allowed=None, require_holiday=False):
+    """
+    Top ``k`` non-overlapping windows by days off per leave day.
+    Returns ``[(start_idx, end_idx, leave_days), ...]``.
+    """
+    balance = ctx.leave_balance or 0
+    found = []
+
+    for length in lengths:
+        if length < 1 or length > mask.size - MIN_LEAD_DAYS:
+            continue
+
+        leave, blocked, holidays = mask.windows(length)
+        valid = ~blocked & (leave >= 1) & (leave <= balance)
+        valid[:MIN_LEAD_DAYS] = False
+        if allowed is not None:
+            valid &= allowed[:valid.size]
+        if require_holiday:
+            valid &= holidays > 0
+
+        for i in np.flatnonzero(valid):
+            found.append((length / leave[i], -int(leave[i]), -int(i), int(i), length))
+
+    found.sort(reverse=True)
+
+    chosen = []
+    for *_, i, length in found:
+        i, j = mask.widen(i, i + length - 1)
+        if any(i <= cj and ci <= j for ci, cj, _ in chosen):
+            continue
+        chosen.append((i, j, mask.leave_between(i, j)))
+        if len(chosen) == k:
+            break
+    return chosen
+
+
+# -------------------------------------------------
+# GENERATORS
+# -------------------------------------------------
+def ml_generator(ctx: UserContext, mask: DayMask):
+    """Break length and season from the ML engine, placed on the cheapest in-season window."""
+    rec = generate_break_recommendation(ctx.metrics)
+    length = rec["predicted_length_days"]
+    season = rec["recommended_season"]
+
+    # The engine dates from date.today(); keep only its lead time
+    lead = (date.fromisoformat(rec["recommended_start_date"]) - date.today()).days
+    lead = max(MIN_LEAD_DAYS, lead)
+    after_lead = np.arange(mask.size) >= lead
+    in_season = np.isin(mask.months, SEASON_MONTHS.get(season, ()))
+
+    windows = (
+        _best_windows(ctx, mask, [length], k=1, allowed=after_lead & in_season)
+        or _best_windows(ctx, mask, [length], k=1, allowed=after_lead)
+    )
+    return [
+        Candidate(
+            source="ml",
+            start=mask.day(i),
+            end=mask.day(j),
+            leave_days=leave,
+            title="Recommended Break",
+            description=rec["message"],
+            reason=f"Predicted {length}-day break during {season}",
+            based_on_workload=True,
+            based_on_preferences=True,
+            season=season,
+        )
+        for i, j, leave in windows
+    ]
+
+
+def holiday_generator(ctx: UserContext, mask: DayMask):
+    """Bridge public holidays with the fewest leave days."""
+    if not mask.holiday.any():
+        return []
+
+    names = dict(ctx.holidays)
+    candidates = []
+    for i, j, leave in _best_windows(ctx, mask, range(3, 12), k=3, require_holiday=True):
+        holiday = next(
+            (names[mask.day(d)] for d in range(i, j + 1) if mask.holiday[d]), "a public holiday"
+        )
+        candidates.append(Candidate(
+            source="holiday",
+            start=mask.day(i),
+            end=mask.day(j),
+            leave_days=leave,
+            title="Holiday Bridge",
+            description=f"Use {leave} leave day(s) around {holiday} for {j - i + 1} days off.",
+            reason="Extends a public holiday",
+            based_on_preferences=True,
+        ))
+    return candidates
+
+
+def optimizer_generator(ctx: UserContext, mask: DayMask):
+    """Most days off per leave day for the user's preferred break style."""
+    low, high = BREAK_LEAVE_RANGE[BREAK_STYLES.get(ctx.break_type, "mixed")]
+    lengths = range(low, high + 5)
+
+    candidates = []
+    for i, j, leave in _best_windows(ctx, mask, lengths, k=4):
+        if not low <= leave <= high:
+            continue
+        rest = j - i + 1
+        candidates.append(Candidate(
+            source="optimizer",
+            start=mask.day(i),
+            end=mask.day(j),
+            leave_days=leave,
+            title="Extended Break" if rest >= 7 else "Long Weekend",
+            description=f"{rest} days off for {leave} leave day(s).",
+            reason="Maximises rest per leave day",
+            based_on_preferences=True,
+        ))
+    return candidates
+
+
+def heuristic_generator(ctx: UserContext, mask: DayMask):
+    """Breaks anchored on upcoming special dates, plus a wellness break when mood or stress is poor."""
+    balance = ctx.leave_balance or 0
+    candidates = []
+
+    for special_day, title in ctx.special_dates:
+        idx = mask.index(special_day)
+        if not MIN_LEAD_DAYS <= idx < mask.size:
+            continue
+
+        i, j = max(idx - 1, MIN_LEAD_DAYS), min(idx + 1, mask.size - 1)
+        if mask.blocked(i, j):
+            continue
+        i, j = mask.widen(i, j)
+        leave = mask.leave_between(i, j)
+        if leave > balance:
+            continue
+
+        candidates.append(Candidate(
+            source="special_date",
+            start=mask.day(i),
+            end=mask.day(j),
+            leave_days=leave,
+            title=f"Break around {title}",
+            description=f"Time off around {title} on {special_day.isoformat()}.",
+            reason="Based on your special dates",
+            based_on_preferences=True,
+        ))
+
+    low_mood = ctx.recent_mood in NEGATIVE_MOODS
+    if low_mood or ctx.metrics.get("stress_level", 5) >= 7:
+        soon = np.arange(mask.size) <= MIN_LEAD_DAYS + 21
+        for i, j, leave in _best_windows(ctx, mask, range(3, 5), k=1, allowed=soon):
+            candidates.append(Candidate(
+                source="wellness",
+                start=mask.day(i),
+                end=mask.day(j),
+                leave_days=leave,
+                title="Wellness Break",
+                description="Your recent mood and stress indicate you could benefit from some time off.",
+                reason="Based on your recent mood tracking" if low_mood else "Based on your stress level",
+                based_on_mood=low_mood,
+                based_on_workload=True,
+            ))
+
+    return candidates
+
+
+GENERATORS = (ml_generator, holiday_generator, optimizer_generator, heuristic_generator)
+
+
+# -------------------------------------------------
+# RANKING
+# -------------------------------------------------
+def score_candidate(ctx: UserContext, mask: DayMask, candidate: Candidate) -> float:
+    efficiency = candidate.rest_days / max(candidate.leave_days, 1)
+    soon = 1 - mask.index(candidate.start) / mask.size
+    stress = ctx.metrics.get("stress_level", 5)
+    season = ctx.metrics.get("season_preference")
+
+    score = SOURCE_WEIGHTS.get(candidate.source, 10)
+    score += 8 * min(efficiency, 5)
+    score += 3 * (stress - 5) * soon
+    if candidate.start.month in SEASON_MONTHS.get(season, ()):
+        score += 5
+    if candidate.leave_days > (ctx.leave_balance or 0) / 2:
+        score -= 10
+    return score
+
+
+def recommend_break(ctx: UserContext) -> Candidate | None:
+    """
+    The single ML break behind a BreakRecommendation: its predicted length
+    and season, placed on the cheapest window around holidays and
+    blackouts. Unlike suggestions it is advisory, so not capped by the
+    leave balance.
+    """
+    ctx = replace(ctx, leave_balance=ctx.horizon_days)
+    candidates = ml_generator(ctx, DayMask(ctx))
+    return candidates[0] if candidates else None
+
+
+def recommend(ctx: UserContext, limit: int = 3, generators=GENERATORS) -> list[Candidate]:
+    """
+    Run every generator over one shared day mask and return the ``limit``
+    best non-overlapping candidates, highest score first. Repeats from the
+    same generator are penalized so one source can't fill every slot.
+    """
+    if not ctx.leave_balance or ctx.leave_balance <= 0:
+        return []
+
+    mask = DayMask(ctx)
+
+    candidates = []
+    for generator in generators:
+        for candidate in generator(ctx, mask):
+            candidate.score = score_candidate(ctx, mask, candidate)
+            candidates.append(candidate)
+
+    ranked, picked = [], {}
+    while candidates and len(ranked) < limit:
+        best = max(
+            candidates,
+            key=lambda c: (c.score - REPEAT_SOURCE_PENALTY * picked.get(c.source, 0), -c.start.toordinal()),
+        )
+        best.score -= REPEAT_SOURCE_PENALTY * picked.get(best.source, 0)
+        picked[best.source] = picked.get(best.source, 0) + 1
+        ranked.append(best)
+        candidates = [c for c in candidates if not c.overlaps(best)]
+    return ranked
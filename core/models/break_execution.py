@@ -30,6 +30,22 @@ class BreakExecution(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(auto_now_add=True)
 
+    # Fields whose changes move the user's rolling metrics buckets
+    METRICS_FIELDS = ("status", "recommended_start", "actual_start", "actual_end")
+    # Fields whose changes schedule, move or cancel the break's reminders
+    REMINDER_FIELDS = ("status", "recommended_start")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_metrics_values = {
+            f: getattr(instance, f) for f in cls.METRICS_FIELDS if f in field_names
+        }
+        instance._loaded_reminder_values = {
+            f: getattr(instance, f) for f in cls.REMINDER_FIELDS if f in field_names
+        }
+        return instance
+
     def duration(self):
         if self.actual_start and self.actual_end:
             return (self.actual_end - self.actual_start).days + 1
@@ -17,6 +17,10 @@ class PublicHolidayCalendar(models.Model):
         return f"{self.user.email}'s holiday calendar - {self.country_code}"
 
 class PublicHoliday(models.Model):
+    """
+    Legacy per-user copy of a country's holidays. No longer written;
+    reads go through CountryHoliday + HolidayOverride (HolidayService).
+    """
     country_code = models.CharField(max_length=10, null=False, blank=False)
     name = models.CharField(max_length=255, null=False, blank=False)
     date = models.DateField(null=False, blank=False)
@@ -30,4 +34,70 @@ class PublicHoliday(models.Model):
         ordering = ['date']
 
     def __str__(self):
-        return f"{self.name} ({self.date})"
\ No newline at end of file
+        return f"{self.name} ({self.date})"
+
+class CountryHoliday(models.Model):
+    """
+    Public holidays per country, synced once per (country_code, year) and
+    shared by every calendar set to that country. Per-user differences
+    live in HolidayOverride.
+    """
+    country_code = models.CharField(max_length=10)
+    year = models.PositiveSmallIntegerField()
+    date = models.DateField()
+    name = models.CharField(max_length=255)
+    local_name = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country_code", "date", "name"],
+                name="unique_country_holiday",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["country_code", "year"]),
+        ]
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date}, {self.country_code})"
+
+
+class CountryHolidaySync(models.Model):
+    """When each (country_code, year) was last fetched from the provider."""
+    country_code = models.CharField(max_length=10)
+    year = models.PositiveSmallIntegerField()
+    synced_at = models.DateTimeField()
+    holiday_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country_code", "year"],
+                name="unique_country_holiday_sync",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.country_code} {self.year} synced {self.synced_at:%Y-%m-%d}"
+
+
+class HolidayOverride(models.Model):
+    """
+    Per-calendar change to the country list: a custom holiday, or
+    (is_removed) hiding the country's holiday on that date.
+    """
+    calendar = models.ForeignKey(PublicHolidayCalendar, on_delete=models.CASCADE, related_name='overrides')
+    date = models.DateField()
+    name = models.CharField(max_length=255, blank=True, default="")
+    is_removed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('calendar', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        action = "removed" if self.is_removed else self.name
+        return f"{self.calendar.user_id} {self.date}: {action}"
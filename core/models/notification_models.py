@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 import uuid
@@ -7,10 +8,14 @@ import uuid
 class Notification(models.Model):
    
 
+    # pending -> sending (claimed by an outbox worker) -> sent / failed,
+    # or skipped when the user's preferences block the event
     STATUS_CHOICES = (
         ("pending", "Pending"),
+        ("sending", "Sending"),
         ("sent", "Sent"),
         ("failed", "Failed"),
+        ("skipped", "Skipped"),
     )
 
     CHANNEL_CHOICES = (
@@ -60,16 +65,21 @@ class Notification(models.Model):
     metadata = models.JSONField(default=dict, blank=True)
 
     sent_at = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     error_message = models.TextField(blank=True, null=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        # id breaks created_at ties so keyset pages are stable
+        ordering = ["-created_at", "-id"]
         indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="notif_user_feed_idx"),
             models.Index(fields=["user", "event"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["status", "created_at"]),
             models.Index(fields=["user", "is_read"]), 
+            models.Index(fields=["event", "created_at"]),
         ]
 
     def __str__(self):
@@ -94,7 +104,168 @@ class Notification(models.Model):
     # =========================
 
     def mark_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=["is_read", "read_at"])
+        if self.is_read:
+            return
+        self.is_read = True
+        self.read_at = timezone.now()
+        # Conditional update so concurrent reads decrement the counter once
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=self.read_at
+        )
+        if updated and self.channel == "system":
+            NotificationCounter.add({self.user_id: -1})
+
+
+class NotificationCounter(models.Model):
+    """
+    Denormalized unread count of a user's in-app (system) notifications,
+    so polling clients read one row instead of counting. Adjusted in the
+    same transaction as the notifications; drift is repaired by the
+    reconcile_unread_counters task.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} | unread={self.unread}"
+
+    @classmethod
+    def add(cls, deltas: dict) -> None:
+        """
+        Apply ``{user_id: delta}``: one UPDATE per distinct delta (usually
+        just one), after an insert-if-missing for users gaining unread.
+        """
+        deltas = {uid: d for uid, d in deltas.items() if d}
+        if not deltas:
+            return
+
+        created = [uid for uid, d in deltas.items() if d > 0]
+        if created:
+            cls.objects.bulk_create(
+                [cls(user_id=uid) for uid in created], ignore_conflicts=True
+            )
+
+        by_delta = {}
+        for uid, d in deltas.items():
+            by_delta.setdefault(d, []).append(uid)
+        for d, user_ids in by_delta.items():
+            cls.objects.filter(user_id__in=user_ids).update(unread=F("unread") + d)
+
+
+class NotificationArchive(models.Model):
+    """
+    Cold copy of notifications pruned from the hot table by the retention
+    job (for event types configured to archive). Outbox fields are dropped.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+    )
+    event = models.CharField(max_length=50)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    type = models.CharField(max_length=50, blank=True, null=True)
+    channel = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="notif_archive_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.event} | archived"
+
+
+class NotificationSummary(models.Model):
+    """
+    What the retention job removed, per user and event type, so totals
+    survive pruning (e.g. "reminders received all time").
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notification_summaries",
+    )
+    event = models.CharField(max_length=50)
+    pruned = models.PositiveIntegerField(default=0)
+    pruned_read = models.PositiveIntegerField(default=0)
+    archived = models.PositiveIntegerField(default=0)
+    first_created_at = models.DateTimeField(null=True, blank=True)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "event"], name="unique_notification_summary"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.event} | pruned={self.pruned}"
+
+
+class BreakReminder(models.Model):
+    """
+    Reminder ledger: one row per (break, kind). The ETA task only sends
+    when it can flip its row from scheduled to sent, so a reminder never
+    fires twice and a cancelled or rescheduled one fires not at all.
+    """
+
+    STATUS_CHOICES = (
+        ("scheduled", "Scheduled"),
+        ("sent", "Sent"),
+        ("cancelled", "Cancelled"),
+    )
+
+    KIND_CHOICES = (
+        ("day_before", "Day Before"),
+        ("day_of", "Day Of"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    break_execution = models.ForeignKey(
+        "BreakExecution",
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="scheduled")
+    scheduled_for = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["break_execution", "kind"],
+                name="unique_break_reminder_kind",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "scheduled_for"]),
+        ]
+
+    def __str__(self):
+        return f"{self.break_execution_id} | {self.kind} | {self.status}"
@@ -33,13 +33,42 @@ class UserMetrics(models.Model):
         ('mixed', 'Mix of Both'),
     ]
     break_type_preference = models.CharField(max_length=20, choices=BREAK_TYPE_CHOICES, default='mixed')
-    
+
+    # Rolling-window state, one entry per day: {"YYYY-MM-DD": {"th": ..}}
+    # Maintained incrementally by UserMetricsService
+    rolling_buckets = models.JSONField(default=dict, blank=True)
+
+    # Exponentially decayed estimator sums: {"stress": {..}, "sleep": {..}}
+    decay_state = models.JSONField(default=dict, blank=True)
+    decay_updated_at = models.DateTimeField(null=True, blank=True)
+    decayed_stress = models.FloatField(null=True, blank=True)
+    decayed_sleep = models.FloatField(null=True, blank=True)
+
+    # Freshness: any input change bumps inputs_version; computed_version is
+    # the inputs_version the derived fields reflect
+    inputs_version = models.PositiveIntegerField(default=0)
+    computed_version = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    # Denormalized pointer used by the 7-day recommendation throttle
+    latest_recommendation = models.ForeignKey(
+        'BreakRecommendation',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.email}'s Metrics"
 
+    @property
+    def is_dirty(self):
+        return self.computed_version != self.inputs_version
+
 
 class BreakRecommendation(models.Model):
 
@@ -57,6 +86,11 @@ class BreakRecommendation(models.Model):
     is_viewed = models.BooleanField(default=False)
     is_accepted = models.BooleanField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='breakrec_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email}'s Recommendation ({self.created_at.strftime('%Y-%m-%d')})"
\ No newline at end of file
@@ -5,7 +5,7 @@ import uuid
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from .holiday_models import PublicHolidayCalendar
-from core.utils.contry_code_resolution import resolve_country_code
+from core.utils.contry_code_resolution import resolve_country_code, timezone_to_country_code
 
 
 class UserManager(BaseUserManager):
@@ -63,6 +63,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    # Fields whose changes move the user to another holiday calendar
+    CALENDAR_FIELDS = ("country_code", "home_location_timezone")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_calendar_values = {
+            f: getattr(instance, f) for f in cls.CALENDAR_FIELDS if f in field_names
+        }
+        return instance
+
     def __str__(self):
         return self.email if not self.full_name else self.full_name
     
@@ -96,13 +107,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_calendar(self):
         """
         Always return a holiday calendar for this user.
-        If missing, create one with a default country code.
+        If missing, create one with the user's country, else the one of
+        their timezone ('US' when neither is known).
         """
         # from .models import PublicHolidayCalendar
 
         calendar, _ = PublicHolidayCalendar.objects.get_or_create(
             user=self,
-            defaults={"country_code": self.country_code}
+            defaults={"country_code": self.country_code or timezone_to_country_code(self.home_location_timezone)}
         )
         return calendar
 
@@ -4,4 +4,20 @@ from ..models.holiday_models import PublicHoliday
 class PublicHolidaySerializer(serializers.ModelSerializer):
     class Meta:
         model = PublicHoliday
-        fields = ["id", "name", "date", "country_code"]
\ No newline at end of file
+        fields = ["id", "name", "date", "country_code"]
+
+
+class HolidaySerializer(serializers.Serializer):
+    """
+    A calendar entry from HolidayService (country holiday or override).
+    ``id`` is "c:<pk>" for a CountryHoliday and "o:<pk>" for a
+    HolidayOverride, so the two tables' keys can't collide.
+    """
+    id = serializers.SerializerMethodField()
+    name = serializers.CharField()
+    date = serializers.DateField()
+    country_code = serializers.CharField()
+    is_custom = serializers.BooleanField()
+
+    def get_id(self, obj) -> str:
+        return f"{'o' if obj.is_custom else 'c'}:{obj.id}"
@@ -16,3 +16,20 @@ class NotificationSerializer(serializers.ModelSerializer):
             "error_message",
             "read_at",
         )
+
+
+class NotificationListSerializer(serializers.ModelSerializer):
+    """Feed rows: no metadata or delivery bookkeeping (see the detail view)."""
+
+    class Meta:
+        model = Notification
+        fields = (
+            "id",
+            "event",
+            "title",
+            "message",
+            "type",
+            "is_read",
+            "created_at",
+        )
+        read_only_fields = fields
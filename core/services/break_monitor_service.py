@@ -10,8 +10,9 @@ def mark_missed_breaks():
     missed = BreakExecution.objects.filter(
         status="approved",
         recommended_end__lt=today
-    )
+    ).select_related("user")
 
+    events = []
     for br in missed:
         br.status = "missed"
         br.save()
@@ -21,14 +22,16 @@ def mark_missed_breaks():
             br.recommended_start
         )
 
-        # 🔔 Notification
-        NotificationService.notify(
-            user=br.user,
-            event="break_missed",
-            title="You missed a break 😕",
-            message="You missed a planned break. Try rescheduling to avoid burnout.",
-            metadata={
+        events.append({
+            "user": br.user,
+            "event": "break_missed",
+            "title": "You missed a break 😕",
+            "message": "You missed a planned break. Try rescheduling to avoid burnout.",
+            "metadata": {
                 "break_id": str(br.id),
                 "recommended_start": br.recommended_start.isoformat(),
             },
-        )
+        })
+
+    # 🔔 Notifications, delivered in bulk
+    NotificationService.notify_many(events)
@@ -1,31 +1,257 @@
 # services/break_reminder_service.py
 
+import logging
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
 
-from ..models.break_execution import BreakExecution
+from ..models.notification_models import BreakReminder
 from .notification_service import NotificationService
 from core.constants.notification_events import BREAK_REMINDER
 
+logger = logging.getLogger(__name__)
+
+
+# kind -> (days before the break starts, local send time, title, message)
+REMINDER_SCHEDULE = {
+    "day_before": (
+        1,
+        time(9, 0),
+        "Upcoming break ⏰",
+        "You have a planned break starting tomorrow. Get ready!",
+    ),
+    "day_of": (
+        0,
+        time(8, 0),
+        "Your break starts today 🌴",
+        "Your planned break starts today. Enjoy it!",
+    ),
+}
+
+# A task that wakes up this much before its ETA is still allowed to send
+REMINDER_EARLY_TOLERANCE = timedelta(seconds=60)
+
+# Only reminders due this soon get an ETA task; later ones wait in the
+# ledger for queue_due. A Redis broker redelivers unacked ETA messages
+# every visibility_timeout (1h by default), so this stays well below it.
+REMINDER_QUEUE_AHEAD = timedelta(minutes=15)
+# Still scheduled this long after its time: the task was lost, queue again
+REMINDER_OVERDUE_GRACE = timedelta(minutes=10)
+# Later than this a reminder is no use any more and is cancelled
+REMINDER_MAX_LATENESS = timedelta(hours=6)
+
+
+def reminder_queued_key(reminder_id, scheduled_for) -> str:
+    return f"reminders:queued:{reminder_id}:{scheduled_for.isoformat()}"
+
+
+class BreakReminderService:
+    """
+    Keeps a BreakReminder ledger in step with approved breaks and turns
+    due rows into Celery ETA tasks: right away when approved close to the
+    send time, otherwise from the periodic queue_due.
+    """
+
+    # ============================
+    # Scheduling
+    # ============================
+
+    @staticmethod
+    def reminder_times(break_execution) -> dict:
+        """Aware send time per reminder kind, in the user's local timezone."""
+        tz = BreakReminderService._user_timezone(break_execution.user)
+        return {
+            kind: datetime.combine(
+                break_execution.recommended_start - timedelta(days=days_before),
+                at,
+                tzinfo=tz,
+            )
+            for kind, (days_before, at, _, _) in REMINDER_SCHEDULE.items()
+        }
+
+    @staticmethod
+    def sync(break_execution, now=None) -> None:
+        """
+        Bring the break's reminders in line with its current state:
+        schedule on approval, move when the start date changes, cancel
+        when the break leaves the approved status. Idempotent.
+        """
+        if break_execution.status != "approved":
+            BreakReminderService.cancel(break_execution.id)
+            return
+
+        now = now or timezone.now()
+        existing = {
+            r.kind: r
+            for r in BreakReminder.objects.filter(break_execution=break_execution)
+        }
+
+        for kind, scheduled_for in BreakReminderService.reminder_times(break_execution).items():
+            reminder = existing.get(kind)
+
+            if scheduled_for <= now:
+                # Too late for this one; make sure an old ETA doesn't send it
+                if reminder and reminder.status == "scheduled":
+                    reminder.status = "cancelled"
+                    reminder.save(update_fields=["status", "updated_at"])
+                continue
+
+            if reminder is None:
+                reminder = BreakReminder.objects.create(
+                    break_execution=break_execution,
+                    kind=kind,
+                    scheduled_for=scheduled_for,
+                )
+            elif reminder.scheduled_for == scheduled_for and reminder.status != "cancelled":
+                # Already queued (or already sent) for this start date
+                continue
+            else:
+                reminder.scheduled_for = scheduled_for
+                reminder.status = "scheduled"
+                reminder.sent_at = None
+                reminder.save(update_fields=["scheduled_for", "status", "sent_at", "updated_at"])
+
+            if scheduled_for <= now + REMINDER_QUEUE_AHEAD:
+                BreakReminderService._enqueue(reminder)
+
+    @staticmethod
+    def cancel(break_execution_id) -> int:
+        """
+        Cancel outstanding reminders. Their ETA tasks still wake up, find
+        the row no longer scheduled and do nothing.
+        """
+        return BreakReminder.objects.filter(
+            break_execution_id=break_execution_id,
+            status="scheduled",
+        ).update(status="cancelled", updated_at=timezone.now())
 
-def send_break_reminders():
-    tomorrow = timezone.now().date() + timedelta(days=1)
-
-    upcoming = BreakExecution.objects.filter(
-        status="approved",
-        recommended_start=tomorrow,
-        processed_at__isnull=True,
-    )
-
-    for br in upcoming:
-        NotificationService.notify(
-            user=br.user,
-            event=BREAK_REMINDER,
-            title="Upcoming break ⏰",
-            message="You have a planned break starting tomorrow. Get ready!",
-            metadata={
-                "start": br.recommended_start.isoformat(),
-                "end": br.recommended_end.isoformat(),
-            },
+    @staticmethod
+    def queue_due(now=None) -> dict:
+        """
+        Queue an ETA task for every scheduled reminder due within
+        REMINDER_QUEUE_AHEAD, over the (status, scheduled_for) index. Rows
+        whose task went missing (publish failed, message lost) are queued
+        again once REMINDER_OVERDUE_GRACE past their time; rows older than
+        REMINDER_MAX_LATENESS are cancelled instead.
+        """
+        now = now or timezone.now()
+
+        expired = BreakReminder.objects.filter(
+            status="scheduled",
+            scheduled_for__lt=now - REMINDER_MAX_LATENESS,
+        ).update(status="cancelled", updated_at=now)
+
+        due = BreakReminder.objects.filter(
+            status="scheduled",
+            scheduled_for__lte=now + REMINDER_QUEUE_AHEAD,
+            break_execution__status="approved",
+        ).values_list("id", "scheduled_for")
+
+        queued = sum(
+            BreakReminderService._publish(str(reminder_id), scheduled_for, now)
+            for reminder_id, scheduled_for in due
         )
-    
\ No newline at end of file
+
+        if expired:
+            logger.warning(f"Cancelled {expired} break reminder(s) that were never sent")
+        return {"queued": queued, "expired": expired}
+
+    @staticmethod
+    def _enqueue(reminder) -> None:
+        reminder_id = str(reminder.id)
+        scheduled_for = reminder.scheduled_for
+
+        # The task must not run before the ledger row is visible
+        transaction.on_commit(lambda: BreakReminderService._publish(reminder_id, scheduled_for))
+
+    @staticmethod
+    def _publish(reminder_id, scheduled_for, now=None) -> bool:
+        from ..tasks.break_reminder_tasks import send_break_reminder
+
+        now = now or timezone.now()
+        key = reminder_queued_key(reminder_id, scheduled_for)
+        # Held until the grace period after the ETA; an unsent row whose
+        # key has expired is queued again by queue_due
+        timeout = (scheduled_for - now + REMINDER_OVERDUE_GRACE).total_seconds()
+        if not cache.add(key, 1, timeout=max(int(timeout), 1)):
+            return False
+
+        try:
+            send_break_reminder.apply_async(
+                args=[reminder_id, scheduled_for.isoformat()],
+                eta=scheduled_for,
+            )
+        except Exception as e:
+            # Retried by the next queue_due run
+            cache.delete(key)
+            logger.error(f"Could not schedule break reminder {reminder_id}: {e}")
+            return False
+        return True
+
+    # ============================
+    # Delivery
+    # ============================
+
+    @staticmethod
+    def fire(reminder_id, scheduled_for, now=None) -> bool:
+        """
+        Send one reminder if it is still due. ``scheduled_for`` is the ETA
+        the task was queued with; a task left over from before a
+        reschedule no longer matches and is dropped.
+        """
+        now = now or timezone.now()
+        if isinstance(scheduled_for, str):
+            scheduled_for = datetime.fromisoformat(scheduled_for)
+
+        with transaction.atomic():
+            claimed = BreakReminder.objects.filter(
+                id=reminder_id,
+                status="scheduled",
+                scheduled_for=scheduled_for,
+                scheduled_for__lte=now + REMINDER_EARLY_TOLERANCE,
+                break_execution__status="approved",
+            ).update(status="sent", sent_at=now, updated_at=now)
+
+            if not claimed:
+                return False
+
+            reminder = BreakReminder.objects.select_related(
+                "break_execution__user"
+            ).get(id=reminder_id)
+            br = reminder.break_execution
+            _, _, title, message = REMINDER_SCHEDULE[reminder.kind]
+
+            NotificationService.notify_many([
+                {
+                    "user": br.user,
+                    "event": BREAK_REMINDER,
+                    "title": title,
+                    "message": message,
+                    "metadata": {
+                        "break_id": str(br.id),
+                        "reminder": reminder.kind,
+                        "start": br.recommended_start.isoformat(),
+                        "end": br.recommended_end.isoformat(),
+                    },
+                }
+            ])
+
+        return True
+
+    # ============================
+    # Helpers
+    # ============================
+
+    @staticmethod
+    def _user_timezone(user):
+        name = getattr(user, "home_location_timezone", None)
+        if name:
+            try:
+                return ZoneInfo(name)
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"Unknown timezone {name!r} for user {user.id}")
+        return ZoneInfo(settings.TIME_ZONE)
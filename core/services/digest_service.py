@@ -0,0 +1,235 @@
+# services/digest_service.py
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Case, Count, FloatField, Max, Q, Sum, Value, When
+from django.utils import timezone
+
+from ..models.break_execution import BreakExecution
+from ..models.score_models import BreakScore, StreakScore
+from ..models.badge_models import Badge
+from ..models.mood_models import Mood
+from .notification_service import NotificationService, NOTIFY_BATCH_SIZE
+from .user_metrics_service import MOOD_STRESS_WEIGHTS
+from core.constants.notification_events import WEEKLY_DIGEST
+
+User = get_user_model()
+
+# Users aggregated per round of grouped queries; bounds memory per chunk
+DIGEST_CHUNK_SIZE = 2000
+
+# Average stress-weight change (1-10 scale) that counts as a trend
+MOOD_TREND_THRESHOLD = 0.5
+
+MOOD_STRESS = Case(
+    *[When(mood_type=mood, then=Value(float(w))) for mood, w in MOOD_STRESS_WEIGHTS.items()],
+    default=Value(5.0),
+    output_field=FloatField(),
+)
+
+
+class WeeklyDigestService:
+    """
+    Builds every opted-in user's weekly summary with a few grouped
+    queries per chunk of users, and streams the results into the
+    notification outbox.
+    """
+
+    # ============================
+    # Public API
+    # ============================
+
+    @staticmethod
+    def send(week_end=None, chunk_size: int = DIGEST_CHUNK_SIZE) -> int:
+        """Queue one digest per opted-in user. Returns the number queued."""
+        return NotificationService.notify_many(
+            (
+                WeeklyDigestService._event(user, stats)
+                for user, stats in WeeklyDigestService.iter_digests(week_end, chunk_size)
+            ),
+            batch_size=min(chunk_size, NOTIFY_BATCH_SIZE),
+        )
+
+    @staticmethod
+    def iter_digests(week_end=None, chunk_size: int = DIGEST_CHUNK_SIZE):
+        """
+        Yield ``(user, stats)`` for every user with ``weeklyDigest`` on,
+        covering the seven days before ``week_end`` (default: today).
+        Users are paged by primary key, so memory stays flat.
+        """
+        week_end = week_end or timezone.localdate()
+        week_start = week_end - timedelta(days=7)
+
+        users = (
+            User.objects.filter(notification_preferences__weeklyDigest=True)
+            .order_by("pk")
+            .only("pk")
+        )
+
+        last_pk = None
+        while True:
+            page = users if last_pk is None else users.filter(pk__gt=last_pk)
+            chunk = list(page[:chunk_size])
+            if not chunk:
+                return
+
+            stats = WeeklyDigestService.aggregate(
+                [u.pk for u in chunk], week_start, week_end
+            )
+            for user in chunk:
+                yield user, stats[user.pk]
+
+            last_pk = chunk[-1].pk
+
+    @staticmethod
+    def aggregate(user_ids, week_start, week_end) -> dict:
+        """
+        Weekly stats for ``user_ids``: one grouped query per source model.
+        The window is ``[week_start, week_end)``.
+        """
+        stats = {uid: WeeklyDigestService._empty_stats() for uid in user_ids}
+        prev_start = week_start - timedelta(days=7)
+
+        # --- Breaks taken / missed ---
+        taken_q = Q(status="taken", actual_start__gte=week_start, actual_start__lt=week_end)
+        missed_q = Q(status="missed", recommended_end__gte=week_start, recommended_end__lt=week_end)
+        for row in (
+            BreakExecution.objects.filter(taken_q | missed_q, user_id__in=user_ids)
+            .values("user_id")
+            .annotate(
+                taken=Count("id", filter=Q(status="taken")),
+                missed=Count("id", filter=Q(status="missed")),
+            )
+            .order_by()
+        ):
+            stats[row["user_id"]]["breaks_taken"] = row["taken"]
+            stats[row["user_id"]]["breaks_missed"] = row["missed"]
+
+        # --- Break score points ---
+        for row in (
+            BreakScore.objects.filter(
+                user_id__in=user_ids,
+                score_date__gte=week_start,
+                score_date__lt=week_end,
+            )
+            .values("user_id")
+            .annotate(points=Sum("score_value"))
+            .order_by()
+        ):
+            stats[row["user_id"]]["points"] = row["points"] or 0
+
+        # --- Streaks ---
+        for row in (
+            StreakScore.objects.filter(user_id__in=user_ids)
+            .values("user_id")
+            .annotate(current=Max("current_streak"), last_break=Max("last_break_date"))
+            .order_by()
+        ):
+            s = stats[row["user_id"]]
+            s["current_streak"] = row["current"]
+            s["streak_extended"] = bool(
+                row["last_break"] and week_start <= row["last_break"] < week_end
+            )
+
+        # --- New badges ---
+        for row in (
+            Badge.objects.filter(
+                user_id__in=user_ids,
+                earned_date__gte=week_start,
+                earned_date__lt=week_end,
+            )
+            .values("user_id")
+            .annotate(new=Count("id"))
+            .order_by()
+        ):
+            stats[row["user_id"]]["new_badges"] = row["new"]
+
+        # --- Mood trend (this week vs the week before) ---
+        tz = timezone.get_current_timezone()
+        bounds = [
+            datetime.combine(d, time.min, tzinfo=tz)
+            for d in (prev_start, week_start, week_end)
+        ]
+        for row in (
+            Mood.objects.filter(
+                user_id__in=user_ids,
+                created_at__gte=bounds[0],
+                created_at__lt=bounds[2],
+            )
+            .values("user_id")
+            .annotate(
+                previous=Avg(MOOD_STRESS, filter=Q(created_at__lt=bounds[1])),
+                current=Avg(MOOD_STRESS, filter=Q(created_at__gte=bounds[1])),
+            )
+            .order_by()
+        ):
+            stats[row["user_id"]]["mood_trend"] = WeeklyDigestService._mood_trend(
+                row["previous"], row["current"]
+            )
+
+        return stats
+
+    # ============================
+    # Formatting
+    # ============================
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "breaks_taken": 0,
+            "breaks_missed": 0,
+            "points": 0,
+            "current_streak": 0,
+            "streak_extended": False,
+            "new_badges": 0,
+            "mood_trend": None,
+        }
+
+    @staticmethod
+    def _mood_trend(previous, current):
+        if current is None:
+            return None
+        if previous is None:
+            return "new"
+        # Lower stress weight means a better mood
+        if current <= previous - MOOD_TREND_THRESHOLD:
+            return "improving"
+        if current >= previous + MOOD_TREND_THRESHOLD:
+            return "declining"
+        return "steady"
+
+    @staticmethod
+    def _message(stats) -> str:
+        taken, missed = stats["breaks_taken"], stats["breaks_missed"]
+        if not (taken or missed or stats["new_badges"] or stats["mood_trend"]):
+            return "A quiet week. Plan your next break and keep your streak going!"
+
+        parts = [f"You took {taken} break{'s' if taken != 1 else ''}"]
+        if missed:
+            parts.append(f"missed {missed}")
+        if stats["points"]:
+            parts.append(f"earned {stats['points']} points")
+        lines = [", ".join(parts) + "."]
+
+        if stats["streak_extended"]:
+            lines.append(f"Your streak is now {stats['current_streak']} 🔥")
+        if stats["new_badges"]:
+            n = stats["new_badges"]
+            lines.append(f"You unlocked {n} new badge{'s' if n != 1 else ''} 🏅")
+        if stats["mood_trend"] == "improving":
+            lines.append("Your mood improved compared to last week.")
+        elif stats["mood_trend"] == "declining":
+            lines.append("Your mood dipped this week. A short break might help.")
+
+        return " ".join(lines)
+
+    @staticmethod
+    def _event(user, stats) -> dict:
+        return {
+            "user": user,
+            "event": WEEKLY_DIGEST,
+            "title": "Your Weekly Break Summary 📊",
+            "message": WeeklyDigestService._message(stats),
+            "metadata": {"digest": stats},
+        }
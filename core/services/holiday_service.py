@@ -0,0 +1,361 @@
+# services/holiday_service.py
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.holiday_models import (
+    CountryHoliday,
+    CountryHolidaySync,
+    HolidayOverride,
+    PublicHolidayCalendar,
+)
+from ..utils.holiday_providers import fetch_many_public_holidays
+from ..utils.task_utils import publish_bounded
+
+logger = logging.getLogger(__name__)
+
+# A (country, year) older than this is fetched again
+HOLIDAY_SYNC_MAX_AGE = timedelta(days=30)
+
+
+@dataclass(frozen=True)
+class Holiday:
+    id: int
+    date: date
+    name: str
+    country_code: str
+    is_custom: bool = False
+
+
+# (country_code, year) -> (expires_at, version, tuple[Holiday])
+_country_cache = {}
+_country_cache_lock = threading.Lock()
+
+# Per-user calendar sync requests in this process: queued, folded into one
+# already pending, or skipped because no calendar field changed
+_user_sync_stats = {"queued": 0, "coalesced": 0, "unchanged": 0}
+_user_sync_stats_lock = threading.Lock()
+
+
+def user_sync_key(user_id) -> str:
+    return f"holidays:user-sync:{user_id}"
+
+
+def country_sync_key(country_code) -> str:
+    return f"holidays:country-sync:{country_code}"
+
+
+def country_version_key(country_code, year) -> str:
+    return f"holidays:version:{country_code}:{year}"
+
+
+class HolidayService:
+    """
+    Holidays are stored once per (country_code, year) in CountryHoliday
+    and read through an in-process cache, checked against a version in
+    the shared cache that every change bumps; a user's calendar is the
+    country list plus that calendar's HolidayOverride rows.
+    """
+
+    # ============================
+    # Reads
+    # ============================
+
+    @staticmethod
+    def country_holidays(country_code, year) -> tuple:
+        """
+        Cached holidays of one country and year, ordered by date. An entry
+        is used only while its version matches the shared one, so a sync
+        on any worker is seen by every process.
+        """
+        key = (country_code, year)
+        now = time.monotonic()
+        version = cache.get(country_version_key(country_code, year), 0)
+
+        with _country_cache_lock:
+            entry = _country_cache.get(key)
+        if entry and entry[0] > now and entry[1] == version:
+            return entry[2]
+
+        holidays = tuple(
+            Holiday(id=pk, date=d, name=local_name or name, country_code=country_code)
+            for pk, d, name, local_name in CountryHoliday.objects.filter(
+                country_code=country_code, year=year
+            ).order_by("date", "name").values_list("id", "date", "name", "local_name")
+        )
+        # Nothing stored yet: keep asking, so the first sync shows up at once
+        # even if the version key was evicted
+        if holidays:
+            ttl = getattr(settings, "HOLIDAY_CACHE_TTL_SECONDS", 3600)
+            with _country_cache_lock:
+                _country_cache[key] = (now + ttl, version, holidays)
+        return holidays
+
+    @staticmethod
+    def for_calendar(calendar, start=None, end=None) -> list:
+        """
+        The calendar's holidays in ``[start, end]`` (defaults: this year
+        through next year): country holidays with overrides applied.
+        """
+        today = timezone.localdate()
+        start = start or date(today.year, 1, 1)
+        end = end or date(today.year + 1, 12, 31)
+
+        holidays = [
+            h
+            for year in range(start.year, end.year + 1)
+            for h in HolidayService.country_holidays(calendar.country_code, year)
+            if start <= h.date <= end
+        ]
+
+        overrides = list(
+            HolidayOverride.objects.filter(
+                calendar=calendar, date__range=(start, end)
+            ).values_list("id", "date", "name", "is_removed")
+        )
+        if overrides:
+            removed = {d for _, d, _, is_removed in overrides if is_removed}
+            holidays = [h for h in holidays if h.date not in removed]
+            holidays += [
+                Holiday(id=pk, date=d, name=name, country_code=calendar.country_code, is_custom=True)
+                for pk, d, name, is_removed in overrides
+                if not is_removed
+            ]
+            holidays.sort(key=lambda h: h.date)
+
+        return holidays
+
+    @staticmethod
+    def for_user(user, start=None, end=None) -> list:
+        """Holidays of the user's enabled calendar, or [] without one."""
+        calendar = (
+            PublicHolidayCalendar.objects.filter(user=user, is_enabled=True)
+            .only("id", "country_code")
+            .first()
+        )
+        if not calendar or not calendar.country_code:
+            return []
+        return HolidayService.for_calendar(calendar, start, end)
+
+    # ============================
+    # Sync
+    # ============================
+
+    @staticmethod
+    def years_to_sync(today=None) -> list:
+        today = today or timezone.localdate()
+        return [today.year, today.year + 1]
+
+    @staticmethod
+    def stale_years(country_code, years) -> list:
+        """Years of ``country_code`` never synced or synced too long ago."""
+        fresh = set(
+            CountryHolidaySync.objects.filter(
+                country_code=country_code,
+                year__in=years,
+                synced_at__gte=timezone.now() - HOLIDAY_SYNC_MAX_AGE,
+            ).values_list("year", flat=True)
+        )
+        return [y for y in years if y not in fresh]
+
+    @staticmethod
+    def sync_country(country_code, years=None, providers=None) -> dict:
+        """
+        Fetch one country's holidays for ``years`` and apply the difference
+        to the stored rows. A failed or empty fetch keeps the stored rows.
+        ``providers`` overrides the configured provider order.
+        Returns ``{"stored", "created", "updated", "deleted", "failed_years"}``.
+        """
+        return HolidayService.sync_countries([country_code], years, providers)[country_code]
+
+    @staticmethod
+    def sync_countries(country_codes, years=None, providers=None) -> dict:
+        """
+        ``sync_country`` for many countries: every (country, year) is fetched
+        up front in one concurrent batch, then stored pair by pair.
+        Returns the per-country result dicts keyed by country code.
+        """
+        years = years or HolidayService.years_to_sync()
+        pairs = [(code, year) for code in country_codes for year in years]
+        fetched = fetch_many_public_holidays(pairs, providers=providers)
+
+        results = {
+            code: {"stored": 0, "created": 0, "updated": 0, "deleted": 0, "failed_years": []}
+            for code in country_codes
+        }
+        for (country_code, year), data in fetched.items():
+            totals = results[country_code]
+            if not data:
+                logger.warning(f"No holidays fetched for {country_code} {year}; keeping stored rows")
+                totals["failed_years"].append(year)
+                continue
+
+            incoming = {
+                (date.fromisoformat(str(h["date"])), h.get("name") or h.get("localName") or "Holiday"):
+                    h.get("localName") or ""
+                for h in data
+            }
+            changes = HolidayService._apply_diff(country_code, year, incoming)
+
+            totals["stored"] += len(incoming)
+            for key, n in changes.items():
+                totals[key] += n
+
+        for country_code, totals in results.items():
+            logger.info(f"Synced {totals['stored']} holidays for {country_code}: {totals}")
+        return results
+
+    @staticmethod
+    def _apply_diff(country_code, year, incoming) -> dict:
+        """
+        Bring one (country, year) in line with ``incoming``
+        (``{(date, name): local_name}``) in a single transaction: one read,
+        one upsert for new rows, one bulk update, one filtered delete.
+        Unchanged rows keep their ids and are never absent to readers.
+        Once a change commits, every process's cached list is dropped.
+        """
+        with transaction.atomic():
+            existing = {
+                (h.date, h.name): h
+                for h in CountryHoliday.objects.filter(country_code=country_code, year=year)
+            }
+
+            to_create = [
+                CountryHoliday(
+                    country_code=country_code, year=year, date=d, name=name, local_name=local_name
+                )
+                for (d, name), local_name in incoming.items()
+                if (d, name) not in existing
+            ]
+            to_update = []
+            for key, local_name in incoming.items():
+                row = existing.get(key)
+                if row is not None and row.local_name != local_name:
+                    row.local_name = local_name
+                    to_update.append(row)
+            to_delete = [row.pk for key, row in existing.items() if key not in incoming]
+
+            if to_create:
+                # A concurrent sync may have inserted the same holiday
+                CountryHoliday.objects.bulk_create(
+                    to_create,
+                    update_conflicts=True,
+                    unique_fields=["country_code", "date", "name"],
+                    update_fields=["year", "local_name"],
+                )
+            if to_update:
+                CountryHoliday.objects.bulk_update(to_update, ["local_name"])
+            if to_delete:
+                CountryHoliday.objects.filter(pk__in=to_delete).delete()
+
+            CountryHolidaySync.objects.bulk_create(
+                [CountryHolidaySync(
+                    country_code=country_code,
+                    year=year,
+                    synced_at=timezone.now(),
+                    holiday_count=len(incoming),
+                )],
+                update_conflicts=True,
+                unique_fields=["country_code", "year"],
+                update_fields=["synced_at", "holiday_count"],
+            )
+
+            if to_create or to_update or to_delete:
+                transaction.on_commit(lambda: HolidayService.bump_version(country_code, year))
+
+        return {"created": len(to_create), "updated": len(to_update), "deleted": len(to_delete)}
+
+    # ============================
+    # Per-user sync scheduling
+    # ============================
+
+    @staticmethod
+    def schedule_user_sync(user_id) -> None:
+        """
+        Queue sync_user_holidays for the user once the current transaction
+        commits. The task runs HOLIDAY_SYNC_DEBOUNCE_SECONDS later and reads
+        the calendar's country then, so every request made before it starts
+        is folded into it via a per-user cache key.
+        """
+        transaction.on_commit(lambda: HolidayService._enqueue_user_sync(user_id))
+
+    @staticmethod
+    def _enqueue_user_sync(user_id) -> bool:
+        from ..tasks.holiday_tasks import sync_user_holidays
+
+        delay = getattr(settings, "HOLIDAY_SYNC_DEBOUNCE_SECONDS", 30)
+        # Outlives the countdown so a busy queue can't let a duplicate in
+        if not cache.add(user_sync_key(user_id), 1, timeout=delay + 300):
+            HolidayService.record_user_sync("coalesced")
+            return False
+
+        # Runs on the request that saved: never wait on an unreachable broker
+        if not publish_bounded(sync_user_holidays, (str(user_id),), countdown=delay):
+            cache.delete(user_sync_key(user_id))
+            return False
+
+        HolidayService.record_user_sync("queued")
+        return True
+
+    @staticmethod
+    def schedule_country_sync(country_code, years=None) -> list:
+        """
+        Queue sync_country_holidays for the years of ``country_code`` that
+        are missing or stale, at most once per country while one may still
+        be running. Returns the years that need it, queued or not.
+        """
+        from ..tasks.holiday_tasks import sync_country_holidays
+
+        stale = HolidayService.stale_years(country_code, years or HolidayService.years_to_sync())
+        if not stale:
+            return []
+
+        if cache.add(country_sync_key(country_code), 1, timeout=300):
+            if not publish_bounded(sync_country_holidays, (country_code, stale)):
+                cache.delete(country_sync_key(country_code))
+        return stale
+
+    @staticmethod
+    def record_user_sync(outcome) -> None:
+        with _user_sync_stats_lock:
+            _user_sync_stats[outcome] += 1
+
+    @staticmethod
+    def user_sync_stats() -> dict:
+        with _user_sync_stats_lock:
+            return dict(_user_sync_stats)
+
+    @staticmethod
+    def mark_calendars_synced(country_codes) -> int:
+        """Stamp every enabled calendar of these countries in one UPDATE."""
+        return PublicHolidayCalendar.objects.filter(
+            country_code__in=list(country_codes), is_enabled=True
+        ).update(last_synced=timezone.now())
+
+    @staticmethod
+    def bump_version(country_code, year) -> None:
+        """Make every process reload one (country, year) on its next read."""
+        key = country_version_key(country_code, year)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted in between; any value other than the cached one will do
+            cache.set(key, 1, timeout=None)
+        HolidayService.invalidate(country_code, year)
+
+    @staticmethod
+    def invalidate(country_code=None, year=None) -> None:
+        """Drop cached lists: one (country, year), a country, or everything."""
+        with _country_cache_lock:
+            for key in list(_country_cache):
+                if country_code in (None, key[0]) and year in (None, key[1]):
+                    del _country_cache[key]
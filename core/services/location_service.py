@@ -0,0 +1,113 @@
+# services/location_service.py
+
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+
+from ..utils.task_utils import publish_bounded
+
+logger = logging.getLogger(__name__)
+
+# Headers of the user's last resolved login; a login repeating them has
+# nothing new. Only written once the update task has run.
+LOGIN_LOCATION_TTL_SECONDS = 30 * 24 * 3600
+# Bounds how long a lost task can hold back the next one
+LOGIN_LOCATION_PENDING_SECONDS = 300
+
+# Login-time location updates in this process: queued, folded into one
+# already pending, or skipped because there was nothing new to resolve
+_login_update_stats = {"queued": 0, "coalesced": 0, "unchanged": 0}
+_login_update_stats_lock = threading.Lock()
+
+
+def login_location_key(user_id) -> str:
+    return f"location:login-headers:{user_id}"
+
+
+def login_update_key(user_id) -> str:
+    return f"location:login-update:{user_id}"
+
+
+def latest_login_key(user_id) -> str:
+    return f"location:login-latest:{user_id}"
+
+
+class LocationService:
+
+    @staticmethod
+    def needs_update(user, timezone_str=None, coords=None) -> bool:
+        """
+        Whether update_user_location would change anything: it only fills
+        in a timezone / coordinates the user doesn't have yet.
+        """
+        if coords and not user.home_location_coordinates:
+            return True
+        return bool((timezone_str or coords) and not user.home_location_timezone)
+
+    @staticmethod
+    def schedule_login_update(user, timezone_str=None, coords=None) -> bool:
+        """
+        Resolve the location sent with a login in the background. Skipped
+        when the X-Timezone / X-Coordinates headers repeat the last resolved
+        login's or the user already has both fields; otherwise the task is
+        queued once the login commits, and logins until it starts share it.
+        """
+        headers = [timezone_str or "", coords or ""]
+        if cache.get(login_location_key(user.pk)) == headers:
+            LocationService.record_login_update("unchanged")
+            return False
+        if not LocationService.needs_update(user, timezone_str, coords):
+            LocationService.record_login_update("unchanged")
+            return False
+
+        # A pending task resolves the latest login's headers
+        cache.set(latest_login_key(user.pk), headers, timeout=LOGIN_LOCATION_PENDING_SECONDS)
+        user_id = user.pk
+        transaction.on_commit(lambda: LocationService._enqueue_login_update(user_id, headers))
+        return True
+
+    @staticmethod
+    def _enqueue_login_update(user_id, headers) -> bool:
+        from ..tasks.location_tasks import update_location_after_login
+
+        # The task reads the latest headers when it starts, so a pending one
+        # covers this login too
+        if not cache.add(login_update_key(user_id), 1, timeout=LOGIN_LOCATION_PENDING_SECONDS):
+            LocationService.record_login_update("coalesced")
+            return False
+
+        # Runs on the login request: never wait on an unreachable broker.
+        # Nothing was recorded, so a later login retries.
+        if not publish_bounded(update_location_after_login, (str(user_id), *headers)):
+            cache.delete(login_update_key(user_id))
+            return False
+
+        LocationService.record_login_update("queued")
+        return True
+
+    @staticmethod
+    def latest_login_headers(user_id, timezone_str=None, coords=None) -> tuple:
+        """(timezone, coords) of the user's latest login, else the given ones."""
+        headers = cache.get(latest_login_key(user_id)) or [timezone_str, coords]
+        return headers[0] or None, headers[1] or None
+
+    @staticmethod
+    def remember_login_headers(user_id, timezone_str=None, coords=None) -> None:
+        """Logins repeating these headers are skipped; call once they are resolved."""
+        cache.set(
+            login_location_key(user_id),
+            [timezone_str or "", coords or ""],
+            timeout=LOGIN_LOCATION_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def record_login_update(outcome) -> None:
+        with _login_update_stats_lock:
+            _login_update_stats[outcome] += 1
+
+    @staticmethod
+    def login_update_stats() -> dict:
+        with _login_update_stats_lock:
+            return dict(_login_update_stats)
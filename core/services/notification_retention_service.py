@@ -0,0 +1,183 @@
+# services/notification_retention_service.py
+
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models.notification_models import (
+    Notification,
+    NotificationArchive,
+    NotificationCounter,
+    NotificationSummary,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION = {"read_days": 30, "max_days": 180, "archive": True}
+
+# Outbox rows still in flight are never pruned
+PRUNABLE_STATUSES = ("sent", "failed", "skipped")
+
+ARCHIVE_FIELDS = (
+    "id", "user_id", "event", "title", "message", "type", "channel",
+    "status", "is_read", "read_at", "metadata", "sent_at", "created_at",
+)
+
+
+class NotificationRetentionService:
+    """
+    Keeps the hot Notification table bounded: expired rows are archived
+    or deleted in small id-list chunks with a pause in between, and what
+    was removed is folded into per-user NotificationSummary rows.
+    """
+
+    # ============================
+    # Public API
+    # ============================
+
+    @staticmethod
+    def policies() -> dict:
+        """Per-event retention from settings, each merged over the default."""
+        configured = getattr(settings, "NOTIFICATION_RETENTION", {})
+        default = {**DEFAULT_RETENTION, **configured.get("default", {})}
+        return {
+            "default": default,
+            **{
+                event: {**default, **policy}
+                for event, policy in configured.items()
+                if event != "default"
+            },
+        }
+
+    @staticmethod
+    def prune(now=None, chunk_size=None, pause=None) -> dict:
+        """Apply every policy. Returns counts of deleted and archived rows."""
+        now = now or timezone.now()
+        chunk_size = chunk_size or settings.NOTIFICATION_RETENTION_CHUNK_SIZE
+        pause = settings.NOTIFICATION_RETENTION_PAUSE_SECONDS if pause is None else pause
+
+        policies = NotificationRetentionService.policies()
+        explicit_events = [e for e in policies if e != "default"]
+        totals = {"deleted": 0, "archived": 0, "chunks": 0}
+
+        for event, policy in policies.items():
+            expired = NotificationRetentionService._expired(
+                event, policy, now, explicit_events
+            )
+            while True:
+                ids = list(expired.values_list("id", flat=True)[:chunk_size])
+                if not ids:
+                    break
+
+                deleted = NotificationRetentionService._prune_chunk(ids, policy["archive"])
+                totals["deleted"] += deleted
+                if policy["archive"]:
+                    totals["archived"] += deleted
+                totals["chunks"] += 1
+
+                if pause:
+                    time.sleep(pause)
+
+        if totals["deleted"]:
+            logger.info(
+                f"Notification retention: pruned {totals['deleted']} "
+                f"({totals['archived']} archived) in {totals['chunks']} chunks"
+            )
+        return totals
+
+    # ============================
+    # Internals
+    # ============================
+
+    @staticmethod
+    def _expired(event, policy, now, explicit_events):
+        qs = Notification.objects.filter(status__in=PRUNABLE_STATUSES)
+        if event == "default":
+            qs = qs.exclude(event__in=explicit_events)
+        else:
+            qs = qs.filter(event=event)
+
+        return qs.filter(
+            Q(is_read=True, created_at__lt=now - timedelta(days=policy["read_days"]))
+            | Q(created_at__lt=now - timedelta(days=policy["max_days"]))
+        ).order_by()
+
+    @staticmethod
+    @transaction.atomic
+    def _prune_chunk(ids, archive) -> int:
+        fields = ARCHIVE_FIELDS if archive else ("id", "user_id", "event", "channel", "is_read", "created_at")
+        rows = list(
+            Notification.objects.select_for_update()
+            .filter(id__in=ids)
+            .order_by()
+            .values(*fields)
+        )
+        if not rows:
+            return 0
+
+        if archive:
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows],
+                ignore_conflicts=True,
+            )
+
+        NotificationRetentionService._summarise(rows, archive)
+        NotificationCounter.add({
+            user_id: -n
+            for user_id, n in Counter(
+                r["user_id"] for r in rows if not r["is_read"] and r["channel"] == "system"
+            ).items()
+        })
+
+        deleted, _ = Notification.objects.filter(id__in=[r["id"] for r in rows]).delete()
+        return deleted
+
+    @staticmethod
+    def _summarise(rows, archived) -> None:
+        groups = {}
+        for r in rows:
+            g = groups.setdefault(
+                (r["user_id"], r["event"]),
+                {"pruned": 0, "pruned_read": 0, "first": r["created_at"], "last": r["created_at"]},
+            )
+            g["pruned"] += 1
+            g["pruned_read"] += r["is_read"]
+            g["first"] = min(g["first"], r["created_at"])
+            g["last"] = max(g["last"], r["created_at"])
+
+        existing = {
+            (s.user_id, s.event): s
+            for s in NotificationSummary.objects.select_for_update().filter(
+                user_id__in={u for u, _ in groups},
+                event__in={e for _, e in groups},
+            )
+        }
+
+        to_create, to_update = [], []
+        for (user_id, event), g in groups.items():
+            summary = existing.get((user_id, event))
+            if summary is None:
+                summary = NotificationSummary(user_id=user_id, event=event)
+                to_create.append(summary)
+            else:
+                to_update.append(summary)
+
+            summary.pruned += g["pruned"]
+            summary.pruned_read += g["pruned_read"]
+            if archived:
+                summary.archived += g["pruned"]
+            summary.first_created_at = min(filter(None, (summary.first_created_at, g["first"])))
+            summary.last_created_at = max(filter(None, (summary.last_created_at, g["last"])))
+            summary.updated_at = timezone.now()
+
+        NotificationSummary.objects.bulk_create(to_create)
+        NotificationSummary.objects.bulk_update(
+            to_update,
+            ["pruned", "pruned_read", "archived", "first_created_at", "last_created_at", "updated_at"],
+        )
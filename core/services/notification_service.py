@@ -112,23 +112,42 @@
 
 
 
+import binascii
 import logging
-from typing import Optional
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Iterable, Optional
 
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
 from django.utils import timezone
 
 from ..models.preference_models import UserNotificationPreference
-from ..models.notification_models import Notification
+from ..models.notification_models import Notification, NotificationCounter
 from ..models.user_models import User
-from ..models.device_models import DeviceToken
+from .recipient_cache import PREFERENCES_CACHE, DEVICE_TOKENS_CACHE
 
-from ..utils.email_utils import send_notification_email
-from ..utils.firebase_utils import send_firebase_push
+from ..utils.email_utils import send_notification_emails
+from ..utils.firebase_utils import send_firebase_push_batch
+from ..utils.task_utils import publish_bounded
 
 from django.shortcuts import get_object_or_404
 
 logger = logging.getLogger(__name__)
 
+# Rows inserted per statement / claimed per outbox round
+NOTIFY_BATCH_SIZE = 500
+
+NOTIFICATION_PAGE_SIZE = 20
+NOTIFICATION_MAX_PAGE_SIZE = 100
+
+# A claimed row not finished within this is handed to another worker
+OUTBOX_CLAIM_LEASE_SECONDS = 300
+
 
 class NotificationService:
     """
@@ -145,78 +164,222 @@ class NotificationService:
         message: str,
         metadata: Optional[dict] = None,
     ) -> None:
+        NotificationService.notify_many([{
+            "user": user,
+            "event": event,
+            "title": title,
+            "message": message,
+            "metadata": metadata,
+        }])
 
-        prefs = NotificationService._get_preferences(user)
+    @staticmethod
+    def notify_many(events: Iterable[dict], batch_size: int = NOTIFY_BATCH_SIZE) -> int:
+        """
+        Queue many notifications at once (transactional outbox).
 
+        Each event is a dict with the same keys as ``notify`` (``user``,
+        ``event``, ``title``, ``message``, optional ``metadata``). Rows are
+        bulk-inserted as ``pending`` in the caller's transaction; delivery
+        happens in outbox workers, kicked once the transaction commits.
+        Returns the number of notifications stored.
+        """
+        events = iter(events)
+        total = 0
+
+        while True:
+            batch = list(islice(events, batch_size))
+            if not batch:
+                break
+
+            Notification.objects.bulk_create([
+                Notification(
+                    user=e["user"],
+                    event=e["event"],
+                    title=e["title"],
+                    message=e["message"],
+                    metadata=e.get("metadata") or {},
+                    channel="system",
+                    status="pending",
+                )
+                for e in batch
+            ])
+            NotificationCounter.add(Counter(e["user"].pk for e in batch))
+            total += len(batch)
 
-         # SYSTEM notification (always stored)
-        notification = Notification.objects.create(
-            user=user,
-            event=event,
-            title=title,
-            message=message,
-            metadata=metadata or {},
-            channel="system",
-            status="pending",
-        )
+        if total:
+            transaction.on_commit(NotificationService._kick_outbox)
+        return total
 
-        if not prefs:
-            logger.info(f"No preferences for user {user.id}")
-            return
+    @staticmethod
+    def _kick_outbox():
+        from ..tasks.notification_tasks import deliver_pending_notifications
 
-        if not NotificationService._event_allowed(event, prefs):
-            return
+        # Runs on the request that notified; if the broker is unreachable
+        # the periodic drain picks the rows up anyway
+        publish_bounded(deliver_pending_notifications)
 
-       
+    # ============================
+    # Outbox consumer
+    # ============================
 
-        errors = []
+    @staticmethod
+    def claim_pending(batch_size: int = NOTIFY_BATCH_SIZE) -> list[Notification]:
+        """
+        Claim up to ``batch_size`` pending rows. Concurrent workers skip each
+        other's locked rows; claims older than the lease are taken over.
+        The lock is only held for the claim, not during delivery.
+        """
+        now = timezone.now()
+        lease_expired = now - timedelta(seconds=OUTBOX_CLAIM_LEASE_SECONDS)
+
+        with transaction.atomic():
+            claimed = list(
+                Notification.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(
+                    Q(status="pending") | Q(status="sending", claimed_at__lt=lease_expired)
+                )
+                .select_related("user")
+                .order_by("created_at")[:batch_size]
+            )
+            if claimed:
+                Notification.objects.filter(pk__in=[n.pk for n in claimed]).update(
+                    status="sending", claimed_at=now
+                )
+        return claimed
+
+    @staticmethod
+    def deliver_pending(batch_size: int = NOTIFY_BATCH_SIZE) -> int:
+        """Claim and deliver one batch. Returns the number of rows processed."""
+        notifications = NotificationService.claim_pending(batch_size)
+        if notifications:
+            NotificationService._deliver(notifications)
+        return len(notifications)
+
+    @staticmethod
+    def _deliver(notifications: list[Notification]) -> None:
+        user_ids = {n.user_id for n in notifications}
+
+        prefs_by_user = PREFERENCES_CACHE.get_many(user_ids)
+
+        deliverable, skipped = [], []
+        for notification in notifications:
+            prefs = prefs_by_user.get(notification.user_id)
+            if not prefs:
+                logger.info(f"No preferences for user {notification.user_id}")
+                skipped.append(notification)
+            elif not NotificationService._event_allowed(notification.event, prefs):
+                skipped.append(notification)
+            else:
+                deliverable.append((notification, prefs))
+
+        errors = defaultdict(list)
+
+        tokens_by_user = NotificationService._get_tokens_for_users(
+            [n.user for n, prefs in deliverable if prefs.pushEnabled]
+        )
 
         # =====================
         # PUSH NOTIFICATIONS
         # =====================
-        if prefs.pushEnabled:
+        pushes, push_owners = [], []
+        for notification, prefs in deliverable:
+            if not prefs.pushEnabled:
+                continue
+            for token in tokens_by_user.get(notification.user_id, ()):
+                pushes.append({
+                    "token": token,
+                    "title": notification.title,
+                    "body": notification.message,
+                    "data": {
+                        "notification_id": str(notification.id),
+                        "event": notification.event,
+                        **notification.metadata,
+                    },
+                })
+                push_owners.append(notification)
+
+        if pushes:
             try:
-                tokens = NotificationService._get_user_tokens(user)
-
-                for token in tokens:
-                    try:
-                        send_firebase_push(
-                            token=token,
-                            title=title,
-                            body=message,
-                            data={
-                                "notification_id": str(notification.id),
-                                "event": event,
-                                **(metadata or {})
-                            },
-                        )
-                    except Exception as e:
-                        errors.append(f"Push failed: {str(e)}")
-
-            except Exception as e:
-                errors.append(f"Push setup failed: {str(e)}")
+                results = send_firebase_push_batch(pushes)
+            except Exception as ex:
+                results = [False] * len(pushes)
+                logger.error(f"Push batch failed: {ex}")
+            for ok, notification in zip(results, push_owners):
+                if not ok:
+                    errors[notification.id].append("Push failed")
 
         # =====================
         # EMAIL NOTIFICATIONS
         # =====================
-        if prefs.emailEnabled:
+        emails = [n for n, prefs in deliverable if prefs.emailEnabled]
+        if emails:
             try:
-                send_notification_email(
-                    email=user.email,
-                    title=title,
-                    message=message,
+                results = send_notification_emails(
+                    [(n.user.email, n.title, n.message) for n in emails]
                 )
-            except Exception as e:
-                errors.append(f"Email failed: {str(e)}")
+            except Exception as ex:
+                results = [False] * len(emails)
+                logger.error(f"Email batch failed: {ex}")
+            for ok, notification in zip(results, emails):
+                if not ok:
+                    errors[notification.id].append("Email failed")
 
         # =====================
         # FINAL STATUS
         # =====================
-        if errors:
-            notification.mark_failed("; ".join(errors))
-            logger.error(f"Notification failed for user {user.id}: {errors}")
-        else:
-            notification.mark_sent()
+        now = timezone.now()
+        for notification in skipped:
+            notification.status = "skipped"
+
+        for notification, _ in deliverable:
+            failures = errors.get(notification.id)
+            if failures:
+                notification.status = "failed"
+                notification.error_message = "; ".join(failures)
+                logger.error(f"Notification failed for user {notification.user_id}: {failures}")
+            else:
+                notification.status = "sent"
+                notification.sent_at = now
+
+        Notification.objects.bulk_update(
+            notifications, ["status", "sent_at", "error_message"]
+        )
+
+    @staticmethod
+    def outbox_stats(window_minutes: int = 60) -> dict:
+        """Queue depth and recent delivery latency, for monitoring."""
+        now = timezone.now()
+
+        depth = dict(
+            Notification.objects.filter(status__in=("pending", "sending"))
+            .order_by()
+            .values_list("status")
+            .annotate(n=Count("id"))
+        )
+        oldest = (
+            Notification.objects.filter(status="pending")
+            .order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first()
+        )
+        latency = Notification.objects.filter(
+            status="sent",
+            sent_at__gte=now - timedelta(minutes=window_minutes),
+        ).aggregate(
+            delivered=Count("id"),
+            avg=Avg(F("sent_at") - F("created_at")),
+            max=Max(F("sent_at") - F("created_at")),
+        )
+
+        return {
+            "pending": depth.get("pending", 0),
+            "sending": depth.get("sending", 0),
+            "oldest_pending_age_seconds": (now - oldest).total_seconds() if oldest else 0,
+            "delivered_last_window": latency["delivered"],
+            "avg_delivery_latency_seconds": latency["avg"].total_seconds() if latency["avg"] else None,
+            "max_delivery_latency_seconds": latency["max"].total_seconds() if latency["max"] else None,
+            "window_minutes": window_minutes,
+        }
 
     # ============================
     # Event rules
@@ -246,25 +409,29 @@ class NotificationService:
             return None
 
     @staticmethod
-    def _get_user_tokens(user):
+    def _get_tokens_for_users(users) -> dict:
         """
+        ``{user_id: [token, ...]}`` for many users in at most one query.
         Supports both:
         - New DeviceToken model (preferred)
         - Legacy single fcmToken field (fallback)
         """
-        tokens = []
+        tokens = defaultdict(set)
 
-        # Preferred: multiple devices
-        if hasattr(user, "device_tokens"):
-            tokens.extend(
-                user.device_tokens.values_list("token", flat=True)
-            )
+        if not users:
+            return {}
+
+        # Preferred: multiple devices (cached per user)
+        cached = DEVICE_TOKENS_CACHE.get_many({u.id for u in users})
+        for user_id, user_tokens in cached.items():
+            tokens[user_id].update(user_tokens or ())
 
         #  Fallback: single token on user
-        if getattr(user, "fcmToken", None):
-            tokens.append(user.fcmToken)
+        for user in users:
+            if getattr(user, "fcmToken", None):
+                tokens[user.id].add(user.fcmToken)
 
-        return list(set(tokens))  # remove duplicates
+        return {user_id: list(t) for user_id, t in tokens.items()}
 
 
 
@@ -274,6 +441,46 @@ class NotificationCRUDService:
     def list_for_user(user):
         return Notification.objects.filter(user=user)
 
+    @staticmethod
+    def page_for_user(user, cursor=None, limit=NOTIFICATION_PAGE_SIZE, fields=None):
+        """
+        One page of the feed, newest first, by keyset on (created_at, id)
+        so deep pages cost the same as the first. Returns
+        ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+        Raises ValueError for a malformed cursor.
+        """
+        limit = max(1, min(int(limit), NOTIFICATION_MAX_PAGE_SIZE))
+        qs = Notification.objects.filter(user=user).order_by("-created_at", "-id")
+        if fields:
+            qs = qs.only(*fields)
+
+        if cursor:
+            created_at, pk = NotificationCRUDService._decode_cursor(cursor)
+            qs = qs.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        rows = list(qs[:limit + 1])
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        return rows, NotificationCRUDService._encode_cursor(rows[-1])
+
+    @staticmethod
+    def _encode_cursor(notification) -> str:
+        raw = f"{notification.created_at.isoformat()}|{notification.id}"
+        return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created_at, pk = raw.split("|")
+            return datetime.fromisoformat(created_at), uuid.UUID(pk)
+        except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+            raise ValueError("Invalid cursor") from e
+
     @staticmethod
     def get_and_mark_read(user, notification_id):
         notification = get_object_or_404(
@@ -286,20 +493,100 @@ class NotificationCRUDService:
 
     @staticmethod
     def mark_all_read(user):
-        Notification.objects.filter(
-            user=user,
-            is_read=False
-        ).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        with transaction.atomic():
+            # Lock the counter first so concurrent increments queue behind the reset
+            NotificationCounter.objects.select_for_update().filter(user=user).first()
+            updated = Notification.objects.filter(
+                user=user,
+                is_read=False
+            ).update(
+                is_read=True,
+                read_at=timezone.now()
+            )
+            NotificationCounter.objects.filter(user=user).update(unread=0)
+        return updated
 
     @staticmethod
     def delete(user, notification_id):
-        Notification.objects.filter(
-            id=notification_id,
-            user=user
-        ).delete()
+        with transaction.atomic():
+            deleted = Notification.objects.filter(
+                id=notification_id,
+                user=user
+            ).values_list("is_read", "channel").first()
+            if deleted is None:
+                return
+
+            Notification.objects.filter(id=notification_id).delete()
+            if deleted == (False, "system"):
+                NotificationCounter.add({user.pk: -1})
+
+    # ============================
+    # Unread counter
+    # ============================
+
+    @staticmethod
+    def unread_count(user) -> int:
+        """O(1) read of the denormalized counter; initialised on first use."""
+        unread = (
+            NotificationCounter.objects.filter(user=user)
+            .values_list("unread", flat=True)
+            .first()
+        )
+        if unread is None:
+            NotificationCRUDService.reconcile_unread_counts([user.pk])
+            unread = NotificationCounter.objects.get(user=user).unread
+        return max(unread, 0)
+
+    @staticmethod
+    def reconcile_unread_counts(user_ids) -> int:
+        """
+        Recount unread notifications for ``user_ids`` and repair counters
+        that drifted. Counter rows are locked first, so increments from
+        notifications committed meanwhile land on top of the fresh count.
+        Returns the number of counters changed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            counters = {
+                c.user_id: c
+                for c in NotificationCounter.objects.select_for_update().filter(
+                    user_id__in=user_ids
+                )
+            }
+            actual = dict(
+                Notification.objects.filter(
+                    user_id__in=user_ids,
+                    channel="system",
+                    is_read=False,
+                )
+                .values("user_id")
+                .annotate(n=Count("id"))
+                .order_by()
+                .values_list("user_id", "n")
+            )
+
+            missing = [
+                NotificationCounter(user_id=uid, unread=actual.get(uid, 0), reconciled_at=now)
+                for uid in user_ids
+                if uid not in counters
+            ]
+            NotificationCounter.objects.bulk_create(missing, ignore_conflicts=True)
+
+            drifted = []
+            for uid, counter in counters.items():
+                counter.reconciled_at = now
+                if counter.unread != actual.get(uid, 0):
+                    logger.info(
+                        f"Unread counter drift for user {uid}: "
+                        f"{counter.unread} -> {actual.get(uid, 0)}"
+                    )
+                    counter.unread = actual.get(uid, 0)
+                    drifted.append(counter)
+            NotificationCounter.objects.bulk_update(
+                list(counters.values()), ["unread", "reconciled_at"]
+            )
+
+        return len(missing) + len(drifted)
 
 
 
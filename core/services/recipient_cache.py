@@ -0,0 +1,179 @@
+# services/recipient_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..models.preference_models import UserNotificationPreference
+from ..models.device_models import DeviceToken
+
+logger = logging.getLogger(__name__)
+
+# Stored for users without a row, so they aren't re-queried on every batch
+_MISSING = "__missing__"
+
+
+class ReadThroughCache:
+    """
+    Per-user read-through cache with two tiers:
+
+    - local: in-process LRU with a short TTL (other processes' writes are
+      only seen once it expires)
+    - shared: optional Django cache alias (e.g. Redis) with a longer TTL,
+      enabled by ``NOTIFICATION_CACHE_SHARED_ALIAS``
+
+    ``loader(user_ids)`` fetches misses in one query and returns
+    ``{user_id: value}``; users it omits are cached as missing.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+    # ----- config -----
+
+    @property
+    def local_ttl(self):
+        return getattr(settings, "NOTIFICATION_CACHE_LOCAL_TTL", 30)
+
+    @property
+    def local_max(self):
+        return getattr(settings, "NOTIFICATION_CACHE_LOCAL_MAX_ENTRIES", 10000)
+
+    @property
+    def shared_ttl(self):
+        return getattr(settings, "NOTIFICATION_CACHE_SHARED_TTL", 300)
+
+    def _shared(self):
+        alias = getattr(settings, "NOTIFICATION_CACHE_SHARED_ALIAS", None)
+        return caches[alias] if alias else None
+
+    def _key(self, user_id):
+        return f"notify:{self.name}:{user_id}"
+
+    # ----- reads -----
+
+    def get_many(self, user_ids) -> dict:
+        """``{user_id: value}``; users without data map to None."""
+        found, missing = {}, []
+        now = time.monotonic()
+
+        with self._lock:
+            for uid in user_ids:
+                entry = self._local.get(uid)
+                if entry and entry[1] > now:
+                    self._local.move_to_end(uid)
+                    found[uid] = entry[0]
+                else:
+                    missing.append(uid)
+            self._stats["local_hits"] += len(found)
+
+        shared = self._shared() if missing else None
+        if shared is not None:
+            try:
+                hits = shared.get_many([self._key(uid) for uid in missing])
+            except Exception as e:
+                logger.warning(f"Shared {self.name} cache unavailable: {e}")
+                hits = {}
+            if hits:
+                by_key = {self._key(uid): uid for uid in missing}
+                for key, value in hits.items():
+                    found[by_key[key]] = value
+                self._store_local({by_key[k]: v for k, v in hits.items()})
+                missing = [uid for uid in missing if uid not in found]
+                with self._lock:
+                    self._stats["shared_hits"] += len(hits)
+
+        if missing:
+            loaded = self.loader(missing)
+            fresh = {uid: loaded.get(uid, _MISSING) for uid in missing}
+            found.update(fresh)
+            self._store_local(fresh)
+            if shared is not None:
+                try:
+                    shared.set_many(
+                        {self._key(uid): v for uid, v in fresh.items()},
+                        timeout=self.shared_ttl,
+                    )
+                except Exception as e:
+                    logger.warning(f"Shared {self.name} cache unavailable: {e}")
+            with self._lock:
+                self._stats["misses"] += len(missing)
+
+        return {uid: (None if v == _MISSING else v) for uid, v in found.items()}
+
+    def _store_local(self, values):
+        expires = time.monotonic() + self.local_ttl
+        with self._lock:
+            for uid, value in values.items():
+                self._local[uid] = (value, expires)
+                self._local.move_to_end(uid)
+            while len(self._local) > self.local_max:
+                self._local.popitem(last=False)
+
+    # ----- writes -----
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._local.pop(user_id, None)
+            self._stats["invalidations"] += 1
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.delete(self._key(user_id))
+            except Exception as e:
+                logger.warning(f"Shared {self.name} cache unavailable: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["local_entries"] = len(self._local)
+        lookups = s["local_hits"] + s["shared_hits"] + s["misses"]
+        s["hit_rate"] = round((s["local_hits"] + s["shared_hits"]) / lookups, 4) if lookups else None
+        return s
+
+
+# ============================
+# Loaders
+# ============================
+
+def _load_preferences(user_ids) -> dict:
+    return {
+        p.user_id: p
+        for p in UserNotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+
+
+def _load_device_tokens(user_ids) -> dict:
+    tokens = {}
+    for user_id, token in DeviceToken.objects.filter(
+        user_id__in=user_ids
+    ).values_list("user_id", "token"):
+        tokens.setdefault(user_id, []).append(token)
+    return tokens
+
+
+PREFERENCES_CACHE = ReadThroughCache("preferences", _load_preferences)
+DEVICE_TOKENS_CACHE = ReadThroughCache("device_tokens", _load_device_tokens)
+
+
+def recipient_cache_stats() -> dict:
+    """Hit-rate metrics for this process."""
+    return {
+        "preferences": PREFERENCES_CACHE.stats(),
+        "device_tokens": DEVICE_TOKENS_CACHE.stats(),
+    }
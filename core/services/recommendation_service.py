@@ -6,13 +6,16 @@ from django.utils import timezone
 from ..models.recommendation_models import UserMetrics, BreakRecommendation
 from ..models.break_models import BreakPlan
 from ..models.user_models import User
-from ..models.holiday_models import PublicHolidayCalendar
 from ..models.leave_balance_models import LeaveBalance
+from .user_metrics_service import UserMetricsService
 
-from core.ml_engine.breaks_engine import generate_break_recommendation
+from core.ml_engine.recommendation_engine import recommend_break
 
 logger = logging.getLogger(__name__)
 
+# A new recommendation is generated at most once per window
+RECOMMENDATION_THROTTLE_DAYS = 7
+
 
 class RecommendationService:
     """
@@ -38,66 +41,46 @@ class RecommendationService:
     # Recommendation generation
     # ------------------------------------------------------------------
     @staticmethod
-    def generate_recommendation(user: User) -> BreakRecommendation | None:
+    def generate_recommendation(user: User, force: bool = False) -> BreakRecommendation | None:
         """
         Generate a break recommendation for a user.
-        Returns existing recent recommendation if found.
+        Returns existing recent recommendation if found, unless ``force``.
         """
+        # Imported here: the suggestion service builds on this one
+        from .suggestion_service import SuggestionService
+
         try:
-            # Metrics must exist (built by UserMetricsService)
-            user_metrics = UserMetrics.objects.get(user=user)
+            # Rebuilt lazily only if missing, dirty or past the TTL
+            user_metrics = UserMetricsService.get_fresh(user)
 
             # Avoid spamming recommendations (7-day window)
-            recent_recommendation = BreakRecommendation.objects.filter(
-                user=user,
-                created_at__gte=timezone.now() - timedelta(days=7),
-            ).first()
-
-            if recent_recommendation:
-                return recent_recommendation
-
-            # ML input
-            user_input = RecommendationService.get_user_input_dict(user_metrics)
-
-            # Generate via ML / heuristic engine
-            recommendation_data = generate_break_recommendation(user_input)
-
-            # Parse dates safely
-            start_date = date.fromisoformat(
-                recommendation_data["recommended_start_date"]
-            )
-            end_date = date.fromisoformat(
-                recommendation_data["recommended_end_date"]
-            )
-
-            # Optimize around public holidays
-            optimized_start, optimized_end = (
-                RecommendationService.optimize_around_holidays(
-                    user, start_date, end_date
+            if not force:
+                recent_recommendation = RecommendationService.get_recent_recommendation(
+                    user, user_metrics
                 )
-            )
+                if recent_recommendation:
+                    return recent_recommendation
+
+            # Same context and engine as break suggestions; the break is
+            # placed around the user's holidays, blackouts and work pattern
+            context = SuggestionService.load_context(user, metrics=user_metrics)
+            candidate = recommend_break(context)
+            if candidate is None:
+                logger.warning(f"No recommendation window found for user {user.id}")
+                return None
 
             # Persist recommendation
             recommendation = BreakRecommendation.objects.create(
                 user=user,
-                recommended_start_date=optimized_start,
-                recommended_end_date=optimized_end,
-                predicted_length_days=recommendation_data.get(
-                    "predicted_length_days",
-                    (optimized_end - optimized_start).days,
-                ),
-                recommended_season=recommendation_data.get("recommended_season"),
-                message=recommendation_data.get("message", ""),
+                recommended_start_date=candidate.start,
+                recommended_end_date=candidate.end,
+                predicted_length_days=candidate.rest_days,
+                recommended_season=candidate.season,
+                message=candidate.description,
             )
 
             return recommendation
 
-        except UserMetrics.DoesNotExist:
-            logger.warning(
-                f"Cannot generate recommendation — metrics missing for user {user.id}"
-            )
-            return None
-
         except Exception as e:
             logger.error(
                 f"Error generating recommendation for user {user.id}: {str(e)}",
@@ -106,52 +89,43 @@ class RecommendationService:
             return None
 
     # ------------------------------------------------------------------
-    # Holiday optimization
+    # Recent recommendation lookup
     # ------------------------------------------------------------------
     @staticmethod
-    def optimize_around_holidays(
-        user: User, start_date: date, end_date: date
-    ) -> tuple[date, date]:
+    def get_recent_recommendation(
+        user: User, user_metrics: UserMetrics | None = None
+    ) -> BreakRecommendation | None:
         """
-        Adjust break dates to include nearby public holidays (+/- 14 days).
+        Latest recommendation still inside the throttle window.
+        Follows the UserMetrics pointer (primary-key fetch) when available,
+        otherwise falls back to the (user, -created_at) index.
         """
-        try:
-            calendar = PublicHolidayCalendar.objects.filter(user=user).first()
-            if not calendar or not calendar.is_enabled:
-                return start_date, end_date
-
-            search_start = start_date - timedelta(days=14)
-            search_end = end_date + timedelta(days=14)
-
-            holidays = list(
-                calendar.holidays.filter(
-                    date__gte=search_start,
-                    date__lte=search_end,
-                ).values_list("date", flat=True)
-            )
-
-            if not holidays:
-                return start_date, end_date
-
-            closest_holiday = min(
-                holidays, key=lambda d: abs((d - start_date).days)
-            )
+        cutoff = timezone.now() - timedelta(days=RECOMMENDATION_THROTTLE_DAYS)
+
+        if user_metrics is not None:
+            if user_metrics.latest_recommendation_id is None:
+                return None
+            return BreakRecommendation.objects.filter(
+                pk=user_metrics.latest_recommendation_id,
+                created_at__gte=cutoff,
+            ).first()
 
-            if abs((closest_holiday - start_date).days) <= 3:
-                if closest_holiday < start_date:
-                    delta = start_date - closest_holiday
-                    return closest_holiday, end_date + delta
-                else:
-                    delta = closest_holiday - start_date
-                    return start_date, end_date + delta
+        return RecommendationService.latest_recommendation(user, since=cutoff)
 
-            return start_date, end_date
+    @staticmethod
+    def latest_recommendation(user, since=None) -> BreakRecommendation | None:
+        """Newest recommendation for a user, served by the (user, -created_at) index."""
+        qs = BreakRecommendation.objects.filter(user=user)
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        return qs.order_by("-created_at").first()
 
-        except Exception as e:
-            logger.warning(
-                f"Holiday optimization failed for user {user.id}: {str(e)}"
-            )
-            return start_date, end_date
+    @staticmethod
+    def refresh_latest_pointer(user) -> None:
+        """Re-point UserMetrics.latest_recommendation at the newest row."""
+        UserMetrics.objects.filter(user=user).update(
+            latest_recommendation=RecommendationService.latest_recommendation(user)
+        )
 
     # ------------------------------------------------------------------
     # Recommendation → BreakPlan
@@ -0,0 +1,153 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models.break_models import BreakSuggestion
+from ..models.leave_balance_models import LeaveBalance
+from ..models.working_pattern_models import WorkingPattern, WorkingDay
+from ..models.date_models import BlackoutDate, SpecialDate
+from ..models.mood_models import Mood
+from ..ml_engine.recommendation_engine import (
+    UserContext,
+    STANDARD_WEEK,
+    STANDARD_WEEK_ANCHOR,
+    recommend,
+)
+from .recommendation_service import RecommendationService
+from .user_metrics_service import UserMetricsService
+from .holiday_service import HolidayService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUGGESTION_COUNT = 3
+SUGGESTION_HORIZON_DAYS = 180
+
+WEEKDAY_INDEX = {day.value: i for i, day in enumerate(WorkingDay)}
+
+
+class SuggestionService:
+    """
+    Single entry point for break suggestions.
+    Loads the user's context once and hands it to the pure
+    recommendation engine (ML, holidays, leave optimizer, heuristics).
+    """
+
+    # ------------------------------------------------------------------
+    # Context loading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def load_context(user, today=None, metrics=None) -> UserContext:
+        today = today or timezone.localdate()
+        horizon_end = today + timedelta(days=SUGGESTION_HORIZON_DAYS)
+
+        balance = LeaveBalance.objects.filter(user=user).first()
+        pattern = WorkingPattern.objects.filter(user=user).first()
+        metrics = metrics or UserMetricsService.get_fresh(user)
+        work_cycle, cycle_anchor = SuggestionService._work_cycle(pattern)
+
+        blackouts = tuple(
+            (
+                timezone.localtime(start).date(),
+                timezone.localtime(end or start).date(),
+            )
+            for start, end in BlackoutDate.objects.filter(
+                Q(end_date__date__gte=today) | Q(end_date__isnull=True, start_date__date__gte=today),
+                user=user,
+                start_date__date__lte=horizon_end,
+            ).values_list("start_date", "end_date")
+        )
+
+        special_dates = tuple(
+            SpecialDate.objects.filter(
+                user=user,
+                date__range=(today, horizon_end),
+            ).values_list("date", "title")
+        )
+
+        holidays = tuple(
+            (h.date, h.name)
+            for h in HolidayService.for_user(user, today, horizon_end)
+        )
+
+        recent_mood = (
+            Mood.objects.filter(user=user)
+            .order_by("-created_at")
+            .values_list("mood_type", flat=True)
+            .first()
+        )
+
+        return UserContext(
+            today=today,
+            leave_balance=balance.anual_leave_balance if balance else None,
+            metrics=RecommendationService.get_user_input_dict(metrics),
+            break_type=metrics.break_type_preference,
+            work_cycle=work_cycle,
+            cycle_anchor=cycle_anchor,
+            blackouts=blackouts,
+            special_dates=special_dates,
+            holidays=holidays,
+            recent_mood=recent_mood,
+            horizon_days=SUGGESTION_HORIZON_DAYS,
+        )
+
+    @staticmethod
+    def _work_cycle(pattern):
+        """Repeating on/off cycle and its anchor date for a WorkingPattern."""
+        standard = (STANDARD_WEEK, STANDARD_WEEK_ANCHOR)
+
+        if pattern is None:
+            return standard
+
+        if pattern.pattern_type == "custom" and pattern.custom_days:
+            days = {WEEKDAY_INDEX[d] for d in pattern.custom_days if d in WEEKDAY_INDEX}
+            return tuple(i in days for i in range(7)), STANDARD_WEEK_ANCHOR
+
+        if pattern.pattern_type == "shift" and pattern.start_date:
+            if pattern.shift_preview:
+                cycle = tuple(
+                    str(day).upper() == "ON"
+                    for week in pattern.shift_preview
+                    for day in week
+                )
+                if cycle:
+                    return cycle, pattern.start_date
+            if pattern.days_on and pattern.days_off is not None:
+                cycle = (True,) * pattern.days_on + (False,) * pattern.days_off
+                return cycle, pattern.start_date
+
+        return standard
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    @staticmethod
+    def generate(user, limit=DEFAULT_SUGGESTION_COUNT, context=None) -> list[BreakSuggestion]:
+        """Rank candidates from every generator and persist the top ``limit`` in one insert."""
+        context = context or SuggestionService.load_context(user)
+        candidates = recommend(context, limit=limit)
+
+        suggestions = [
+            BreakSuggestion(
+                user=user,
+                title=c.title,
+                description=c.description,
+                start_date=c.start,
+                end_date=c.end,
+                reason=c.reason,
+                priority=int(round(c.score)),
+                based_on_mood=c.based_on_mood,
+                based_on_workload=c.based_on_workload,
+                based_on_preferences=c.based_on_preferences,
+                based_on_weather=False,
+            )
+            for c in candidates
+        ]
+
+        BreakSuggestion.objects.bulk_create(suggestions)
+
+        logger.info(
+            f"Generated {len(suggestions)} break suggestion(s) for user {user.id}"
+        )
+        return suggestions
@@ -1,33 +1,117 @@
 # services/user_metrics_service.py
 
-from datetime import timedelta
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 # from django.db.models import Count
 
-from ..models.recommendation_models import UserMetrics
+from ..models.recommendation_models import UserMetrics, BreakRecommendation
 from ..models.preference_models import BreakPreferences
 from ..models.date_models import DateEntry, SpecialDate, BlackoutDate
 from ..models.working_pattern_models import WorkingPattern
 from ..models.optimization_goal_models import OptimizationGoal
 from ..models.mood_models import Mood
 from ..models.break_execution import BreakExecution
-
+from ..ml_engine.decay_estimator import DecayedEstimator
+
+
+MOOD_STRESS_WEIGHTS = {
+    "happy": 2,
+    "excited": 3,
+    "neutral": 5,
+    "sad": 7,
+    "anxious": 8,
+    "angry": 9,
+}
+NEGATIVE_MOODS = ("sad", "anxious", "angry")
+
+# Each taken break reduces stress, missed increases it
+TAKEN_STRESS_ADJUSTMENT = -2.0
+MISSED_STRESS_ADJUSTMENT = 1.5
+
+WORK_HOURS_WINDOW_DAYS = 14
+
+# Time constants equal the old hard windows, so the steady-state decayed
+# counts match what the 14/7-day windows used to count.
+STRESS_ESTIMATOR = DecayedEstimator(time_constant_days=14)
+SLEEP_ESTIMATOR = DecayedEstimator(time_constant_days=7)
+ESTIMATORS = {"stress": STRESS_ESTIMATOR, "sleep": SLEEP_ESTIMATOR}
+
+# Older history contributes < e^-6 and is skipped when backfilling
+BACKFILL_HORIZON_DAYS = 14 * 6
+
+# Below this decayed mood weight the user is treated as having no moods
+MIN_MOOD_WEIGHT = 0.25
+
+# Decayed sums kept in UserMetrics.decay_state
+#   stress.ms  - mood stress weights        (at mood time)
+#   stress.mw  - mood count                 (at mood time)
+#   stress.ba  - break stress adjustments   (at recommended_start)
+#   sleep.neg  - negative moods             (at mood time)
+#   sleep.mw   - mood count                 (at mood time)
+#   sleep.tk   - taken breaks               (at actual_start)
+#   pending    - {group: {"key@epoch": value}} of observations dated after
+#                decay_updated_at, counted once it passes them
+#
+# Day-bucket counters kept in UserMetrics.rolling_buckets
+#   th  - hours of taken breaks          (by actual_start)
 
 
 class UserMetricsService:
     """
     Builds system-derived metrics used by the recommendation engine.
+
+    Stress and sleep come from exponentially decayed estimators, and work
+    hours from per-day counters, both stored on the metrics row. Mood and
+    BreakExecution signals update them in O(1); ``build`` backfills them
+    from history.
     """
 
     @staticmethod
+    def get_fresh(user) -> UserMetrics:
+        """
+        Return the user's metrics, rebuilding only when missing, when an
+        input changed since the last build, or when older than the TTL.
+        A fresh row costs a single fetch.
+        """
+        metrics = UserMetrics.objects.filter(user=user).first()
+
+        if metrics is None or UserMetricsService.is_stale(metrics):
+            return UserMetricsService.build(user)
+        return metrics
+
+    @staticmethod
+    def is_stale(metrics: UserMetrics) -> bool:
+        if metrics.is_dirty or metrics.computed_at is None:
+            return True
+
+        ttl = timedelta(seconds=getattr(settings, "USER_METRICS_TTL_SECONDS", 24 * 3600))
+        return timezone.now() - metrics.computed_at > ttl
+
+    @staticmethod
+    def mark_stale(user) -> int:
+        """Bump the inputs version so the next read rebuilds."""
+        return UserMetrics.objects.filter(user=user).update(
+            inputs_version=F("inputs_version") + 1
+        )
+
+    @staticmethod
+    @transaction.atomic
     def build(user) -> UserMetrics:
-        
-        metrics, _ = UserMetrics.objects.get_or_create(user=user)
+
+        # Row lock keeps concurrent version bumps from being overwritten
+        metrics, _ = UserMetrics.objects.select_for_update().get_or_create(user=user)
 
         # --------------------------------------------------
-        # 1. Work hours per week (WorkingPattern)
+        # 1. Rolling buckets + decayed estimators (backfill)
         # --------------------------------------------------
-        metrics.work_hours_per_week = UserMetricsService._calculate_work_hours(user)
+        now = timezone.now()
+        metrics.rolling_buckets = UserMetricsService._backfill_buckets(user)
+        metrics.decay_state = UserMetricsService._backfill_decay_state(user, now)
+        metrics.decay_updated_at = now
 
         # --------------------------------------------------
         # 2. Break preferences
@@ -45,24 +129,391 @@ class UserMetricsService:
             metrics.season_preference = "no_preference"
 
         # --------------------------------------------------
-        # 4. Stress level (Mood-driven)
+        # 4. Work hours, stress level, sleep quality
         # --------------------------------------------------
-        metrics.stress_level = UserMetricsService._calculate_stress(user)
+        UserMetricsService._derive(
+            metrics, base_hours=UserMetricsService._base_work_hours(user)
+        )
 
         # --------------------------------------------------
-        # 5. Sleep quality (derived from mood & stability)
+        # 5. Latest recommendation pointer
         # --------------------------------------------------
-        metrics.sleep_quality = UserMetricsService._calculate_sleep_quality(user)
+        metrics.latest_recommendation = (
+            BreakRecommendation.objects.filter(user=user).order_by("-created_at").first()
+        )
+
+        metrics.computed_version = metrics.inputs_version
+        metrics.computed_at = now
 
         metrics.save()
         return metrics
 
+    # ============================
+    # Incremental maintenance
+    # ============================
+
+    @staticmethod
+    def record_mood(user, mood_type, created_at, sign: int = 1, backfill_missing: bool = True):
+        """Apply (or with ``sign=-1`` revert) one mood check-in."""
+        observations = UserMetricsService.mood_observations(mood_type, created_at, sign)
+        return UserMetricsService._apply(
+            user,
+            observations=observations,
+            backfill_missing=backfill_missing,
+        )
+
+    @staticmethod
+    def record_break_change(user, old_values: dict, new_values: dict, backfill_missing: bool = True):
+        """
+        Move a BreakExecution's contribution from its old to its new
+        ``status``/``recommended_start``/``actual_start``/``actual_end``.
+        """
+        observations = (
+            UserMetricsService.break_observations(old_values, sign=-1)
+            + UserMetricsService.break_observations(new_values)
+        )
+        delta = {}
+        UserMetricsService._merge(delta, UserMetricsService.break_delta(old_values, sign=-1))
+        UserMetricsService._merge(delta, UserMetricsService.break_delta(new_values))
+
+        return UserMetricsService._apply(
+            user,
+            delta=delta,
+            observations=observations,
+            affects_work_hours=bool(delta),
+            backfill_missing=backfill_missing,
+        )
+
+    @staticmethod
+    def _apply(user, delta=None, observations=None, affects_work_hours=False, backfill_missing=True):
+        """
+        Merge a {day: {counter: n}} bucket delta and a list of decayed
+        observations into the user's metrics row and re-derive the scores.
+        ``user`` may be a User instance or its id.
+        """
+        if not delta and not observations:
+            return None
+
+        with transaction.atomic():
+            metrics = (
+                UserMetrics.objects.select_for_update()
+                .filter(user=user)
+                .first()
+            )
+
+            # No state yet: a full backfill already includes this change
+            if metrics is None:
+                if backfill_missing:
+                    return UserMetricsService.build(user)
+                return None
+
+            update_fields = [
+                "rolling_buckets", "decay_state", "decay_updated_at",
+                "decayed_stress", "decayed_sleep",
+                "stress_level", "sleep_quality",
+                "inputs_version", "computed_version", "updated_at",
+            ]
+
+            # The delta keeps a fresh row fresh; a dirty one stays dirty
+            was_fresh = not metrics.is_dirty
+            metrics.inputs_version += 1
+            if was_fresh:
+                metrics.computed_version = metrics.inputs_version
+
+            UserMetricsService._merge(metrics.rolling_buckets, delta or {})
+
+            now = timezone.now()
+            UserMetricsService._advance(metrics, now)
+            for observation in observations or []:
+                UserMetricsService._observe(metrics.decay_state, now, *observation)
+
+            base_hours = None
+            if affects_work_hours:
+                base_hours = UserMetricsService._base_work_hours(metrics.user)
+                update_fields.append("work_hours_per_week")
+
+            UserMetricsService._derive(metrics, base_hours=base_hours)
+            metrics.save(update_fields=update_fields)
+
+        return metrics
+
+    @staticmethod
+    def mood_observations(mood_type, created_at, sign: int = 1) -> list:
+        """Decayed-estimator observations ``(group, key, value, time)`` of one mood."""
+        event_time = created_at or timezone.now()
+        observations = [
+            ("stress", "ms", MOOD_STRESS_WEIGHTS.get(mood_type, 5) * sign, event_time),
+            ("stress", "mw", sign, event_time),
+            ("sleep", "mw", sign, event_time),
+        ]
+        if mood_type in NEGATIVE_MOODS:
+            observations.append(("sleep", "neg", sign, event_time))
+        return observations
+
+    @staticmethod
+    def break_observations(values: dict, sign: int = 1) -> list:
+        """Decayed-estimator observations of one BreakExecution outcome."""
+        status = values.get("status")
+        if status not in ("taken", "missed"):
+            return []
+
+        observations = []
+        recommended_start = values.get("recommended_start")
+        if recommended_start:
+            adjustment = TAKEN_STRESS_ADJUSTMENT if status == "taken" else MISSED_STRESS_ADJUSTMENT
+            observations.append(
+                ("stress", "ba", adjustment * sign, UserMetricsService._as_datetime(recommended_start))
+            )
+
+        actual_start = values.get("actual_start")
+        if status == "taken" and actual_start:
+            observations.append(
+                ("sleep", "tk", sign, UserMetricsService._as_datetime(actual_start))
+            )
+        return observations
+
+    @staticmethod
+    def break_delta(values: dict, sign: int = 1) -> dict:
+        """Work-hours bucket contribution of one BreakExecution."""
+        if values.get("status") != "taken":
+            return {}
+
+        actual_start = values.get("actual_start")
+        actual_end = values.get("actual_end")
+        if not actual_start or not actual_end:
+            return {}
+
+        hours = (
+            UserMetricsService._as_date(actual_end)
+            - UserMetricsService._as_date(actual_start)
+        ).total_seconds() / 3600
+        if not hours:
+            return {}
+
+        return {UserMetricsService._day_key(actual_start): {"th": hours * sign}}
+
+    @staticmethod
+    def roll_forward(batch_size: int = 500) -> int:
+        """
+        Nightly maintenance: drop buckets that left the work-hours window
+        and decay every estimator to now, re-deriving the scores in bulk.
+        Returns number of rows updated.
+        """
+        cutoff = UserMetricsService._window_start(WORK_HOURS_WINDOW_DAYS)
+        now = timezone.now()
+        updated = 0
+        batch = []
+
+        metrics_qs = UserMetrics.objects.select_related("user__working_pattern")
+        for metrics in metrics_qs.iterator(chunk_size=batch_size):
+            buckets = metrics.rolling_buckets or {}
+            expired = [day for day in buckets if day < cutoff]
+
+            if not expired and not metrics.decay_state:
+                continue
+
+            for day in expired:
+                del buckets[day]
+
+            UserMetricsService._advance(metrics, now)
+            UserMetricsService._derive(
+                metrics,
+                base_hours=UserMetricsService._base_work_hours(metrics.user),
+            )
+            batch.append(metrics)
+
+            if len(batch) >= batch_size:
+                updated += UserMetricsService._flush(batch)
+                batch = []
+
+        if batch:
+            updated += UserMetricsService._flush(batch)
+
+        return updated
+
     # ============================
     # Helpers
     # ============================
 
     @staticmethod
-    def _calculate_work_hours(user) -> int:
+    def _flush(batch) -> int:
+        UserMetrics.objects.bulk_update(
+            batch,
+            [
+                "rolling_buckets", "decay_state", "decay_updated_at",
+                "decayed_stress", "decayed_sleep",
+                "work_hours_per_week", "stress_level", "sleep_quality",
+            ],
+        )
+        return len(batch)
+
+    @staticmethod
+    def _backfill_buckets(user) -> dict:
+        since = timezone.now() - timedelta(days=WORK_HOURS_WINDOW_DAYS)
+        buckets = {}
+
+        breaks = BreakExecution.objects.filter(
+            user=user,
+            status="taken",
+            actual_start__gte=since,
+        ).values(*BreakExecution.METRICS_FIELDS)
+
+        for values in breaks:
+            UserMetricsService._merge(buckets, UserMetricsService.break_delta(values))
+
+        return buckets
+
+    @staticmethod
+    def _backfill_decay_state(user, now) -> dict:
+        """Vectorised decayed sums over the user's history."""
+        since = now - timedelta(days=BACKFILL_HORIZON_DAYS)
+        observations = defaultdict(lambda: ([], []))
+
+        moods = Mood.objects.filter(
+            user=user,
+            created_at__gte=since
+        ).order_by("created_at").values_list("mood_type", "created_at")
+
+        breaks = BreakExecution.objects.filter(
+            Q(recommended_start__gte=since) | Q(actual_start__gte=since),
+            user=user,
+            status__in=["taken", "missed"],
+        ).values(*BreakExecution.METRICS_FIELDS)
+
+        for mood_type, created_at in moods:
+            for group, key, value, event_time in UserMetricsService.mood_observations(mood_type, created_at):
+                timestamps, values = observations[(group, key)]
+                timestamps.append(event_time.timestamp())
+                values.append(value)
+
+        for break_values in breaks:
+            for group, key, value, event_time in UserMetricsService.break_observations(break_values):
+                timestamps, values = observations[(group, key)]
+                timestamps.append(event_time.timestamp())
+                values.append(value)
+
+        state = {}
+        now_ts = now.timestamp()
+        for (group, key), (timestamps, values) in observations.items():
+            estimator = ESTIMATORS[group]
+            state.setdefault(group, {})[key] = estimator.backfill(now_ts, timestamps, values)
+            for event_ts, value in zip(timestamps, values):
+                if event_ts > now_ts:
+                    estimator.defer(
+                        state.setdefault("pending", {}).setdefault(group, {}), key, value, event_ts
+                    )
+        return state
+
+    @staticmethod
+    def _observe(state: dict, now, group, key, value, event_time):
+        """Count one observation in ``state`` as of ``now``, or defer it if later."""
+        estimator = ESTIMATORS[group]
+        if event_time > now:
+            estimator.defer(
+                state.setdefault("pending", {}).setdefault(group, {}),
+                key,
+                value,
+                event_time.timestamp(),
+            )
+        else:
+            estimator.observe(
+                state.setdefault(group, {}),
+                key,
+                value,
+                age_seconds=(now - event_time).total_seconds(),
+            )
+
+    @staticmethod
+    def _advance(metrics: UserMetrics, now):
+        """Decay the stored estimator sums forward to ``now``."""
+        state = metrics.decay_state or {}
+        if metrics.decay_updated_at:
+            elapsed = (now - metrics.decay_updated_at).total_seconds()
+            if elapsed > 0:
+                for group, estimator in ESTIMATORS.items():
+                    if group in state:
+                        state[group] = estimator.advance(state[group], elapsed)
+
+        # Deferred observations whose time has come
+        pending = state.pop("pending", {})
+        for group, slots in pending.items():
+            ESTIMATORS[group].release(state.setdefault(group, {}), slots, now.timestamp())
+        pending = {group: slots for group, slots in pending.items() if slots}
+        if pending:
+            state["pending"] = pending
+        metrics.decay_state = state
+        metrics.decay_updated_at = now
+        return metrics
+
+    @staticmethod
+    def _merge(buckets: dict, delta: dict):
+        for day, counts in delta.items():
+            bucket = buckets.setdefault(day, {})
+            for key, value in counts.items():
+                total = bucket.get(key, 0) + value
+                if total:
+                    bucket[key] = total
+                else:
+                    bucket.pop(key, None)
+            if not bucket:
+                del buckets[day]
+        return buckets
+
+    @staticmethod
+    def _window_totals(buckets: dict, days: int) -> dict:
+        cutoff = UserMetricsService._window_start(days)
+        totals = defaultdict(float)
+        for day, counts in buckets.items():
+            if day >= cutoff:
+                for key, value in counts.items():
+                    totals[key] += value
+        return totals
+
+    @staticmethod
+    def _derive(metrics: UserMetrics, base_hours=None):
+        if base_hours is not None:
+            two_weeks = UserMetricsService._window_totals(
+                metrics.rolling_buckets or {}, WORK_HOURS_WINDOW_DAYS
+            )
+            metrics.work_hours_per_week = UserMetricsService._calculate_work_hours(
+                base_hours, two_weeks
+            )
+
+        state = metrics.decay_state or {}
+        metrics.decayed_stress = UserMetricsService._calculate_stress(state.get("stress", {}))
+        metrics.decayed_sleep = UserMetricsService._calculate_sleep_quality(state.get("sleep", {}))
+
+        # round() first so float noise like 6.9999999 doesn't floor a level away
+        metrics.stress_level = max(1, min(10, int(round(metrics.decayed_stress, 6))))
+        metrics.sleep_quality = max(1, min(10, int(round(metrics.decayed_sleep, 6))))
+        return metrics
+
+    @staticmethod
+    def _window_start(days: int) -> str:
+        return (timezone.now() - timedelta(days=days)).date().isoformat()
+
+    @staticmethod
+    def _as_date(value):
+        if isinstance(value, datetime):
+            return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        if isinstance(value, str):
+            return date.fromisoformat(value[:10])
+        return value
+
+    @staticmethod
+    def _as_datetime(value):
+        if isinstance(value, datetime):
+            return value if timezone.is_aware(value) else timezone.make_aware(value)
+        return timezone.make_aware(datetime.combine(UserMetricsService._as_date(value), time.min))
+
+    @staticmethod
+    def _day_key(value):
+        if not value:
+            return None
+        return UserMetricsService._as_date(value).isoformat()
+
+    @staticmethod
+    def _base_work_hours(user) -> int:
         pattern = getattr(user, "working_pattern", None)
         base_hours = 40
 
@@ -73,91 +524,44 @@ class UserMetricsService:
             elif pattern.pattern_type == "shift" and pattern.days_on:
                 base_hours = min(60, pattern.days_on * 8)
 
-        # ---- Reduce hours by taken breaks (last 14 days) ----
-        taken_breaks = BreakExecution.objects.filter(
-            user=user,
-            status="taken",
-            actual_start__gte=timezone.now() - timedelta(days=14)
-        )
+        return base_hours
 
-        break_hours = 0
-        for b in taken_breaks:
-            if b.actual_start and b.actual_end:
-                break_hours += (b.actual_end - b.actual_start).total_seconds() / 3600
+    @staticmethod
+    def _calculate_work_hours(base_hours: int, totals: dict) -> int:
+        # ---- Reduce hours by taken breaks (last 14 days) ----
+        break_hours = totals.get("th", 0)
 
         adjusted_hours = max(20, int(base_hours - break_hours))
         return adjusted_hours
 
 
     @staticmethod
-    def _calculate_stress(user) -> int:
-        recent_moods = Mood.objects.filter(
-            user=user,
-            created_at__gte=timezone.now() - timedelta(days=14)
-        )
-
-        mood_weights = {
-            "happy": 2,
-            "excited": 3,
-            "neutral": 5,
-            "sad": 7,
-            "anxious": 8,
-            "angry": 9,
-        }
-
-        # ---- Base stress from mood ----
-        if recent_moods.exists():
-            mood_score = sum(mood_weights[m.mood_type] for m in recent_moods)
-            mood_stress = mood_score // recent_moods.count()
+    def _calculate_stress(sums: dict) -> float:
+        # ---- Base stress from decayed mood average ----
+        mood_weight = sums.get("mw", 0.0)
+        if mood_weight >= MIN_MOOD_WEIGHT:
+            mood_stress = sums.get("ms", 0.0) / mood_weight
         else:
-            mood_stress = 5
-
-        # ---- Break influence ----
-        breaks = BreakExecution.objects.filter(
-            user=user,
-            recommended_start__gte=timezone.now() - timedelta(days=14)
-        )
+            mood_stress = 5.0
 
-        taken = breaks.filter(status="taken").count()
-        missed = breaks.filter(status="missed").count()
+        # ---- Break influence (decayed taken/missed adjustments) ----
+        final_stress = mood_stress + sums.get("ba", 0.0)
 
-        # Each taken break reduces stress, missed increases it
-        stress_adjustment = (missed * 1.5) - (taken * 2)
-
-        final_stress = mood_stress + stress_adjustment
-
-        return max(1, min(10, int(final_stress)))
+        return max(1.0, min(10.0, final_stress))
 
 
 
     @staticmethod
-    def _calculate_sleep_quality(user) -> int:
-        last_7_days = timezone.now() - timedelta(days=7)
-
-        moods = Mood.objects.filter(
-            user=user,
-            created_at__gte=last_7_days
-        )
-
-        breaks = BreakExecution.objects.filter(
-            user=user,
-            status="taken",
-            actual_start__gte=last_7_days
-        )
-
-        # ---- Base quality from mood ----
-        if moods.exists():
-            negative = moods.filter(
-                mood_type__in=["sad", "anxious", "angry"]
-            ).count()
-            base_quality = 10 - negative
+    def _calculate_sleep_quality(sums: dict) -> float:
+        # ---- Base quality from decayed negative moods ----
+        if sums.get("mw", 0.0) >= MIN_MOOD_WEIGHT:
+            base_quality = 10.0 - sums.get("neg", 0.0)
         else:
-            base_quality = 5
+            base_quality = 5.0
 
         # ---- Boost from breaks taken ----
-        break_bonus = min(3, breaks.count())
+        break_bonus = min(3.0, sums.get("tk", 0.0))
 
         final_quality = base_quality + break_bonus
 
-        return max(1, min(10, final_quality))
-
+        return max(1.0, min(10.0, final_quality))
@@ -1,6 +1,7 @@
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
 # from django.conf import settings
+from django.db import transaction
 # from .models import LeaveBalance
 # from datetime import date
 
@@ -13,63 +14,67 @@
 #         )
 
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.signals import user_logged_in
 from django.dispatch import receiver
 from django.conf import settings
 import logging
-from .models.holiday_models import PublicHolidayCalendar
-from .tasks.holiday_tasks import sync_user_holidays
-from .utils.contry_code_resolution import update_user_location
+from .services.holiday_service import HolidayService
+from .services.location_service import LocationService
 
 
 
 from .models.break_execution import BreakExecution
+from .models.mood_models import Mood
+from .models.preference_models import BreakPreferences, UserNotificationPreference
+from .models.device_models import DeviceToken
+from .models.optimization_goal_models import OptimizationGoal
+from .models.working_pattern_models import WorkingPattern
+from .models.recommendation_models import UserMetrics, BreakRecommendation
 from .tasks.break_lifecycle_tasks import process_break_completion_async
+from .services.user_metrics_service import UserMetricsService
+from .services.recommendation_service import RecommendationService
+from .services.break_reminder_service import BreakReminderService
+from .services.recipient_cache import PREFERENCES_CACHE, DEVICE_TOKENS_CACHE
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_calendar_and_sync(sender, instance, created, **kwargs):
+def create_calendar_and_sync(sender, instance, created, update_fields=None, **kwargs):
     """
-    Ensure every user has a holiday calendar and queue sync.
-    Runs when a user is created or updated.
+    Ensure every user has a holiday calendar and queue a sync when the
+    user is created or their country_code / timezone changes. Other saves
+    (profile edits, OTPs, logins) leave the calendar alone.
     """
-    logger.info(f"Signal triggered for user {instance.id} - created: {created}")
+    fields = [f for f in sender.CALENDAR_FIELDS if update_fields is None or f in update_fields]
+    old_values = None if created else getattr(instance, "_loaded_calendar_values", None)
+    new_values = {f: getattr(instance, f) for f in fields}
+    instance._loaded_calendar_values = {**(old_values or {}), **new_values}
+
+    # New, or never loaded from the database: nothing to compare against
+    if old_values is None:
+        changed = set(fields)
+    else:
+        changed = {f for f in fields if old_values.get(f) != new_values[f]}
+    if not changed:
+        HolidayService.record_user_sync("unchanged")
+        return
+
+    logger.info(f"Calendar fields {sorted(changed)} changed for user {instance.id} - created: {created}")
 
     try:
-        # Always get or create the calendar through the helper
+        # Always get or create the calendar through the helper; a new one
+        # takes the user's country, else the one of their timezone
         calendar = instance.get_calendar()
 
-        # If user just created, pick country_code from timezone if possible
-        if created and instance.home_location_timezone:
-            try:
-                tz_parts = instance.home_location_timezone.split('/')
-                if len(tz_parts) > 1:
-                    region = tz_parts[0]
-                    city = tz_parts[1]
-
-                    # Very simplified mapping — you can expand
-                    if region == "America":
-                        calendar.country_code = "US"
-                    elif region == "Europe":
-                        if "London" in city:
-                            calendar.country_code = "GB"
-                        elif "Paris" in city or "Berlin" in city:
-                            calendar.country_code = "DE"
-                        elif "Madrid" in city:
-                            calendar.country_code = "ES"
-                        elif "Rome" in city:
-                            calendar.country_code = "IT"
-                calendar.save(update_fields=["country_code"])
-                logger.info(f"Country code set to {calendar.country_code} for user {instance.id}")
-            except Exception as e:
-                logger.warning(f"Could not map timezone {instance.home_location_timezone} for user {instance.id}: {e}")
-
-        # Always queue sync if calendar has a country_code
+        if "country_code" in changed and instance.country_code \
+                and calendar.country_code != instance.country_code:
+            calendar.country_code = instance.country_code
+            calendar.save(update_fields=["country_code", "updated_at"])
+
+        # Debounced: several saves in a row queue one sync
         if calendar.country_code:
-            task = sync_user_holidays.delay(instance.id, calendar.country_code)
-            logger.info(f"Celery task queued (ID: {task.id}) for user {instance.id}")
+            HolidayService.schedule_user_sync(instance.id)
         else:
             logger.warning(f"No country code set for user {instance.id}'s calendar")
 
@@ -84,15 +89,124 @@ def on_break_execution_update(sender, instance, created, **kwargs):
         process_break_completion_async.delay(instance.id)
 
 
+@receiver(post_save, sender=Mood)
+def update_metrics_on_mood(sender, instance, created, **kwargs):
+    """
+    Feed the mood check-in into the user's metrics estimators.
+    """
+    if not created:
+        return
+
+    UserMetricsService.record_mood(instance.user, instance.mood_type, instance.created_at)
+
+
+@receiver(post_delete, sender=Mood)
+def revert_metrics_on_mood_delete(sender, instance, **kwargs):
+    UserMetricsService.record_mood(
+        instance.user_id,
+        instance.mood_type,
+        instance.created_at,
+        sign=-1,
+        backfill_missing=False,
+    )
+
+
+@receiver(post_save, sender=BreakExecution)
+def schedule_break_reminders(sender, instance, created, **kwargs):
+    """
+    Schedule, move or cancel the break's reminders when it is approved,
+    re-dated or leaves the approved status. Keeps its own snapshot of the
+    loaded values, so it doesn't depend on the order receivers run in.
+    """
+    old_values = {} if created else getattr(instance, "_loaded_reminder_values", {})
+    new_values = {f: getattr(instance, f) for f in BreakExecution.REMINDER_FIELDS}
+    instance._loaded_reminder_values = new_values
+
+    if created:
+        changed = instance.status == "approved"
+    else:
+        changed = old_values != new_values
+
+    if changed:
+        BreakReminderService.sync(instance)
+
+
+@receiver(post_save, sender=BreakExecution)
+def update_metrics_on_break_execution(sender, instance, created, **kwargs):
+    """
+    Move the break's contribution in the user's metrics when its status
+    or dates change.
+    """
+    old_values = {} if created else getattr(instance, "_loaded_metrics_values", {})
+    new_values = {f: getattr(instance, f) for f in BreakExecution.METRICS_FIELDS}
+    instance._loaded_metrics_values = new_values
+
+    if old_values != new_values:
+        UserMetricsService.record_break_change(instance.user, old_values, new_values)
+
+
+@receiver(post_delete, sender=BreakExecution)
+def revert_metrics_on_break_execution_delete(sender, instance, **kwargs):
+    old_values = getattr(instance, "_loaded_metrics_values", None)
+    if old_values is None:
+        old_values = {f: getattr(instance, f) for f in BreakExecution.METRICS_FIELDS}
+
+    UserMetricsService.record_break_change(
+        instance.user_id, old_values, {}, backfill_missing=False
+    )
+
+
+
+@receiver([post_save, post_delete], sender=BreakPreferences)
+@receiver([post_save, post_delete], sender=OptimizationGoal)
+@receiver([post_save, post_delete], sender=WorkingPattern)
+def mark_metrics_stale(sender, instance, **kwargs):
+    """
+    Inputs that aren't applied incrementally only mark the metrics stale;
+    they are rebuilt lazily on the next read.
+    """
+    UserMetricsService.mark_stale(instance.user_id)
+
+
+
+@receiver(post_save, sender=BreakRecommendation)
+def point_metrics_at_new_recommendation(sender, instance, created, **kwargs):
+    if created:
+        UserMetrics.objects.filter(user_id=instance.user_id).update(
+            latest_recommendation=instance
+        )
+
+
+@receiver(post_delete, sender=BreakRecommendation)
+def repoint_metrics_on_recommendation_delete(sender, instance, **kwargs):
+    """The FK is nulled on delete; fall back to the next newest row."""
+    RecommendationService.refresh_latest_pointer(instance.user_id)
+
+
 
 @receiver(user_logged_in)
 def update_location_on_login(sender, request, user, **kwargs):
     """
-    Automatically update user location on login.
+    Update the user's location from the login request's headers, in the
+    background and only when they bring something new.
     """
 
     # Try to extract from request (if frontend sends it)
     timezone = request.headers.get("X-Timezone")
     coords = request.headers.get("X-Coordinates")  # format: "lat,lng"
 
-    update_user_location(user, timezone=timezone, coords=coords)
\ No newline at end of file
+    LocationService.schedule_login_update(user, timezone, coords)
+
+
+
+@receiver([post_save, post_delete], sender=UserNotificationPreference)
+def invalidate_cached_notification_preferences(sender, instance, **kwargs):
+    # Again after commit, in case a reader re-cached the old row meanwhile
+    PREFERENCES_CACHE.invalidate(instance.user_id)
+    transaction.on_commit(lambda: PREFERENCES_CACHE.invalidate(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=DeviceToken)
+def invalidate_cached_device_tokens(sender, instance, **kwargs):
+    DEVICE_TOKENS_CACHE.invalidate(instance.user_id)
+    transaction.on_commit(lambda: DEVICE_TOKENS_CACHE.invalidate(instance.user_id))
@@ -1,36 +1,9 @@
 from celery import shared_task
 from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
 from ..models.break_execution import BreakExecution
 from ..services.break_lifecycle_service import BreakLifecycleService
-from ..services.user_metrics_service import UserMetricsService
 from ..services.optimization_service import OptimizationService
-from ..services.notification_service import NotificationService
-
-
-# celery task
-
-def send_break_reminders():
-    tomorrow = timezone.now().date() + timedelta(days=1)
-
-    upcoming = BreakExecution.objects.filter(
-        status="approved",
-        recommended_start=tomorrow,
-    )
-
-    for br in upcoming:
-        NotificationService.notify(
-            user=br.user,
-            event="break_reminder",
-            title="Upcoming break ⏰",
-            message="You have a planned break starting tomorrow. Get ready!",
-            metadata={
-                "start": br.recommended_start.isoformat(),
-                "end": br.recommended_end.isoformat(),
-            },
-        )
-
 
 
 @shared_task(
@@ -45,7 +18,9 @@ def process_break_completion_async(self, break_execution_id):
     - BreakScore
     - StreakScore
     - OptimizationScore
-    - UserMetrics refresh
+
+    UserMetrics were already updated incrementally by the
+    BreakExecution post_save signal.
     """
 
     break_exec = BreakExecution.objects.select_related("user").get(
@@ -57,12 +32,9 @@ def process_break_completion_async(self, break_execution_id):
         return f"Break {break_exec.id} ignored (status={break_exec.status})"
 
     with transaction.atomic():
-        # 1️ Core scoring + streaks + optimization
+        # Core scoring + streaks + optimization
         BreakLifecycleService.process_break_completion(break_exec)
 
-        # 2️ Rebuild metrics (stress, sleep, work hours)
-        UserMetricsService.build(break_exec.user)
-
     return f"Break {break_exec.id} processed successfully"
 
 
@@ -75,9 +47,8 @@ def process_break_completion_async(self, break_execution_id):
 def process_missed_break_async(self, break_execution_id):
     """
     Processes a missed break:
-    - Marks as missed
+    - Marks as missed (metrics follow via the post_save signal)
     - Penalizes optimization score
-    - Refreshes metrics
     """
 
     break_exec = BreakExecution.objects.select_related("user").get(
@@ -99,9 +70,6 @@ def process_missed_break_async(self, break_execution_id):
             break_exec.recommended_start.date()
         )
 
-        # Rebuild metrics (stress ↑)
-        UserMetricsService.build(break_exec.user)
-
     return f"Break {break_exec.id} marked as missed"
 
 
@@ -1,9 +1,24 @@
 # tasks/break_reminder_tasks.py
 
 from celery import shared_task
-from ..services.break_reminder_service import send_break_reminders
+from ..services.break_reminder_service import BreakReminderService
 
 
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=60, retry_kwargs={"max_retries": 3})
-def send_break_reminders_task(self):
-    send_break_reminders()
+def send_break_reminder(self, reminder_id, scheduled_for):
+    """
+    ETA task queued by BreakReminderService.sync / queue_due. Safe to run more than
+    once (e.g. broker redelivery): the ledger lets only one run send.
+    """
+    if BreakReminderService.fire(reminder_id, scheduled_for):
+        return f"Reminder {reminder_id} sent"
+    return f"Reminder {reminder_id} skipped"
+
+
+@shared_task
+def queue_due_break_reminders():
+    """
+    Queue ETA tasks for reminders due soon, re-queue ones whose task was
+    lost and cancel those too late to send.
+    """
+    return BreakReminderService.queue_due()
@@ -1,70 +1,57 @@
-import requests
 import logging
 from celery import shared_task
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils.timezone import now
-from django.conf import settings
-from core.models.holiday_models import PublicHolidayCalendar, PublicHoliday
+from core.models.holiday_models import PublicHolidayCalendar
 from core.models.user_models import User
+from core.services.holiday_service import HolidayService, user_sync_key
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def sync_user_holidays(user_id, country_code):
+
+# Queued from request paths; nobody reads the result
+@shared_task(ignore_result=True)
+def sync_country_holidays(country_code, years=None):
+    """
+    Fetch one country's public holidays into the shared CountryHoliday
+    store (current and next year by default) and stamp its calendars.
+    """
+    result = HolidayService.sync_country(country_code, years)
+    calendars = 0
+    if not result["failed_years"]:
+        calendars = HolidayService.mark_calendars_synced([country_code])
+
+    return {"country_code": country_code, "calendars": calendars, **result}
+
+
+# Queued from request paths; nobody reads the result
+@shared_task(ignore_result=True)
+def sync_user_holidays(user_id, country_code=None):
     """
-    Fetch public holidays for current and next year from Nager.Date API
-    and store them in PublicHoliday table tied to the user's calendar.
+    Make sure the user's country is in the shared holiday store and mark
+    the calendar synced. Only fetches when the country is missing or stale,
+    so it is cheap for every user after the first in a country. Without
+    ``country_code`` the calendar's current country is used.
     """
+    # Requests arriving from now on need a new run
+    cache.delete(user_sync_key(user_id))
     logger.info(f"Starting sync_user_holidays task for user_id={user_id}, country_code={country_code}")
     try:
         user = User.objects.get(id=user_id)
         calendar = user.holiday_calendar
-        logger.info(f"Found user {user.email}")
 
         if not calendar or not calendar.is_enabled:
             logger.warning(f"No active holiday calendar for {user.email}")
             return f"No active holiday calendar for {user.email}"
 
-        current_year = now().year
-        years_to_fetch = [current_year, current_year + 1]
-        logger.info(f"Fetching holidays for years: {years_to_fetch}")
-
-        #  Clear out old holidays for this calendar (avoid duplicates if country changes)
-        calendar.holidays.all().delete()
-
-        created_count = 0
-        updated_count = 0
-        for year in years_to_fetch:
-            api_url = f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country_code}"
-            logger.info(f"Fetching holidays from: {api_url}")
-
-            try:
-                response = requests.get(api_url, timeout=10)
-                response.raise_for_status()
-                holidays_data = response.json()
-                logger.info(f"Successfully fetched {len(holidays_data)} holidays for {year}")
-            except Exception as e:
-                logger.error(f"Failed to fetch holidays for {year} ({country_code}): {str(e)}")
-                return f"Failed to fetch holidays for {year} ({country_code}): {str(e)}"
-
-            for holiday in holidays_data:
-                _, created = PublicHoliday.objects.update_or_create(
-                    calendar=calendar,
-                    country_code=country_code,
-                    date=holiday["date"],
-                    defaults={
-                        "name": holiday.get("localName", holiday.get("name", "Holiday")),
-                        "user": user,  # link back to user as well
-                    },
-                )
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-
-        logger.info(f"Created {created_count} and updated {updated_count} holidays for user_id={user_id}")
+        country_code = country_code or calendar.country_code
+        stale = HolidayService.stale_years(country_code, HolidayService.years_to_sync())
+        if stale:
+            HolidayService.sync_country(country_code, stale)
+
         calendar.last_synced = now()
         calendar.save(update_fields=["last_synced"])
-        logger.info(f"Updated last_synced timestamp for user_id={user_id}")
 
         return f"Holidays synced successfully for {user.email} ({country_code})"
 
@@ -78,24 +65,39 @@ def sync_user_holidays(user_id, country_code):
 
 @shared_task
 def refresh_all_user_holidays():
-    """Refresh holidays for all users with enabled holiday calendars."""
+    """
+    Monthly refresh: every (country, year) with enabled calendars is fetched
+    in one concurrent batch, so the refresh takes about as long as the
+    slowest request rather than the sum of them. Countries whose fetches
+    all succeeded get their calendars stamped.
+    """
     logger.info("Starting refresh_all_user_holidays task")
-    
-    try:
-        calendars = PublicHolidayCalendar.objects.filter(is_enabled=True)
-        logger.info(f"Found {calendars.count()} enabled holiday calendars")
-        
-        task_count = 0
-        for calendar in calendars:
-            if calendar.country_code:
-                task = sync_user_holidays.delay(calendar.user_id, calendar.country_code)
-                logger.info(f"Queued sync task {task.id} for user {calendar.user_id} with country {calendar.country_code}")
-                task_count += 1
-            else:
-                logger.warning(f"Calendar for user {calendar.user_id} has no country code")
-        
-        logger.info(f"Successfully queued {task_count} sync tasks")
-        return f"Refreshed holidays for {calendars.count()} users"
-    except Exception as e:
-        logger.error(f"Error in refresh_all_user_holidays: {str(e)}")
-        return f"Error refreshing holidays: {str(e)}"
+
+    per_country = dict(
+        PublicHolidayCalendar.objects.filter(is_enabled=True)
+        .exclude(country_code__isnull=True)
+        .exclude(country_code="")
+        .order_by()
+        .values_list("country_code")
+        .annotate(n=Count("id"))
+    )
+    missing_country = PublicHolidayCalendar.objects.filter(
+        Q(country_code__isnull=True) | Q(country_code=""),
+        is_enabled=True,
+    ).count()
+
+    years = HolidayService.years_to_sync()
+    results = HolidayService.sync_countries(list(per_country), years)
+    failed = sorted(code for code, result in results.items() if result["failed_years"])
+    synced = [code for code in per_country if code not in failed]
+
+    counts = {
+        "countries": len(per_country),
+        "calendars": sum(per_country.values()),
+        "calendars_without_country": missing_country,
+        "provider_calls": len(per_country) * len(years),
+        "calendars_synced": HolidayService.mark_calendars_synced(synced) if synced else 0,
+        "failed_countries": failed,
+    }
+    logger.info(f"Holiday refresh finished: {counts}")
+    return counts
@@ -0,0 +1,33 @@
+import logging
+from celery import shared_task
+from django.core.cache import cache
+from core.models.user_models import User
+from core.services.location_service import LocationService, login_update_key
+from core.utils.contry_code_resolution import update_user_location
+
+logger = logging.getLogger(__name__)
+
+
+# Nobody reads the result; skips subscribing to the result backend on publish
+@shared_task(ignore_result=True)
+def update_location_after_login(user_id, timezone=None, coords=None):
+    """
+    Fill in the user's home timezone / coordinates (and so their country)
+    from the headers of their latest login. Queued by
+    LocationService.schedule_login_update instead of running on login.
+    """
+    # Logins from now on need a new run
+    cache.delete(login_update_key(user_id))
+    timezone, coords = LocationService.latest_login_headers(user_id, timezone, coords)
+    try:
+        user = User.objects.get(id=user_id)
+        update_user_location(user, timezone=timezone, coords=coords)
+        LocationService.remember_login_headers(user_id, timezone, coords)
+        return f"Location updated for {user.email}"
+
+    except User.DoesNotExist:
+        logger.error(f"User {user_id} does not exist")
+        return f"User {user_id} does not exist"
+    except Exception as e:
+        logger.error(f"Failed updating location for user {user_id}: {str(e)}")
+        return f"Failed updating location for user {user_id}: {str(e)}"
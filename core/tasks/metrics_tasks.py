@@ -13,13 +13,15 @@ User = get_user_model()
 
 @shared_task
 def refresh_all_user_metrics():
-    User = get_user_model()
-    user_ids = User.objects.values_list("id", flat=True)
+    """
+    Nightly maintenance. Metrics are kept current by Mood/BreakExecution
+    signals, so this only expires old day buckets and decays the
+    stress/sleep estimators forward to now.
+    """
+    updated = UserMetricsService.roll_forward()
 
-    logger.info(f"🚀 Scheduling metrics refresh for {len(user_ids)} users")
-
-    for user_id in user_ids:
-        refresh_user_metrics.delay(str(user_id))
+    logger.info(f"🚀 Rolled metrics forward for {updated} users")
+    return f"Rolled metrics forward for {updated} users"
 
 
 # @shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={"max_retries": 3})
@@ -38,9 +40,8 @@ def refresh_all_user_metrics():
 
 @shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={"max_retries": 3})
 def refresh_user_metrics(self):
+    """Full rebuild (backfill) of every user's metrics from history."""
     for user in User.objects.all():
         UserMetricsService.build(user)
 
     return "Metrics refreshed"
-
-
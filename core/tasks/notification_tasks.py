@@ -1,43 +1,72 @@
 
 
 from celery import shared_task
-from django.utils import timezone
-from ..models.break_execution import BreakExecution
-from ..services.notification_service import NotificationService
 from django.contrib.auth import get_user_model
+from ..services.notification_service import (
+    NotificationService,
+    NotificationCRUDService,
+    NOTIFY_BATCH_SIZE,
+)
+from ..services.digest_service import WeeklyDigestService
+from ..services.notification_retention_service import NotificationRetentionService
 User = get_user_model()
 
 
 @shared_task
-def send_break_reminders():
-    now = timezone.now()
+def send_weekly_digest():
+    """
+    Weekly summary for every opted-in user, aggregated per chunk of
+    users and streamed into the notification outbox.
+    """
+    return WeeklyDigestService.send()
+
+
+# Bounds one drain run; the next kick or beat tick continues
+OUTBOX_MAX_BATCHES_PER_RUN = 20
 
-    upcoming = BreakExecution.objects.filter(
-        status="approved",
-        recommended_start__lte=now + timezone.timedelta(minutes=15),
-        recommended_start__gte=now,
-    )
 
-    for br in upcoming:
-        NotificationService.notify(
-            user=br.user,
-            event="break_reminder",
-            title="Upcoming break ⏳",
-            message="Your break starts in 15 minutes.",
-            metadata={"break_id": str(br.id)},
-        )
+# Kicked from request paths; nobody reads the result
+@shared_task(ignore_result=True)
+def deliver_pending_notifications(batch_size=NOTIFY_BATCH_SIZE):
+    """
+    Outbox consumer: claims pending notifications and delivers them.
+    Safe to run on many workers at once (rows are claimed with SKIP LOCKED).
+    """
+    delivered = 0
+    for _ in range(OUTBOX_MAX_BATCHES_PER_RUN):
+        processed = NotificationService.deliver_pending(batch_size)
+        delivered += processed
+        if processed < batch_size:
+            break
+    return delivered
+
+
+# Users recounted per transaction by the reconciliation job
+UNREAD_RECONCILE_CHUNK_SIZE = 1000
 
 
 @shared_task
-def send_weekly_digest():
-    users = User.objects.filter(
-        notification_preferences__weeklyDigest=True
-    )
-
-    for user in users:
-        NotificationService.notify(
-            user=user,
-            event="weekly_digest",
-            title="Your Weekly Break Summary 📊",
-            message="Here's how you did with breaks this week!",
-        )
\ No newline at end of file
+def reconcile_unread_counters(chunk_size=UNREAD_RECONCILE_CHUNK_SIZE):
+    """
+    Repair drift in the denormalized unread counters (admin bulk edits,
+    raw deletes, crashes between statements). Walks users by primary key.
+    """
+    repaired = 0
+    last_pk = None
+    users = User.objects.order_by("pk").values_list("pk", flat=True)
+
+    while True:
+        page = users if last_pk is None else users.filter(pk__gt=last_pk)
+        user_ids = list(page[:chunk_size])
+        if not user_ids:
+            break
+        repaired += NotificationCRUDService.reconcile_unread_counts(user_ids)
+        last_pk = user_ids[-1]
+
+    return repaired
+
+
+@shared_task
+def prune_notifications():
+    """Archive / delete notifications past their per-event retention."""
+    return NotificationRetentionService.prune()
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models.break_execution import BreakExecution
+from ..models.notification_models import BreakReminder, Notification
+from ..services.break_reminder_service import (
+    BreakReminderService,
+    REMINDER_MAX_LATENESS,
+    REMINDER_OVERDUE_GRACE,
+)
+
+User = get_user_model()
+
+
+@patch("core.tasks.break_reminder_tasks.send_break_reminder.apply_async")
+class BreakReminderSchedulingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="reminders@example.com",
+            password="testpassword",
+        )
+        User.objects.filter(pk=self.user.pk).update(home_location_timezone="Europe/Berlin")
+        self.user.refresh_from_db()
+
+        start = timezone.now().date() + timedelta(days=10)
+        self.break_exec = BreakExecution.objects.create(
+            user=self.user,
+            recommended_start=start,
+            recommended_end=start + timedelta(days=4),
+        )
+
+    def approve(self, **changes):
+        with self.captureOnCommitCallbacks(execute=True):
+            for field, value in {"status": "approved", **changes}.items():
+                setattr(self.break_exec, field, value)
+            self.break_exec.save()
+
+    def test_approval_schedules_eta_tasks_in_local_time(self, apply_async):
+        self.approve()
+
+        reminders = {r.kind: r for r in BreakReminder.objects.all()}
+        self.assertEqual(set(reminders), {"day_before", "day_of"})
+        # Days away: left in the ledger rather than held by the broker
+        apply_async.assert_not_called()
+
+        day_before = reminders["day_before"].scheduled_for
+        local = timezone.localtime(day_before, BreakReminderService._user_timezone(self.user))
+        self.assertEqual(local.date(), self.break_exec.recommended_start - timedelta(days=1))
+        self.assertEqual(local.hour, 9)
+
+        # Queued by the periodic job once close, and only once
+        soon = day_before - timedelta(minutes=10)
+        self.assertEqual(BreakReminderService.queue_due(now=soon)["queued"], 1)
+        self.assertEqual(BreakReminderService.queue_due(now=soon)["queued"], 0)
+        self.assertEqual(apply_async.call_args.kwargs["eta"], day_before)
+
+        # Saving again without a relevant change queues nothing new
+        apply_async.reset_mock()
+        self.approve()
+        apply_async.assert_not_called()
+
+    def test_lost_tasks_are_queued_again(self, apply_async):
+        self.approve()
+        day_before = BreakReminder.objects.get(kind="day_before").scheduled_for
+
+        # The publish fails: the next run retries
+        apply_async.side_effect = ConnectionError("broker down")
+        self.assertEqual(BreakReminderService.queue_due(now=day_before)["queued"], 0)
+        apply_async.side_effect = None
+        self.assertEqual(BreakReminderService.queue_due(now=day_before)["queued"], 1)
+
+        # Queued but never ran: queued again once its key expires after the grace period
+        late = day_before + REMINDER_OVERDUE_GRACE + timedelta(minutes=1)
+        cache.clear()
+        self.assertEqual(BreakReminderService.queue_due(now=late)["queued"], 1)
+
+        # Far too late to be useful: cancelled, not sent
+        result = BreakReminderService.queue_due(now=day_before + REMINDER_MAX_LATENESS + timedelta(minutes=1))
+        self.assertEqual(result["expired"], 1)
+        self.assertEqual(BreakReminder.objects.get(kind="day_before").status, "cancelled")
+
+    def test_reschedule_drops_stale_task_and_sends_once(self, apply_async):
+        self.approve()
+        old = BreakReminder.objects.get(kind="day_of")
+        old_eta = old.scheduled_for
+
+        self.approve(recommended_start=self.break_exec.recommended_start + timedelta(days=7))
+        new_eta = BreakReminder.objects.get(kind="day_of").scheduled_for
+        self.assertEqual(new_eta - old_eta, timedelta(days=7))
+
+        # The task queued for the old date wakes up and does nothing
+        self.assertFalse(BreakReminderService.fire(old.id, old_eta.isoformat(), now=new_eta))
+
+        # The current one sends exactly once, even if delivered twice
+        self.assertTrue(BreakReminderService.fire(old.id, new_eta.isoformat(), now=new_eta))
+        self.assertFalse(BreakReminderService.fire(old.id, new_eta.isoformat(), now=new_eta))
+
+        self.assertEqual(Notification.objects.filter(event="break_reminder").count(), 1)
+        self.assertEqual(BreakReminder.objects.get(kind="day_of").status, "sent")
+
+    def test_leaving_approved_cancels(self, apply_async):
+        self.approve()
+        reminder = BreakReminder.objects.get(kind="day_before")
+
+        self.break_exec.status = "rejected"
+        self.break_exec.save()
+
+        self.assertFalse(
+            BreakReminder.objects.filter(status="scheduled").exists()
+        )
+        self.assertFalse(
+            BreakReminderService.fire(reminder.id, reminder.scheduled_for, now=reminder.scheduled_for)
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_reminders_do_not_depend_on_receiver_order(self, apply_async):
+        from django.db.models.signals import post_save
+        from ..signals import schedule_break_reminders
+
+        # Run after the metrics receiver, which resets its own snapshot
+        post_save.disconnect(schedule_break_reminders, sender=BreakExecution)
+        post_save.connect(schedule_break_reminders, sender=BreakExecution)
+        self.addCleanup(post_save.connect, schedule_break_reminders, sender=BreakExecution)
+        self.addCleanup(post_save.disconnect, schedule_break_reminders, sender=BreakExecution)
+
+        self.approve()
+        self.assertEqual(BreakReminder.objects.filter(status="scheduled").count(), 2)
+
+        self.break_exec.status = "rejected"
+        self.break_exec.save()
+        self.assertFalse(BreakReminder.objects.filter(status="scheduled").exists())
@@ -0,0 +1,84 @@
+import csv
+import os
+import time
+
+from django.test import SimpleTestCase
+
+from ..utils.contry_code_resolution import (
+    TIMEZONE_COUNTRY_CODES,
+    _timezone_at,
+    coords_to_country_code,
+    detect_timezone_from_coords,
+    resolve_country_code,
+    timezone_to_country_code,
+)
+from ..utils.country_locator import get_country_locator
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "country_coordinates.csv")
+
+
+class CountryLocatorTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.locator = get_country_locator()
+        with open(FIXTURE, newline="", encoding="utf-8") as f:
+            cls.cities = [
+                (row["name"], row["country_code"], float(row["lat"]), float(row["lng"]))
+                for row in csv.DictReader(f)
+            ]
+
+    def test_fixture_accuracy(self):
+        # None of these cities is a reference point; the misses are all
+        # within a few dozen km of a border inside a shared timezone
+        misses = [
+            (name, expected, got)
+            for name, expected, lat, lng in self.cities
+            if (got := self.locator.country_at(lat, lng)) != expected
+        ]
+        accuracy = 1 - len(misses) / len(self.cities)
+        self.assertGreaterEqual(accuracy, 0.95, misses)
+
+    def test_lookup_is_sub_millisecond(self):
+        start = time.perf_counter()
+        for _, _, lat, lng in self.cities:
+            self.locator.country_at(lat, lng)
+        per_lookup = (time.perf_counter() - start) / len(self.cities)
+        self.assertLess(per_lookup, 0.001)
+
+    def test_shared_timezones_are_split_by_country(self):
+        # All of these share a merged timezone polygon
+        self.assertEqual(self.locator.country_at(52.52, 13.40), "DE")
+        self.assertEqual(self.locator.country_at(40.42, -3.70), "ES")
+        self.assertEqual(self.locator.country_at(41.90, 12.50), "IT")
+        self.assertEqual(self.locator.country_at(-1.29, 36.82), "KE")
+        self.assertEqual(self.locator.country_at(55.76, 37.62), "RU")
+
+    def test_open_sea_falls_back(self):
+        self.assertIsNone(self.locator.country_at(0.0, -30.0))
+        self.assertEqual(coords_to_country_code("0.0,-30.0"), "US")
+        self.assertEqual(coords_to_country_code("not,coords"), "US")
+
+    def test_coordinates_take_precedence_over_timezone(self):
+        # A timezone detected from Berlin's coordinates is 'Europe/Paris'
+        self.assertEqual(resolve_country_code("Europe/Paris", "52.52,13.40"), "DE")
+        self.assertEqual(resolve_country_code("Europe/Paris", None), "FR")
+        self.assertEqual(resolve_country_code("Europe/Paris", "0.0,-30.0"), "FR")
+
+
+class TimezoneCountryTestCase(SimpleTestCase):
+    def test_every_zone_maps_to_one_country(self):
+        self.assertEqual(timezone_to_country_code("Europe/Berlin"), "DE")
+        self.assertEqual(timezone_to_country_code("Asia/Tokyo"), "JP")
+        self.assertEqual(timezone_to_country_code("America/Toronto"), "CA")
+        self.assertEqual(timezone_to_country_code("Mars/Olympus_Mons"), "US")
+        self.assertEqual(timezone_to_country_code(None), "US")
+        with self.assertRaises(TypeError):
+            TIMEZONE_COUNTRY_CODES["Europe/Berlin"] = "FR"
+
+    def test_coordinate_lookups_are_memoized(self):
+        _timezone_at.cache_clear()
+        self.assertEqual(detect_timezone_from_coords("35.68950,139.69171"), "Asia/Tokyo")
+        self.assertEqual(detect_timezone_from_coords("35.68951,139.69169"), "Asia/Tokyo")
+        self.assertEqual(_timezone_at.cache_info().hits, 1)
+        self.assertIsNone(detect_timezone_from_coords("nowhere"))
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models.break_execution import BreakExecution
+from ..models.badge_models import Badge
+from ..models.mood_models import Mood
+from ..models.notification_models import Notification
+from ..models.preference_models import UserNotificationPreference
+from ..models.score_models import StreakScore
+from ..services.digest_service import WeeklyDigestService
+
+User = get_user_model()
+
+
+class WeeklyDigestTestCase(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.users = [
+            User.objects.create_user(email=f"digest{i}@example.com", password="testpassword")
+            for i in range(4)
+        ]
+        for user in self.users:
+            UserNotificationPreference.objects.create(user=user)
+        UserNotificationPreference.objects.filter(user=self.users[3]).update(weeklyDigest=False)
+
+        active = self.users[0]
+        yesterday = self.today - timedelta(days=1)
+        # bulk_create keeps the lifecycle signals out of the fixture
+        BreakExecution.objects.bulk_create([
+            BreakExecution(
+                user=active, status="taken",
+                recommended_start=yesterday, recommended_end=yesterday,
+                actual_start=yesterday, actual_end=yesterday,
+            ),
+            BreakExecution(
+                user=active, status="missed",
+                recommended_start=yesterday, recommended_end=yesterday,
+            ),
+            # Outside the window
+            BreakExecution(
+                user=active, status="taken",
+                recommended_start=self.today - timedelta(days=30),
+                recommended_end=self.today - timedelta(days=30),
+                actual_start=self.today - timedelta(days=30),
+            ),
+        ])
+        StreakScore.objects.create(
+            user=active, current_streak=4, longest_streak=4,
+            streak_period="weekly", last_break_date=yesterday,
+        )
+        Badge.objects.create(user=active, badge_type=Badge.BADGE_TYPES[0][0], description="First")
+
+        Mood.objects.bulk_create([
+            Mood(user=active, mood_type="angry"),
+            Mood(user=active, mood_type="happy"),
+        ])
+        Mood.objects.filter(user=active, mood_type="angry").update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+
+    def test_aggregates_week_in_grouped_queries(self):
+        week_end = self.today + timedelta(days=1)
+
+        # Per chunk: one page of users + five grouped aggregates;
+        # each chunk of events is one bulk insert plus the unread counter upsert
+        with self.assertNumQueries(3 + 2 * 5 + 2 * 3):
+            queued = WeeklyDigestService.send(week_end=week_end, chunk_size=2)
+
+        self.assertEqual(queued, 3)
+        digests = {
+            n.user_id: n for n in Notification.objects.filter(event="weekly_digest")
+        }
+        self.assertNotIn(self.users[3].pk, digests)
+
+        stats = digests[self.users[0].pk].metadata["digest"]
+        self.assertEqual(stats["breaks_taken"], 1)
+        self.assertEqual(stats["breaks_missed"], 1)
+        self.assertEqual(stats["current_streak"], 4)
+        self.assertTrue(stats["streak_extended"])
+        self.assertEqual(stats["new_badges"], 1)
+        self.assertEqual(stats["mood_trend"], "improving")
+        self.assertIn("You took 1 break", digests[self.users[0].pk].message)
+
+        quiet = digests[self.users[1].pk]
+        self.assertEqual(quiet.metadata["digest"], WeeklyDigestService._empty_stats())
+        self.assertTrue(quiet.message.startswith("A quiet week"))
@@ -0,0 +1,112 @@
+import smtplib
+import socket
+
+from django.test import SimpleTestCase
+
+from ..utils.email_utils import SMTPConnectionPool
+
+
+class FakeSMTP:
+    def __init__(self, fail_after=None, refused=(), error=None):
+        self.sent = []
+        self.closed = False
+        self.fail_after = fail_after
+        self.refused = refused
+        self.error = error
+
+    def sendmail(self, from_addr, to_addrs, payload):
+        if self.error:
+            raise self.error
+        if set(to_addrs) & set(self.refused):
+            raise smtplib.SMTPRecipientsRefused({a: (550, b"No such user") for a in to_addrs})
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(to_addrs)
+
+    def quit(self):
+        self.closed = True
+
+
+class SMTPConnectionPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.connections = []
+
+    def connect(self, **kwargs):
+        conn = FakeSMTP(**kwargs)
+        self.connections.append(conn)
+        return conn
+
+    def messages(self, n):
+        return [("from@example.com", [f"to{i}@example.com"], "body") for i in range(n)]
+
+    def test_connection_reused_across_calls(self):
+        pool = SMTPConnectionPool(connect=self.connect)
+
+        pool.send_many(self.messages(3))
+        pool.send("from@example.com", ["late@example.com"], "body")
+
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(len(self.connections[0].sent), 4)
+        self.assertEqual(pool.stats["reused"], 1)
+
+    def test_per_connection_limit_rotates(self):
+        pool = SMTPConnectionPool(connect=self.connect, max_messages=2)
+
+        results = pool.send_many(self.messages(5))
+
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual([len(c.sent) for c in self.connections], [2, 2, 1])
+        self.assertTrue(self.connections[0].closed)
+
+    def test_reconnects_on_dropped_connection(self):
+        pool = SMTPConnectionPool(connect=lambda: self.connect(fail_after=2))
+
+        results = pool.send_many(self.messages(3))
+
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(pool.stats["reconnects"], 1)
+
+    def test_idle_connection_is_retired(self):
+        pool = SMTPConnectionPool(connect=self.connect, max_idle=-1)
+
+        pool.send("from@example.com", ["a@example.com"], "body")
+        pool.send("from@example.com", ["b@example.com"], "body")
+
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].closed)
+
+    def test_rejected_recipient_keeps_connection(self):
+        pool = SMTPConnectionPool(connect=lambda: self.connect(refused=["to1@example.com"]))
+
+        results = pool.send_many(self.messages(3))
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual(len(self.connections), 1)
+        self.assertFalse(self.connections[0].closed)
+        self.assertEqual(
+            (pool.stats["opened"], pool.stats["retired"], pool.stats["reconnects"], pool.stats["failed"]),
+            (1, 0, 0, 1),
+        )
+
+    def test_failed_reconnect_keeps_earlier_results(self):
+        def connect():
+            if self.connections:
+                raise socket.gaierror(-2, "Name or service not known")
+            return self.connect(fail_after=1)
+
+        pool = SMTPConnectionPool(connect=connect)
+
+        results = pool.send_many(self.messages(3))
+
+        self.assertEqual(results, [True, False, False])
+        self.assertEqual((pool.stats["sent"], pool.stats["failed"]), (1, 2))
+
+    def test_socket_errors_during_send_drop_the_connection(self):
+        errors = [OSError(104, "Connection reset by peer")]
+        pool = SMTPConnectionPool(connect=lambda: self.connect(error=errors.pop() if errors else None))
+
+        self.assertEqual(pool.send_many(self.messages(2)), [True, True])
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(pool.stats["reconnects"], 1)
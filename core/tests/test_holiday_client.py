@@ -0,0 +1,231 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.test import SimpleTestCase
+
+from ..utils.holiday_client import AsyncHolidayFetcher, HolidayApiClient
+
+
+class StubHolidayApi(BaseHTTPRequestHandler):
+    """Serves /publicholidays/<year>/<country> with an ETag."""
+
+    requests = []
+    fail_next = 0
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append((self.path, self.headers.get("If-None-Match")))
+        if cls.fail_next:
+            cls.fail_next -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        _, _, year, country = self.path.rstrip("/").split("/")
+        etag = f'"{country}-{year}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "max-age=0")
+            self.end_headers()
+            return
+
+        body = json.dumps([{"date": f"{year}-01-01", "name": "New Year's Day", "localName": ""}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", self.server.cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HolidayApiClientTestCase(SimpleTestCase):
+    def setUp(self):
+        StubHolidayApi.requests = []
+        StubHolidayApi.fail_next = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHolidayApi)
+        self.server.cache_control = "max-age=3600"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.cache_dir = tempfile.mkdtemp()
+        self.client = HolidayApiClient(
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            cache_dir=self.cache_dir,
+            timeout=(1, 2),
+            retries=2,
+            backoff=0,
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fresh_response_served_from_disk_cache(self):
+        first = self.client.public_holidays("GB", 2030)
+        second = self.client.public_holidays("GB", 2030)
+        self.client.public_holidays("DE", 2030)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["date"], "2030-01-01")
+        self.assertEqual([p for p, _ in StubHolidayApi.requests],
+                         ["/publicholidays/2030/GB", "/publicholidays/2030/DE"])
+        self.assertEqual(self.client.stats(),
+                         {"requests": 3, "hits": 1, "revalidated": 0, "fetched": 2, "errors": 0})
+
+        # A new client (another worker) reads the same cache directory
+        other = HolidayApiClient(base_url=self.client.base_url, cache_dir=self.cache_dir)
+        other.public_holidays("GB", 2030)
+        self.assertEqual(other.stats()["hits"], 1)
+        self.assertEqual(len(StubHolidayApi.requests), 2)
+
+    def test_stale_response_revalidated_with_etag(self):
+        self.server.cache_control = "max-age=0"
+        self.client.public_holidays("GB", 2030)
+        holidays = self.client.public_holidays("GB", 2030)
+
+        self.assertEqual(holidays[0]["name"], "New Year's Day")
+        self.assertEqual(StubHolidayApi.requests[1], ("/publicholidays/2030/GB", '"GB-2030"'))
+        self.assertEqual(self.client.stats()["revalidated"], 1)
+
+    def test_retries_server_errors(self):
+        StubHolidayApi.fail_next = 2
+        self.assertEqual(len(self.client.public_holidays("GB", 2030)), 1)
+        self.assertEqual(len(StubHolidayApi.requests), 3)
+
+        StubHolidayApi.fail_next = 5
+        self.assertEqual(self.client.public_holidays("FR", 2030), [])
+        self.assertEqual(self.client.stats()["errors"], 1)
+
+
+class AsyncHolidayFetcherTestCase(SimpleTestCase):
+    def fetcher(self, handler, client=None, **kwargs):
+        if client is None:
+            client = self.api_client()
+        return AsyncHolidayFetcher(
+            base_url="http://holidays.test/api/v3",
+            transport=httpx.MockTransport(handler),
+            retries=2,
+            backoff=0,
+            client=client,
+            **kwargs,
+        )
+
+    def api_client(self):
+        # Each fetcher starts from an empty disk cache
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        client = HolidayApiClient(base_url="http://holidays.test/api/v3", cache_dir=cache_dir)
+        self.addCleanup(client.close)
+        return client
+
+    def test_pairs_fetched_concurrently_within_the_limit(self):
+        in_flight, peak = 0, 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.1)
+            in_flight -= 1
+            _, year, country = request.url.path.rsplit("/", 2)
+            return httpx.Response(200, json=[{"date": f"{year}-01-01", "name": country}])
+
+        pairs = [(code, year) for code in ("GB", "DE", "FR", "NG", "KE") for year in (2030, 2031)]
+        start = time.perf_counter()
+        results = self.fetcher(handler, concurrency=10).fetch_all(pairs)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(set(results), set(pairs))
+        self.assertEqual(results[("KE", 2031)][0]["name"], "KE")
+        # Ten 100 ms requests: about one round trip, not ten
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(peak, 10)
+
+        peak = 0
+        self.fetcher(handler, concurrency=3).fetch_all(pairs)
+        self.assertEqual(peak, 3)
+
+    def test_failures_are_per_pair(self):
+        attempts = {}
+
+        def handler(request):
+            country = request.url.path.rsplit("/", 1)[1]
+            attempts[country] = attempts.get(country, 0) + 1
+            if country == "XX":
+                return httpx.Response(404)
+            if country == "FR" and attempts[country] == 1:
+                return httpx.Response(503)
+            if country == "DE":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json=[{"date": "2030-01-01", "name": "New Year"}])
+
+        results = self.fetcher(handler).fetch_all([("GB", 2030), ("FR", 2030), ("DE", 2030), ("XX", 2030)])
+
+        self.assertEqual(len(results[("GB", 2030)]), 1)
+        self.assertEqual(len(results[("FR", 2030)]), 1)
+        self.assertIsNone(results[("DE", 2030)])
+        self.assertIsNone(results[("XX", 2030)])
+        # 404 is not retried; 503 and connection errors are
+        self.assertEqual(attempts, {"GB": 1, "FR": 2, "DE": 3, "XX": 1})
+
+    def test_batches_share_the_client_disk_cache(self):
+        seen = []
+
+        def handler(request):
+            country = request.url.path.rsplit("/", 1)[1]
+            seen.append((country, request.headers.get("If-None-Match")))
+            etag = f'"{country}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            max_age = 0 if country == "GB" else 3600
+            return httpx.Response(
+                200,
+                json=[{"date": "2030-01-01", "name": country}],
+                headers={"ETag": etag, "Cache-Control": f"max-age={max_age}"},
+            )
+
+        client = self.api_client()
+        first = self.fetcher(handler, client=client).fetch_all([("GB", 2030), ("DE", 2030)])
+        second = self.fetcher(handler, client=client).fetch_all([("GB", 2030), ("DE", 2030)])
+
+        self.assertEqual(first, second)
+        # DE is still fresh; GB is stale and revalidated with its ETag
+        self.assertEqual(sorted(seen, key=str), [("DE", None), ("GB", '"GB"'), ("GB", None)])
+        self.assertEqual(
+            client.stats(),
+            {"requests": 4, "hits": 1, "revalidated": 1, "fetched": 2, "errors": 0},
+        )
+
+    def test_retry_after_is_honoured_without_holding_a_slot(self):
+        order = []
+
+        def handler(request):
+            country = request.url.path.rsplit("/", 1)[1]
+            order.append(country)
+            if country == "XX":
+                return httpx.Response(429, headers={"Retry-After": "3600"})
+            if country == "GB" and order.count("GB") == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.3"})
+            return httpx.Response(200, json=[{"date": "2030-01-01", "name": country}])
+
+        start = time.perf_counter()
+        results = self.fetcher(handler, concurrency=1).fetch_all([("GB", 2030), ("DE", 2030), ("XX", 2030)])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results[("GB", 2030)]), 1)
+        self.assertGreaterEqual(elapsed, 0.3)
+        # DE and XX went out while GB waited; XX asked for too long a wait
+        self.assertEqual(order, ["GB", "DE", "XX", "GB"])
+        self.assertIsNone(results[("XX", 2030)])
@@ -0,0 +1,318 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models.holiday_models import (
+    CountryHoliday,
+    HolidayOverride,
+    PublicHoliday,
+    PublicHolidayCalendar,
+)
+from ..serializers.holiday_serializers import HolidaySerializer
+from ..services.holiday_service import HolidayService
+from ..tasks.holiday_tasks import sync_user_holidays, refresh_all_user_holidays
+from ..utils.holiday_providers import (
+    LibraryHolidayProvider,
+    fetch_many_public_holidays,
+    fetch_public_holidays,
+)
+
+User = get_user_model()
+
+
+def fake_holidays(country_code, year):
+    return [
+        {"date": f"{year}-01-01", "name": "New Year's Day", "localName": "New Year's Day"},
+        {"date": f"{year}-12-25", "name": "Christmas Day", "localName": "Christmas Day"},
+        {"date": f"{year}-12-26", "name": "Boxing Day", "localName": "Boxing Day"},
+    ]
+
+
+def fake_fetch_many(pairs, providers=None):
+    return {pair: fake_holidays(*pair) for pair in pairs}
+
+
+def fetched_pairs(fetch):
+    return [pair for call in fetch.call_args_list for pair in call.args[0]]
+
+
+@patch("core.services.holiday_service.fetch_many_public_holidays", side_effect=fake_fetch_many)
+class SharedHolidayStoreTestCase(TestCase):
+    def setUp(self):
+        HolidayService.invalidate()
+        self.year = timezone.localdate().year
+        self.users = [
+            User.objects.create_user(email=f"holiday{i}@example.com", password="testpassword")
+            for i in range(2)
+        ]
+        self.calendars = [
+            PublicHolidayCalendar.objects.update_or_create(user=u, defaults={"country_code": "GB"})[0]
+            for u in self.users
+        ]
+
+    def test_country_synced_once_for_all_users(self, fetch):
+        for user in self.users:
+            sync_user_holidays(user.id, "GB")
+
+        # Two years fetched once, not once per user
+        self.assertEqual(len(fetched_pairs(fetch)), 2)
+        self.assertEqual(CountryHoliday.objects.filter(country_code="GB").count(), 6)
+        self.assertFalse(PublicHoliday.objects.exists())
+
+    def test_overrides_and_cache(self, fetch):
+        HolidayService.sync_country("GB", [self.year])
+        calendar = self.calendars[0]
+        HolidayOverride.objects.create(calendar=calendar, date=date(self.year, 12, 26), is_removed=True)
+        HolidayOverride.objects.create(calendar=calendar, date=date(self.year, 6, 1), name="Team day")
+
+        start, end = date(self.year, 1, 1), date(self.year, 12, 31)
+        holidays = HolidayService.for_calendar(calendar, start, end)
+        self.assertEqual(
+            [(h.date.month, h.date.day, h.is_custom) for h in holidays],
+            [(1, 1, False), (6, 1, True), (12, 25, False)],
+        )
+
+        # The other calendar sees the plain country list, from cache plus one override lookup
+        with self.assertNumQueries(1):
+            other = HolidayService.for_calendar(self.calendars[1], start, end)
+        self.assertEqual(len(other), 3)
+
+        ids = [h["id"] for h in HolidaySerializer(holidays, many=True).data]
+        self.assertEqual([i.split(":")[0] for i in ids], ["c", "o", "c"])
+
+    def test_change_on_another_worker_reaches_cached_lists(self, fetch):
+        HolidayService.sync_country("GB", [self.year])
+        self.assertEqual(len(HolidayService.country_holidays("GB", self.year)), 3)
+
+        # Another worker syncs: only the shared version reaches this process
+        fetch.side_effect = lambda pairs, providers=None: {
+            pair: fake_holidays(*pair)[:2] for pair in pairs
+        }
+        with patch.object(HolidayService, "invalidate"):
+            with self.captureOnCommitCallbacks(execute=True):
+                HolidayService.sync_country("GB", [self.year])
+
+        self.assertEqual(len(HolidayService.country_holidays("GB", self.year)), 2)
+
+    def test_unsynced_country_is_not_cached_empty(self, fetch):
+        self.assertEqual(HolidayService.country_holidays("DE", self.year), ())
+        # The change's commit callback never runs here
+        HolidayService.sync_country("DE", [self.year])
+        self.assertEqual(len(HolidayService.country_holidays("DE", self.year)), 3)
+
+    @patch("core.tasks.holiday_tasks.sync_country_holidays.apply_async")
+    def test_missing_country_is_queued_once(self, apply_async, fetch):
+        cache.clear()
+        self.assertEqual(HolidayService.schedule_country_sync("DE", [self.year]), [self.year])
+        self.assertEqual(HolidayService.schedule_country_sync("DE", [self.year]), [self.year])
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args[0], ("DE", [self.year]))
+        fetch.assert_not_called()
+
+        HolidayService.sync_country("DE", [self.year])
+        self.assertEqual(HolidayService.schedule_country_sync("DE", [self.year]), [])
+
+    def test_upcoming_view_reads_shared_store(self, fetch):
+        HolidayService.sync_country("GB", [self.year, self.year + 1])
+        self.client.force_login(self.users[0])
+
+        response = self.client.get("/api/holidays/upcoming/")
+
+        self.assertEqual(response.status_code, 200)
+        dates = [h["date"] for h in response.json()["data"]]
+        self.assertEqual(dates, sorted(dates))
+        self.assertIn(f"{self.year + 1}-12-25", dates)
+
+    def test_refresh_fetches_each_country_once(self, fetch):
+        extra = [
+            User.objects.create_user(email=f"refresh{i}@example.com", password="testpassword")
+            for i in range(3)
+        ]
+        for user, (code, enabled) in zip(extra, [("GB", True), ("DE", True), ("FR", False)]):
+            PublicHolidayCalendar.objects.update_or_create(
+                user=user, defaults={"country_code": code, "is_enabled": enabled}
+            )
+
+        counts = refresh_all_user_holidays()
+
+        self.assertEqual(counts["countries"], 2)
+        self.assertEqual(counts["calendars"], 4)
+        self.assertEqual(counts["calendars_synced"], 4)
+        # Two countries x two years in one batch, whatever the number of users
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(
+            sorted(code for code, _ in fetched_pairs(fetch)),
+            ["DE", "DE", "GB", "GB"],
+        )
+        self.assertFalse(
+            PublicHolidayCalendar.objects.filter(is_enabled=True, last_synced__isnull=True).exists()
+        )
+
+    def test_resync_applies_diff_and_keeps_ids(self, fetch):
+        HolidayService.sync_country("GB", [self.year])
+        kept = CountryHoliday.objects.get(country_code="GB", date=date(self.year, 1, 1))
+
+        # Savepoint, read, insert, bulk update, delete, sync marker upsert, release
+        with self.assertNumQueries(7):
+            result = HolidayService._apply_diff(
+                "GB",
+                self.year,
+                {
+                    (date(self.year, 1, 1), "New Year's Day"): "New Year's Day",
+                    (date(self.year, 12, 25), "Christmas Day"): "Nadolig",
+                    (date(self.year, 5, 4), "Early May Bank Holiday"): "",
+                },
+            )
+        self.assertEqual(result, {"created": 1, "updated": 1, "deleted": 1})
+
+        # The provider still returns the original list: the diff is reverted
+        result = HolidayService.sync_country("GB", [self.year])
+        self.assertEqual((result["created"], result["updated"], result["deleted"]), (1, 1, 1))
+        result = HolidayService.sync_country("GB", [self.year])
+        self.assertEqual((result["created"], result["updated"], result["deleted"]), (0, 0, 0))
+
+        rows = CountryHoliday.objects.filter(country_code="GB", year=self.year)
+        self.assertEqual(rows.count(), 3)
+        self.assertEqual(rows.get(date=date(self.year, 1, 1)).pk, kept.pk)
+        self.assertEqual(rows.get(date=date(self.year, 12, 25)).local_name, "Christmas Day")
+        self.assertFalse(rows.filter(name="Early May Bank Holiday").exists())
+
+
+class StubProvider:
+    def __init__(self, name, rows=None, error=None):
+        self.name, self.rows, self.error, self.calls = name, rows or [], error, 0
+
+    def fetch(self, country_code, year):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.rows
+
+
+class HolidayProviderTestCase(TestCase):
+    def test_library_provider_needs_no_network(self):
+        rows = LibraryHolidayProvider().fetch("DE", 2026)
+
+        by_date = {r["date"]: r for r in rows}
+        self.assertEqual(by_date["2026-10-03"]["localName"], "Tag der Deutschen Einheit")
+        self.assertEqual(by_date["2026-12-25"]["name"], "Christmas Day")
+        self.assertEqual(LibraryHolidayProvider().fetch("XX", 2026), [])
+
+    def test_falls_back_until_a_provider_has_data(self):
+        broken = StubProvider("broken", error=ConnectionError("down"))
+        empty = StubProvider("empty")
+        nager = StubProvider("nager", rows=[{"date": "2026-01-01", "name": "New Year"}])
+        unused = StubProvider("unused", rows=[{"date": "2026-01-02", "name": "Other"}])
+
+        rows = fetch_public_holidays("XX", 2026, providers=[broken, empty, nager, unused])
+
+        self.assertEqual(rows, nager.rows)
+        self.assertEqual((broken.calls, empty.calls, unused.calls), (1, 1, 0))
+
+    def test_batch_falls_back_per_pair(self):
+        class BatchProvider(StubProvider):
+            def fetch_many(self, pairs):
+                self.batches = getattr(self, "batches", []) + [list(pairs)]
+                return {p: [{"date": f"{p[1]}-01-01", "name": p[0]}] for p in pairs if p[0] != "DE"}
+
+        library = StubProvider("library")
+        batch = BatchProvider("nager")
+        fallback = StubProvider("fallback", rows=[{"date": "2030-05-01", "name": "Labour Day"}])
+        pairs = [("GB", 2030), ("GB", 2031), ("DE", 2030)]
+
+        results = fetch_many_public_holidays(pairs, providers=[library, batch, fallback])
+
+        self.assertEqual(library.calls, 3)
+        # One batch for every pair the library lacked; only DE goes further
+        self.assertEqual(batch.batches, [pairs])
+        self.assertEqual(fallback.calls, 1)
+        self.assertEqual(results[("GB", 2031)][0]["name"], "GB")
+        self.assertEqual(results[("DE", 2030)], fallback.rows)
+
+    @override_settings(HOLIDAY_PROVIDERS=["library", "nager"], HOLIDAY_PROVIDER_OVERRIDES={"GB": ["nager"]})
+    def test_provider_order_per_country(self):
+        with patch("core.utils.holiday_providers.get_holiday_client") as client:
+            client.return_value.public_holidays.return_value = [{"date": "2026-01-01", "name": "X"}]
+            fetch_public_holidays("GB", 2026)
+            self.assertEqual(client.return_value.public_holidays.call_count, 1)
+
+            HolidayService.sync_country("DE", [2026])
+            self.assertEqual(client.return_value.public_holidays.call_count, 1)
+
+        self.assertEqual(CountryHoliday.objects.filter(country_code="DE", year=2026).count(), 9)
+
+
+@patch("core.tasks.holiday_tasks.sync_user_holidays.apply_async")
+class UserCalendarSyncTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="mover@example.com", password="testpassword", country_code="GB"
+        )
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def test_unrelated_saves_do_not_sync(self, apply_async):
+        before = HolidayService.user_sync_stats()["unchanged"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.email_otp = "123456"
+            self.user.save(update_fields=["email_otp"])
+            self.user.full_name = "Mover"
+            self.user.save()
+
+        apply_async.assert_not_called()
+        self.assertEqual(HolidayService.user_sync_stats()["unchanged"] - before, 2)
+
+    def test_changes_coalesce_into_one_sync(self, apply_async):
+        before = HolidayService.user_sync_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.country_code = "DE"
+            self.user.save()
+            self.user.home_location_timezone = "Europe/Berlin"
+            self.user.save(update_fields=["home_location_timezone"])
+            self.user.country_code = "FR"
+            self.user.save(update_fields=["country_code"])
+
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args[0], (str(self.user.id),))
+        self.assertEqual(apply_async.call_args.kwargs["retry_policy"], {"max_retries": 0})
+        self.assertEqual(PublicHolidayCalendar.objects.get(user=self.user).country_code, "FR")
+        after = HolidayService.user_sync_stats()
+        self.assertEqual(after["queued"] - before["queued"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 2)
+
+        # Once the sync has started, the next change queues a new one
+        with patch("core.services.holiday_service.fetch_many_public_holidays", side_effect=fake_fetch_many):
+            sync_user_holidays(str(self.user.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.country_code = "GB"
+            self.user.save()
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_calendar_post_joins_the_pending_sync(self, apply_async):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post("/api/holidays/")
+            second = self.client.post("/api/holidays/")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("task_id", second.json()["data"])
+        apply_async.assert_called_once()
+
+    def test_new_user_country_taken_from_timezone(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            tokyo = User.objects.create_user(
+                email="tokyo@example.com", password="testpassword", home_location_timezone="Asia/Tokyo"
+            )
+            paris = User.objects.create_user(
+                email="paris@example.com", password="testpassword", home_location_timezone="Europe/Paris",
+                country_code="BE",
+            )
+
+        self.assertEqual(PublicHolidayCalendar.objects.get(user=tokyo).country_code, "JP")
+        # An explicit country wins over the timezone
+        self.assertEqual(PublicHolidayCalendar.objects.get(user=paris).country_code, "BE")
+        self.assertEqual(apply_async.call_count, 2)
@@ -0,0 +1,108 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from ..services.location_service import LocationService, login_update_key
+
+User = get_user_model()
+
+
+class LoginLocationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="traveller@example.com", password="testpassword")
+
+    def login(self, timezone=None, coords=None):
+        headers = {}
+        if timezone:
+            headers["HTTP_X_TIMEZONE"] = timezone
+        if coords:
+            headers["HTTP_X_COORDINATES"] = coords
+        request = RequestFactory().post("/api/auth/login/", **headers)
+        user = User.objects.get(pk=self.user.pk)
+        user_logged_in.send(sender=User, request=request, user=user)
+
+    @patch("core.tasks.location_tasks.update_location_after_login.apply_async")
+    def test_location_resolved_after_login(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login(coords="52.52,13.40")
+
+        # Nothing was resolved while logging in
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.home_location_coordinates)
+        self.assertEqual(apply_async.call_args.kwargs["retry_policy"], {"max_retries": 0})
+
+        # What the worker runs
+        from ..tasks.location_tasks import update_location_after_login
+        update_location_after_login(*apply_async.call_args.args[0])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.home_location_coordinates, "52.52,13.40")
+        self.assertEqual(self.user.home_location_timezone, "Europe/Paris")
+        self.assertEqual(self.user.country_code, "DE")
+
+    @patch("core.tasks.location_tasks.update_location_after_login.apply_async")
+    def test_logins_coalesce_and_repeats_are_skipped(self, apply_async):
+        before = LocationService.login_update_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login("Europe/Paris", "48.85,2.35")
+            self.login("Europe/Paris", "48.85,2.35")
+            self.login("Asia/Tokyo", "35.68,139.69")
+
+        apply_async.assert_called_once_with(
+            (str(self.user.pk), "Europe/Paris", "48.85,2.35"), None, retry_policy={"max_retries": 0}
+        )
+        after = LocationService.login_update_stats()
+        self.assertEqual(after["queued"] - before["queued"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 2)
+
+        # The queued task picks up the latest login's headers
+        from ..tasks.location_tasks import update_location_after_login
+        update_location_after_login(*apply_async.call_args.args[0])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.home_location_timezone, "Asia/Tokyo")
+        self.assertEqual(self.user.country_code, "JP")
+
+        # Known location: later logins queue nothing, whatever they send
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login("Europe/London", "51.51,-0.13")
+            self.login()
+        apply_async.assert_called_once()
+
+    @patch("core.tasks.location_tasks.update_location_after_login.apply_async")
+    def test_unreachable_broker_is_not_retried_on_every_login(self, apply_async):
+        apply_async.side_effect = ConnectionError("broker down")
+        other = User.objects.create_user(email="second@example.com", password="testpassword")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login(coords="52.52,13.40")
+        with self.captureOnCommitCallbacks(execute=True):
+            user_logged_in.send(
+                sender=User,
+                request=RequestFactory().post("/api/auth/login/", HTTP_X_COORDINATES="48.85,2.35"),
+                user=other,
+            )
+
+        # One failed publish; later logins skip the broker for a while
+        apply_async.assert_called_once()
+
+        # Nothing was recorded, so the same login retries once it is back
+        cache.clear()
+        apply_async.side_effect = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login(coords="52.52,13.40")
+        self.assertEqual(apply_async.call_count, 2)
+
+    @patch("core.tasks.location_tasks.update_location_after_login.apply_async")
+    def test_lost_task_does_not_mark_headers_seen(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login("Europe/Berlin", "52.52,13.40")
+
+        # The task never runs; once its pending marker expires the same
+        # login queues it again
+        cache.delete(login_update_key(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.login("Europe/Berlin", "52.52,13.40")
+        self.assertEqual(apply_async.call_count, 2)
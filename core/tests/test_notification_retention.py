@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models.notification_models import (
+    Notification,
+    NotificationArchive,
+    NotificationSummary,
+)
+from ..services.notification_service import NotificationService, NotificationCRUDService
+from ..services.notification_retention_service import NotificationRetentionService
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_RETENTION={
+    "default": {"read_days": 30, "max_days": 180, "archive": True},
+    "break_reminder": {"read_days": 7, "max_days": 30, "archive": False},
+})
+class NotificationRetentionTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="retention@example.com", password="testpassword")
+        self.now = timezone.now()
+
+    def make(self, event, age_days, is_read=False, status="sent", count=1):
+        NotificationService.notify_many(
+            {"user": self.user, "event": event, "title": event, "message": "m"}
+            for _ in range(count)
+        )
+        latest = Notification.objects.filter(user=self.user).order_by("-created_at")[:count]
+        Notification.objects.filter(id__in=[n.id for n in latest]).update(
+            created_at=self.now - timedelta(days=age_days), status=status
+        )
+        if is_read:
+            Notification.objects.filter(id__in=[n.id for n in latest]).update(is_read=True)
+            NotificationCRUDService.reconcile_unread_counts([self.user.pk])
+
+    def test_prunes_per_event_policy_in_chunks(self):
+        self.make("break_reminder", 10, is_read=True, count=5)  # read, past 7 days
+        self.make("break_reminder", 40)                          # unread, past 30 days
+        self.make("break_reminder", 3, is_read=True)             # kept
+        self.make("welcome", 40, is_read=True, count=2)          # archived
+        self.make("welcome", 40)                                 # unread, kept
+        self.make("welcome", 400, status="pending")              # in flight, kept
+
+        totals = NotificationRetentionService.prune(now=self.now, chunk_size=2, pause=0)
+
+        self.assertEqual(totals["deleted"], 8)
+        self.assertEqual(totals["archived"], 2)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(NotificationArchive.objects.filter(event="welcome").count(), 2)
+
+        reminders = NotificationSummary.objects.get(user=self.user, event="break_reminder")
+        self.assertEqual((reminders.pruned, reminders.pruned_read, reminders.archived), (6, 5, 0))
+        welcome = NotificationSummary.objects.get(user=self.user, event="welcome")
+        self.assertEqual((welcome.pruned, welcome.archived), (2, 2))
+
+        # The pruned unread reminder left the unread counter
+        self.assertEqual(NotificationCRUDService.unread_count(self.user), 2)
+
+        # Nothing left to do
+        self.assertEqual(NotificationRetentionService.prune(now=self.now, pause=0)["deleted"], 0)
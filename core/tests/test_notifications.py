@@ -0,0 +1,182 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from ..models.notification_models import Notification, NotificationCounter
+from ..models.preference_models import UserNotificationPreference
+from ..models.device_models import DeviceToken
+from ..services.notification_service import NotificationService, NotificationCRUDService
+from ..tasks.notification_tasks import reconcile_unread_counters
+
+User = get_user_model()
+
+
+@patch("core.services.notification_service.send_notification_emails")
+@patch("core.services.notification_service.send_firebase_push_batch")
+class NotifyManyTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f"notify{i}@example.com", password="testpassword")
+            for i in range(4)
+        ]
+        for user in self.users[:3]:
+            UserNotificationPreference.objects.create(user=user, emailEnabled=False)
+            DeviceToken.objects.create(user=user, token=f"token-{user.email}")
+        # Opted out of reminders
+        UserNotificationPreference.objects.filter(user=self.users[2]).update(breaksReminder=False)
+
+    def _events(self):
+        return [
+            {
+                "user": user,
+                "event": "break_reminder",
+                "title": "Upcoming break",
+                "message": "Your break starts tomorrow.",
+            }
+            for user in self.users
+        ]
+
+    def test_notify_only_queues(self, push_batch, email_batch):
+        with self.captureOnCommitCallbacks() as callbacks:
+            # notifications insert + unread counter upsert
+            with self.assertNumQueries(3):
+                NotificationService.notify_many(self._events())
+
+        push_batch.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(Notification.objects.filter(status="pending").count(), 4)
+
+    @patch("core.tasks.notification_tasks.deliver_pending_notifications.apply_async")
+    def test_outbox_kick_gives_up_fast_when_broker_is_down(self, apply_async, push_batch, email_batch):
+        cache.clear()
+        apply_async.side_effect = ConnectionError("broker down")
+
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                NotificationService.notify_many(self._events()[:1])
+
+        # One bounded attempt; later kicks leave the rows to the periodic drain
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs["retry_policy"], {"max_retries": 0})
+        self.assertEqual(Notification.objects.filter(status="pending").count(), 3)
+        cache.clear()
+
+    def test_outbox_delivery_constant_query_count(self, push_batch, email_batch):
+        push_batch.side_effect = lambda messages: [True] * len(messages)
+        NotificationService.notify_many(self._events())
+
+        # claim (savepoint, select, update, release), preferences, tokens, status update
+        with self.assertNumQueries(7):
+            self.assertEqual(NotificationService.deliver_pending(), 4)
+
+        push_batch.assert_called_once()
+        self.assertEqual(len(push_batch.call_args.args[0]), 2)
+        email_batch.assert_not_called()
+
+        statuses = dict(
+            Notification.objects.values_list("user__email", "status")
+        )
+        self.assertEqual(statuses["notify0@example.com"], "sent")
+        self.assertEqual(statuses["notify2@example.com"], "skipped")
+        self.assertEqual(statuses["notify3@example.com"], "skipped")
+
+        # Nothing left to claim
+        self.assertEqual(NotificationService.deliver_pending(), 0)
+
+        stats = NotificationService.outbox_stats()
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["delivered_last_window"], 2)
+        self.assertIsNotNone(stats["avg_delivery_latency_seconds"])
+
+    def test_failed_push_marks_only_its_notification(self, push_batch, email_batch):
+        push_batch.side_effect = lambda messages: [
+            m["token"] != "token-notify1@example.com" for m in messages
+        ]
+
+        NotificationService.notify_many(self._events())
+        NotificationService.deliver_pending()
+
+        failed = Notification.objects.get(user=self.users[1])
+        self.assertEqual(failed.status, "failed")
+        self.assertIn("Push failed", failed.error_message)
+        self.assertEqual(Notification.objects.get(user=self.users[0]).status, "sent")
+
+
+class UnreadCounterTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="unread@example.com", password="testpassword")
+        NotificationService.notify_many(
+            {"user": self.user, "event": "break_reminder", "title": "T", "message": str(i)}
+            for i in range(3)
+        )
+
+    def test_counter_follows_read_and_delete(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationCRUDService.unread_count(self.user), 3)
+
+        first, second, _ = Notification.objects.filter(user=self.user)
+        first.mark_read()
+        first.mark_read()
+        self.assertEqual(NotificationCRUDService.unread_count(self.user), 2)
+
+        NotificationCRUDService.delete(self.user, second.id)
+        NotificationCRUDService.delete(self.user, first.id)
+        self.assertEqual(NotificationCRUDService.unread_count(self.user), 1)
+
+        NotificationCRUDService.mark_all_read(self.user)
+        self.assertEqual(NotificationCRUDService.unread_count(self.user), 0)
+
+    def test_reconcile_repairs_drift(self):
+        NotificationCounter.objects.filter(user=self.user).update(unread=42)
+        other = User.objects.create_user(email="nocounter@example.com", password="testpassword")
+        Notification.objects.create(user=other, event="welcome", title="Hi", message="Hi")
+
+        self.assertEqual(reconcile_unread_counters(), 2)
+
+        self.assertEqual(NotificationCRUDService.unread_count(self.user), 3)
+        self.assertEqual(NotificationCRUDService.unread_count(other), 1)
+
+
+class NotificationFeedTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="feed@example.com", password="testpassword")
+        Notification.objects.bulk_create([
+            Notification(user=self.user, event="welcome", title=f"N{i}", message="m", metadata={"i": i})
+            for i in range(45)
+        ])
+        # Identical timestamps: the id tie-breaker must keep pages disjoint
+        Notification.objects.filter(title__in=["N10", "N11", "N12", "N13"]).update(
+            created_at=Notification.objects.get(title="N10").created_at
+        )
+        self.client.force_login(self.user)
+
+    def test_cursor_walks_feed_without_gaps_or_repeats(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/api/notifications/", params)
+            self.assertEqual(response.status_code, 200)
+
+            data = response.json()["data"]
+            seen += [row["id"] for row in data["results"]]
+            pages += 1
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        expected = [str(pk) for pk in Notification.objects.filter(user=self.user).values_list("id", flat=True)]
+        self.assertEqual(seen, expected)
+        self.assertNotIn("metadata", data["results"][0])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/notifications/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json()["errors"])
+
+    def test_invalid_limit_is_reported_as_limit(self):
+        response = self.client.get("/api/notifications/", {"limit": "ten"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()["errors"]), ["limit"])
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from firebase_admin import exceptions, messaging
+
+from ..models.device_models import DeviceToken
+from ..utils.firebase_utils import FCMTransport, FakePushTransport, send_firebase_push_batch
+
+User = get_user_model()
+
+
+class PushBatchingTestCase(TestCase):
+    def _messages(self, tokens, **payload):
+        return [
+            {"token": t, "title": "Hi", "body": "Body", "data": payload.get("data", {"event": "x"})}
+            for t in tokens
+        ]
+
+    def test_shared_payload_is_multicast_in_chunks_of_500(self):
+        transport = FakePushTransport()
+        tokens = [f"t{i}" for i in range(1200)]
+
+        results = send_firebase_push_batch(self._messages(tokens), transport=transport)
+
+        self.assertEqual(results, [True] * 1200)
+        self.assertEqual(transport.calls, [("multicast", 500), ("multicast", 500), ("multicast", 200)])
+
+    def test_distinct_payloads_are_packed_per_call(self):
+        transport = FakePushTransport()
+        messages = [
+            {"token": f"t{i}", "title": "Hi", "body": "Body", "data": {"notification_id": i}}
+            for i in range(700)
+        ]
+
+        send_firebase_push_batch(messages, transport=transport)
+
+        self.assertEqual(transport.calls, [("each", 500), ("each", 200)])
+
+    def test_invalid_tokens_are_pruned_and_reported(self):
+        user = User.objects.create_user(email="push@example.com", password="testpassword")
+        DeviceToken.objects.bulk_create([
+            DeviceToken(user=user, token=t) for t in ("good", "dead-1", "dead-2")
+        ])
+        transport = FakePushTransport(invalid_tokens={"dead-1", "dead-2"})
+
+        results = send_firebase_push_batch(
+            self._messages(["good", "dead-1", "dead-2"]), transport=transport
+        )
+
+        self.assertEqual(results, [True, False, False])
+        self.assertEqual(
+            list(DeviceToken.objects.values_list("token", flat=True)), ["good"]
+        )
+
+    @patch("firebase_admin.get_app")
+    def test_payload_errors_do_not_prune_tokens(self, get_app):
+        user = User.objects.create_user(email="payload@example.com", password="testpassword")
+        DeviceToken.objects.bulk_create([
+            DeviceToken(user=user, token=t) for t in ("phone", "tablet", "gone")
+        ])
+        bad_payload = exceptions.InvalidArgumentError("Invalid data payload key: from")
+        responses = [
+            SimpleNamespace(success=False, exception=bad_payload),
+            SimpleNamespace(success=False, exception=bad_payload),
+            SimpleNamespace(success=False, exception=messaging.UnregisteredError("Unregistered")),
+        ]
+
+        with patch.object(messaging, "send_each_for_multicast",
+                          return_value=SimpleNamespace(responses=responses)):
+            results = send_firebase_push_batch(
+                self._messages(["phone", "tablet", "gone"], data={"from": "x"}),
+                transport=FCMTransport(),
+            )
+
+        self.assertEqual(results, [False, False, False])
+        # Only the unregistered token goes; the payload error is not the tokens' fault
+        self.assertEqual(
+            sorted(DeviceToken.objects.values_list("token", flat=True)), ["phone", "tablet"]
+        )
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from ..models.device_models import DeviceToken
+from ..models.preference_models import UserNotificationPreference
+from ..services.notification_service import NotificationService
+from ..services.recipient_cache import PREFERENCES_CACHE, DEVICE_TOKENS_CACHE
+
+User = get_user_model()
+
+
+@patch("core.services.notification_service.send_notification_emails")
+@patch("core.services.notification_service.send_firebase_push_batch")
+class RecipientCacheTestCase(TestCase):
+    def setUp(self):
+        PREFERENCES_CACHE.clear()
+        DEVICE_TOKENS_CACHE.clear()
+        self.user = User.objects.create_user(email="cached@example.com", password="testpassword")
+        self.prefs = UserNotificationPreference.objects.create(user=self.user, emailEnabled=False)
+        DeviceToken.objects.create(user=self.user, token="token-a")
+
+    def notify(self):
+        NotificationService.notify_many([{
+            "user": self.user, "event": "break_reminder", "title": "T", "message": "M",
+        }])
+
+    def test_warm_delivery_skips_preference_and_token_queries(self, push_batch, email_batch):
+        push_batch.side_effect = lambda messages: [True] * len(messages)
+
+        self.notify()
+        NotificationService.deliver_pending()
+
+        self.notify()
+        # claim (4) + status update; preferences and tokens come from the cache
+        with self.assertNumQueries(5):
+            NotificationService.deliver_pending()
+
+        stats = PREFERENCES_CACHE.stats()
+        self.assertEqual((stats["misses"], stats["local_hits"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_signals_invalidate(self, push_batch, email_batch):
+        push_batch.side_effect = lambda messages: [True] * len(messages)
+        self.notify()
+        NotificationService.deliver_pending()
+
+        DeviceToken.objects.create(user=self.user, token="token-b")
+        self.prefs.emailEnabled = True
+        self.prefs.save()
+
+        self.notify()
+        NotificationService.deliver_pending()
+
+        tokens = sorted(m["token"] for m in push_batch.call_args.args[0])
+        self.assertEqual(tokens, ["token-a", "token-b"])
+        email_batch.assert_called_once()
+
+    @override_settings(NOTIFICATION_CACHE_SHARED_ALIAS="default")
+    def test_shared_tier_serves_other_processes(self, push_batch, email_batch):
+        cache.clear()
+        PREFERENCES_CACHE.get_many([self.user.pk])
+
+        # A fresh process: empty local tier, warm shared tier
+        PREFERENCES_CACHE.clear()
+        with self.assertNumQueries(0):
+            prefs = PREFERENCES_CACHE.get_many([self.user.pk])[self.user.pk]
+
+        self.assertEqual(prefs.pk, self.prefs.pk)
+        self.assertEqual(PREFERENCES_CACHE.stats()["shared_hits"], 1)
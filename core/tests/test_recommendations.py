@@ -1,11 +1,18 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.utils import timezone
 
 from ..models.recommendation_models import UserMetrics, BreakRecommendation
+from ..models.date_models import BlackoutDate
 from ..services.recommendation_service import RecommendationService
+from ..services.user_metrics_service import UserMetricsService
 
 User = get_user_model()
 
@@ -38,6 +45,77 @@ class RecommendationServiceTestCase(TestCase):
         self.assertGreater(recommendation.predicted_length_days, 0)
         self.assertIsNotNone(recommendation.message)
 
+    def test_recent_recommendation_follows_pointer(self):
+        first = RecommendationService.generate_recommendation(self.user)
+        metrics = UserMetricsService.get_fresh(self.user)
+        self.assertEqual(metrics.latest_recommendation_id, first.id)
+
+        # Fresh metrics fetch + primary-key lookup of the pointed-at row
+        with self.assertNumQueries(2):
+            again = RecommendationService.generate_recommendation(self.user)
+        self.assertEqual(again.id, first.id)
+
+    def test_deleting_latest_recommendation_repoints(self):
+        older = BreakRecommendation.objects.create(
+            user=self.user,
+            recommended_start_date=timezone.localdate(),
+            recommended_end_date=timezone.localdate() + timedelta(days=3),
+            predicted_length_days=3,
+            recommended_season='summer',
+            message='older',
+        )
+        newer = RecommendationService.generate_recommendation(self.user)
+        self.assertEqual(newer.id, older.id)
+
+        BreakRecommendation.objects.filter(pk=older.pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        latest = BreakRecommendation.objects.create(
+            user=self.user,
+            recommended_start_date=timezone.localdate(),
+            recommended_end_date=timezone.localdate() + timedelta(days=3),
+            predicted_length_days=3,
+            recommended_season='summer',
+            message='latest',
+        )
+        self.metrics.refresh_from_db()
+        self.assertEqual(self.metrics.latest_recommendation_id, latest.id)
+
+        latest.delete()
+        self.metrics.refresh_from_db()
+        self.assertEqual(self.metrics.latest_recommendation_id, older.id)
+
+    def test_recommendation_uses_suggestion_context(self):
+        # Blackouts loaded for suggestions also steer the recommendation
+        today = timezone.localdate()
+        blackout_end = today + timedelta(days=90)
+        BlackoutDate.objects.create(
+            user=self.user,
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=90),
+        )
+
+        recommendation = RecommendationService.generate_recommendation(self.user, force=True)
+
+        self.assertGreater(recommendation.recommended_start_date, blackout_end)
+        self.assertEqual(
+            recommendation.predicted_length_days,
+            (recommendation.recommended_end_date - recommendation.recommended_start_date).days + 1,
+        )
+
+    def test_throttle_lookup_uses_user_created_index(self):
+        since = timezone.now() - timedelta(days=7)
+        with CaptureQueriesContext(connection) as queries:
+            RecommendationService.latest_recommendation(self.user, since=since)
+        self.assertEqual(len(queries), 1)
+
+        # Plan of the exact SQL the service issued
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn('breakrec_user_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan.upper())
+
 class RecommendationAPITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from ..models.break_models import BreakSuggestion
+from ..models.leave_balance_models import LeaveBalance
+from ..models.date_models import SpecialDate
+from ..ml_engine.recommendation_engine import UserContext, DayMask, recommend
+from ..services.suggestion_service import SuggestionService
+
+User = get_user_model()
+
+# A Monday
+TODAY = date(2026, 3, 2)
+METRICS = {
+    "work_hours_per_week": 40,
+    "stress_level": 5,
+    "sleep_quality": 5,
+    "prefers_travel": False,
+    "season_preference": "no_preference",
+}
+
+
+class RecommendationEngineTestCase(TestCase):
+    def test_day_mask_window_costs(self):
+        ctx = UserContext(
+            today=TODAY,
+            leave_balance=10,
+            metrics=METRICS,
+            holidays=((TODAY + timedelta(days=14), "Holiday"),),
+            blackouts=((TODAY + timedelta(days=21), TODAY + timedelta(days=22)),),
+        )
+        mask = DayMask(ctx)
+
+        leave, blocked, holidays = mask.windows(7)
+
+        # Mon-Sun week costs 5 leave days, 4 when the Monday is a holiday
+        self.assertEqual(leave[7], 5)
+        self.assertEqual(leave[14], 4)
+        self.assertEqual(holidays[14], 1)
+        self.assertTrue(blocked[21])
+        self.assertFalse(blocked[7])
+
+    def test_holiday_bridge_is_ranked_and_widened(self):
+        # Friday holiday: Thu leave + Fri-Sun gives four days off for one leave day
+        holiday = TODAY + timedelta(days=18)
+        ctx = UserContext(
+            today=TODAY,
+            leave_balance=10,
+            metrics=METRICS,
+            holidays=((holiday, "Good Friday"),),
+        )
+
+        ranked = recommend(ctx, limit=5)
+        bridge = next(c for c in ranked if c.source == "holiday")
+
+        self.assertLessEqual(bridge.start, holiday)
+        self.assertGreaterEqual(bridge.end, holiday + timedelta(days=2))
+        self.assertEqual(bridge.rest_days / bridge.leave_days, 4)
+
+        for a in ranked:
+            for b in ranked:
+                if a is not b:
+                    self.assertFalse(a.overlaps(b))
+
+    def test_no_balance_yields_nothing(self):
+        ctx = UserContext(today=TODAY, leave_balance=0, metrics=METRICS)
+        self.assertEqual(recommend(ctx), [])
+
+
+class SuggestionServiceTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='suggest@example.com',
+            password='testpassword',
+        )
+        LeaveBalance.objects.create(
+            user=self.user,
+            anual_leave_balance=20,
+            anual_leave_refresh_date=TODAY + timedelta(days=300),
+            already_used_balance=0,
+        )
+        SpecialDate.objects.create(
+            user=self.user,
+            title="Anniversary",
+            date=TODAY + timedelta(days=30),
+        )
+
+    def test_generate_bulk_creates_ranked_suggestions(self):
+        context = SuggestionService.load_context(self.user, today=TODAY)
+
+        with self.assertNumQueries(1):
+            suggestions = SuggestionService.generate(self.user, limit=3, context=context)
+
+        self.assertEqual(len(suggestions), 3)
+        self.assertEqual(BreakSuggestion.objects.filter(user=self.user).count(), 3)
+
+        priorities = [s.priority for s in suggestions]
+        self.assertEqual(priorities, sorted(priorities, reverse=True))
+        self.assertTrue(any("Anniversary" in s.title for s in suggestions))
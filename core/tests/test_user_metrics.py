@@ -0,0 +1,211 @@
+import math
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models.recommendation_models import UserMetrics
+from ..models.mood_models import Mood
+from ..models.break_execution import BreakExecution
+from ..models.preference_models import BreakPreferences
+from ..ml_engine.decay_estimator import DecayedEstimator
+from ..services.user_metrics_service import UserMetricsService
+
+User = get_user_model()
+
+
+class IncrementalUserMetricsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='metrics@example.com',
+            password='testpassword',
+        )
+        UserMetricsService.build(self.user)
+
+    def test_mood_checkin_updates_estimators(self):
+        Mood.objects.create(user=self.user, mood_type="angry")
+        Mood.objects.create(user=self.user, mood_type="anxious")
+
+        metrics = UserMetrics.objects.get(user=self.user)
+
+        self.assertAlmostEqual(metrics.decayed_stress, 8.5, places=3)
+        self.assertEqual(metrics.stress_level, 8)
+        self.assertEqual(metrics.sleep_quality, 8)
+
+    def test_break_status_change_moves_contribution(self):
+        start = timezone.localdate() - timedelta(days=2)
+        br = BreakExecution.objects.create(
+            user=self.user,
+            recommended_start=start,
+            recommended_end=start + timedelta(days=1),
+            status="approved",
+        )
+        br = BreakExecution.objects.get(pk=br.pk)
+
+        br.status = "missed"
+        br.save(update_fields=["status"])
+
+        metrics = UserMetrics.objects.get(user=self.user)
+        self.assertGreater(metrics.decay_state["stress"]["ba"], 1.0)
+        self.assertEqual(metrics.stress_level, 6)
+
+        br.delete()
+        metrics.refresh_from_db()
+        self.assertAlmostEqual(metrics.decay_state["stress"]["ba"], 0.0, places=6)
+        self.assertEqual(metrics.stress_level, 5)
+
+    def test_incremental_matches_backfill(self):
+        Mood.objects.create(user=self.user, mood_type="sad")
+        Mood.objects.create(user=self.user, mood_type="happy")
+        incremental = UserMetrics.objects.get(user=self.user)
+
+        rebuilt = UserMetricsService.build(self.user)
+
+        self.assertAlmostEqual(incremental.decayed_stress, rebuilt.decayed_stress, places=4)
+        self.assertAlmostEqual(incremental.decayed_sleep, rebuilt.decayed_sleep, places=4)
+        self.assertEqual(incremental.stress_level, rebuilt.stress_level)
+
+    def test_future_break_counts_once_it_happens(self):
+        start = timezone.localdate() + timedelta(days=3)
+        br = BreakExecution.objects.create(
+            user=self.user,
+            recommended_start=start,
+            recommended_end=start + timedelta(days=1),
+            status="approved",
+        )
+        br = BreakExecution.objects.get(pk=br.pk)
+        br.status = "missed"
+        br.save(update_fields=["status"])
+
+        # Not counted before its date, neither streamed nor backfilled
+        streamed = UserMetrics.objects.get(user=self.user)
+        self.assertEqual(streamed.decay_state.get("stress", {}).get("ba", 0.0), 0.0)
+        self.assertIn("pending", streamed.decay_state)
+        self.assertEqual(UserMetricsService.build(self.user).decay_state["pending"], streamed.decay_state["pending"])
+
+        # Once it has passed, both give the same decayed sum
+        later = timezone.now() + timedelta(days=7)
+        UserMetricsService._advance(streamed, later)
+        backfilled = UserMetricsService._backfill_decay_state(self.user, later)
+        self.assertNotIn("pending", streamed.decay_state)
+        self.assertAlmostEqual(
+            streamed.decay_state["stress"]["ba"], backfilled["stress"]["ba"], places=9
+        )
+        self.assertGreater(backfilled["stress"]["ba"], 1.0)
+
+    def test_old_moods_fade_instead_of_dropping_out(self):
+        mood = Mood.objects.create(user=self.user, mood_type="sad")
+        Mood.objects.filter(pk=mood.pk).update(created_at=timezone.now() - timedelta(days=10))
+
+        metrics = UserMetricsService.build(self.user)
+
+        self.assertAlmostEqual(
+            metrics.decay_state["sleep"]["neg"], math.exp(-10 / 7), places=3
+        )
+        self.assertEqual(metrics.stress_level, 7)
+
+    def test_roll_forward_expires_buckets_and_decays(self):
+        old_day = (timezone.localdate() - timedelta(days=30)).isoformat()
+        UserMetrics.objects.filter(user=self.user).update(
+            rolling_buckets={old_day: {"th": 48}},
+            decay_state={"stress": {"ba": 3.0}},
+            decay_updated_at=timezone.now() - timedelta(days=14),
+        )
+
+        self.assertEqual(UserMetricsService.roll_forward(), 1)
+
+        metrics = UserMetrics.objects.get(user=self.user)
+        self.assertEqual(metrics.rolling_buckets, {})
+        self.assertEqual(metrics.work_hours_per_week, 40)
+        self.assertAlmostEqual(metrics.decay_state["stress"]["ba"], 3.0 / math.e, places=3)
+        self.assertEqual(metrics.stress_level, 6)
+
+
+class UserMetricsFreshnessTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='fresh@example.com',
+            password='testpassword',
+        )
+        UserMetricsService.build(self.user)
+
+    def test_fresh_metrics_cost_one_query(self):
+        with self.assertNumQueries(1):
+            metrics = UserMetricsService.get_fresh(self.user)
+        self.assertFalse(metrics.is_dirty)
+
+    def test_incremental_update_keeps_metrics_fresh(self):
+        Mood.objects.create(user=self.user, mood_type="angry")
+
+        metrics = UserMetrics.objects.get(user=self.user)
+        self.assertFalse(metrics.is_dirty)
+        self.assertFalse(UserMetricsService.is_stale(metrics))
+
+    def test_preference_change_triggers_rebuild(self):
+        BreakPreferences.objects.create(
+            user=self.user,
+            preference="long_weekends",
+            weather_based_recommendation=True,
+        )
+
+        metrics = UserMetrics.objects.get(user=self.user)
+        self.assertTrue(metrics.is_dirty)
+        self.assertFalse(metrics.prefers_travel)
+
+        metrics = UserMetricsService.get_fresh(self.user)
+        self.assertFalse(metrics.is_dirty)
+        self.assertTrue(metrics.prefers_travel)
+
+    @override_settings(USER_METRICS_TTL_SECONDS=60)
+    def test_expired_ttl_triggers_rebuild(self):
+        stale_at = timezone.now() - timedelta(minutes=5)
+        UserMetrics.objects.filter(user=self.user).update(computed_at=stale_at)
+
+        metrics = UserMetricsService.get_fresh(self.user)
+
+        self.assertGreater(metrics.computed_at, stale_at)
+
+
+class DecayedEstimatorTestCase(TestCase):
+    def test_streaming_matches_backfill(self):
+        estimator = DecayedEstimator(time_constant_days=7)
+        day = 86400.0
+        timestamps = [0.0, 2 * day, 3 * day, 9 * day]
+        values = [1.0, 4.0, 2.0, 5.0]
+
+        sums, last = {}, timestamps[0]
+        for ts, value in zip(timestamps, values):
+            sums = estimator.advance(sums, ts - last)
+            estimator.observe(sums, "x", value)
+            last = ts
+        sums = estimator.advance(sums, 12 * day - last)
+
+        self.assertAlmostEqual(
+            sums["x"], estimator.backfill(12 * day, timestamps, values), places=9
+        )
+
+    def test_future_observations_are_deferred(self):
+        estimator = DecayedEstimator(time_constant_days=7)
+        day = 86400.0
+        timestamps = [0.0, 2 * day, 5 * day]
+        values = [1.0, 4.0, 2.0]
+
+        # At day 2 the day-5 event is already known but hasn't happened
+        sums, pending = {}, {}
+        estimator.observe(sums, "x", values[0], age_seconds=2 * day)
+        estimator.observe(sums, "x", values[1])
+        estimator.defer(pending, "x", values[2], timestamps[2])
+        self.assertAlmostEqual(
+            sums["x"], estimator.backfill(2 * day, timestamps, values), places=9
+        )
+        with self.assertRaises(ValueError):
+            estimator.observe(sums, "x", values[2], age_seconds=-3 * day)
+
+        sums = estimator.advance(sums, 10 * day)
+        estimator.release(sums, pending, 12 * day)
+
+        self.assertEqual(pending, {})
+        self.assertAlmostEqual(
+            sums["x"], estimator.backfill(12 * day, timestamps, values), places=9
+        )
@@ -6,6 +6,7 @@ from ..views.notification_views import (
     MarkAllReadAPIView,
     NotificationDeleteAPIView,
     UnreadNotificationCountAPIView,
+    NotificationOutboxStatsAPIView,
 )
 
 urlpatterns = [
@@ -14,4 +15,5 @@ urlpatterns = [
     path("api/notifications/mark-all-read/", MarkAllReadAPIView.as_view()),
     path("api/notifications/<uuid:pk>/delete/", NotificationDeleteAPIView.as_view()),
     path("api/notifications/unread-count/", UnreadNotificationCountAPIView.as_view()),
+    path("api/notifications/outbox/stats/", NotificationOutboxStatsAPIView.as_view()),
 ]
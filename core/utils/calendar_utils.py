@@ -1,19 +1,8 @@
 from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
-import requests
+from .holiday_providers import fetch_public_holidays  # noqa: F401
 # import logging
 
-
-def fetch_public_holidays(country_code, year):
-    """
-    Fetch public holidays for a specific country and year.
-    """
-    url = f"https://date.nager.at/api/v3/publicholidays/{year}/{country_code}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return []
-
 def create_calendar_event(user, date_entry):
     """
     Creates a calendar event using Google Calendar API.
@@ -1,48 +1,41 @@
-from timezonefinder import TimezoneFinder
-from geopy.geocoders import Nominatim
+from functools import lru_cache
+from types import MappingProxyType
+
 import pytz
 
+from .country_locator import get_country_locator
+
 
 
 ####### COUNTRY CODE RESOLUTION UTILITIES #######
 
-tf = TimezoneFinder()
-geolocator = Nominatim(user_agent="holiday-sync")
+# zone.tab gives every zone exactly one country; built once at import
+TIMEZONE_COUNTRY_CODES = MappingProxyType({
+    timezone_str: country_code.upper()
+    for country_code, timezones in pytz.country_timezones.items()
+    for timezone_str in timezones
+})
+
 
 def timezone_to_country_code(timezone_str: str) -> str:
     """
     Convert timezone (e.g. 'Europe/Berlin') to country code (e.g. 'DE').
     Falls back to 'US' if not found.
     """
-    try:
-        if not timezone_str:
-            return "US"
-
-        for country_code, timezones in pytz.country_timezones.items():
-            if timezone_str in timezones:
-                return country_code.upper()
-
-        return "US"
-    except Exception:
-        return "US"
+    return TIMEZONE_COUNTRY_CODES.get(timezone_str, "US") if timezone_str else "US"
 
 
 def coords_to_country_code(coords: str) -> str:
     """
     Convert coordinates string ('lat,long') to country code.
-    Uses geopy + Nominatim.
+    Resolved offline by CountryLocator; falls back to 'US' at sea.
     """
     try:
         if not coords:
             return "US"
 
         lat, lng = map(float, coords.split(","))
-        location = geolocator.reverse((lat, lng), language="en", timeout=10)
-
-        if location and "country_code" in location.raw["address"]:
-            return location.raw["address"]["country_code"].upper()
-
-        return "US"
+        return get_country_locator().country_at(lat, lng) or "US"
     except Exception:
         return "US"
 
@@ -51,26 +44,29 @@ def coords_to_country_code(coords: str) -> str:
 def resolve_country_code(timezone_str: str, coords: str) -> str:
     """
     Resolve the most accurate country code:
-    1. From timezone
-    2. From coordinates
+    1. From coordinates
+    2. From timezone
     3. Fallback 'US'
     """
-    if timezone_str:
-        code = timezone_to_country_code(timezone_str)
+    # Coordinates first: a timezone shared by several countries
+    # (e.g. one detected from coords as 'Europe/Paris') can't tell them apart
+    if coords:
+        code = coords_to_country_code(coords)
         if code != "US":  # Only fallback if unresolved
             return code
 
-    if coords:
-        return coords_to_country_code(coords)
+    if timezone_str:
+        return timezone_to_country_code(timezone_str)
 
     return "US"
 
 
 
+@lru_cache(maxsize=4096)
+def _timezone_at(lat: float, lng: float) -> str:
+    return get_country_locator().finder.timezone_at(lat=lat, lng=lng)
 
 
-tf = TimezoneFinder()
-
 def detect_timezone_from_coords(coords: str) -> str:
     """
     Convert coordinates to timezone string.
@@ -79,8 +75,9 @@ def detect_timezone_from_coords(coords: str) -> str:
         if not coords:
             return None
 
-        lat, lng = map(float, coords.split(","))
-        timezone_str = tf.timezone_at(lat=lat, lng=lng)
+        # Rounded to ~10 m so repeat logins from the same place hit the cache
+        lat, lng = (round(float(part), 4) for part in coords.split(","))
+        timezone_str = _timezone_at(lat, lng)
 
         return timezone_str
     except Exception:
@@ -0,0 +1,102 @@
+import csv
+import math
+import os
+import threading
+from importlib import resources
+
+import numpy as np
+from timezonefinder import TimezoneFinder
+
+# Bundled cities (country_code, lat, lng, name) that fill in the countries
+# sharing a timezone polygon; tzdata's zone.tab adds one point per zone.
+REFERENCE_POINTS_FILE = os.path.join(os.path.dirname(__file__), "data", "country_points.csv")
+
+
+# -------------------REFERENCE POINTS ------------
+
+def _iso6709(value, degree_digits):
+    """'+5230' / '-0740023' style zone.tab coordinate to decimal degrees."""
+    sign = -1 if value[0] == "-" else 1
+    digits = value[1:]
+    degrees = int(digits[:degree_digits])
+    minutes = int(digits[degree_digits:degree_digits + 2])
+    seconds = int(digits[degree_digits + 2:] or 0)
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+
+def zone_tab_points() -> list:
+    """(country_code, lat, lng) of every zone's principal city in tzdata's zone.tab."""
+    text = resources.files("tzdata").joinpath("zoneinfo/zone.tab").read_text()
+    points = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        code, coords = line.split("\t")[:2]
+        split = max(coords.rfind("+"), coords.rfind("-"))
+        points.append((code, _iso6709(coords[:split], 2), _iso6709(coords[split:], 3)))
+    return points
+
+
+def bundled_points(path=REFERENCE_POINTS_FILE) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["country_code"], float(row["lat"]), float(row["lng"])) for row in csv.DictReader(f)]
+
+
+# -------------------LOCATOR ------------
+
+class CountryLocator:
+    """
+    Offline coordinates -> ISO country code. timezonefinder narrows a point
+    to its timezone polygon, whose edges follow national borders wherever
+    a border changes the clock; within that polygon the country of the
+    nearest reference point wins. So the nearest-point guess only ever
+    picks between countries that share a zone (the Central European ones,
+    East Africa and Moscow, ...), never across a timezone border.
+    """
+
+    def __init__(self, points=None, finder=None):
+        self.finder = finder or TimezoneFinder()
+        if points is None:
+            points = zone_tab_points() + bundled_points()
+
+        groups = {}
+        for code, lat, lng in points:
+            zone = self.finder.timezone_at(lat=lat, lng=lng)
+            groups.setdefault(zone, []).append((code, lat, lng))
+        # Zones with no reference point of their own search every point
+        self._everywhere = self._index(points)
+        self._zones = {zone: self._index(rows) for zone, rows in groups.items() if zone}
+
+    @staticmethod
+    def _index(rows):
+        codes = np.array([code for code, _, _ in rows])
+        lats = np.radians([lat for _, lat, _ in rows])
+        lngs = np.radians([lng for _, _, lng in rows])
+        return codes, lats, np.cos(lats), lngs
+
+    def country_at(self, lat, lng):
+        """Country code at ``lat``/``lng``, or None out at sea."""
+        zone = self.finder.timezone_at(lat=lat, lng=lng)
+        # International waters only have nautical Etc/GMT±N zones
+        if not zone or zone.startswith("Etc/"):
+            return None
+
+        codes, lats, cos_lats, lngs = self._zones.get(zone, self._everywhere)
+        lat, lng = math.radians(lat), math.radians(lng)
+        # Haversine term; its order is the great-circle distance order
+        h = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * cos_lats * np.sin((lngs - lng) / 2) ** 2
+        return str(codes[np.argmin(h)])
+
+
+_locator = None
+_locator_lock = threading.Lock()
+
+
+def get_country_locator():
+    """Process-wide locator, built on first use so importing stays cheap."""
+    global _locator
+    if _locator is None:
+        with _locator_lock:
+            if _locator is None:
+                _locator = CountryLocator()
+    return _locator
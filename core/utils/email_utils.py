@@ -1,8 +1,14 @@
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import logging
+import queue
 import smtplib
+import threading
+import time
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 
 # -------------------SEND EMAIL ------------
@@ -39,18 +45,9 @@ def send_otp_email(email, otp):
         msg["To"] = to_email
         msg.attach(MIMEText(body, "html"))
 
-        # Decide between SSL or TLS
-        if getattr(settings, "EMAIL_USE_SSL", False):
-            server = smtplib.SMTP_SSL(settings.EMAIL_HOST, settings.EMAIL_PORT)
-        else:
-            server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
-            if getattr(settings, "EMAIL_USE_TLS", False):
-                server.starttls()
-
-        # Login & send
-        server.login(settings.EMAIL_USER, settings.EMAIL_PASSWORD)
-        server.sendmail(from_email, [to_email], msg.as_string())
-        server.quit()
+        # Send over a pooled, already logged-in connection
+        if not get_smtp_pool().send(from_email, [to_email], msg.as_string()):
+            return False, f"Failed to send OTP to {email}"
 
         return True, f"OTP sent successfully to {email}"
 
@@ -125,59 +122,233 @@ def send_otp_email(email, otp):
 
 
 
-def send_notification_email(email, title, message):
-    try:
-        brand_name = "Better Breaks"
-        subject = f"{brand_name} - {title}"
+def _build_notification_message(email, title, message):
+    brand_name = "Better Breaks"
+    subject = f"{brand_name} - {title}"
 
-        body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2 style="color:#4CAF50;">{brand_name}</h2>
+    body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2 style="color:#4CAF50;">{brand_name}</h2>
 
-                <p>Hello,</p>
+            <p>Hello,</p>
 
-                {message}
+            {message}
 
-                <hr style="margin:20px 0;" />
+            <hr style="margin:20px 0;" />
 
-                <p style="font-size:12px;color:#777;">
-                    You are receiving this email because notifications are enabled
-                    on your Better Breaks account.
-                </p>
+            <p style="font-size:12px;color:#777;">
+                You are receiving this email because notifications are enabled
+                on your Better Breaks account.
+            </p>
 
-                <p>
-                    <strong>{brand_name} Team</strong>
-                </p>
-            </body>
-        </html>
-        """
+            <p>
+                <strong>{brand_name} Team</strong>
+            </p>
+        </body>
+    </html>
+    """
 
-        from_email = settings.EMAIL_USER
-        to_email = email
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = f"{brand_name} <{settings.EMAIL_USER}>"
+    msg["To"] = email
+    msg.attach(MIMEText(body, "html"))
+    return msg
 
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = f"{brand_name} <{from_email}>"
-        msg["To"] = to_email
-        msg.attach(MIMEText(body, "html"))
 
-        if getattr(settings, "EMAIL_USE_SSL", False):
-            server = smtplib.SMTP_SSL(settings.EMAIL_HOST, settings.EMAIL_PORT)
+def _open_smtp_connection():
+    timeout = getattr(settings, "EMAIL_TIMEOUT", 30)
+
+    if getattr(settings, "EMAIL_USE_SSL", False):
+        server = smtplib.SMTP_SSL(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=timeout)
+    else:
+        server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=timeout)
+        if getattr(settings, "EMAIL_USE_TLS", False):
+            server.starttls()
+
+    server.login(settings.EMAIL_USER, settings.EMAIL_PASSWORD)
+    return server
+
+
+# -------------------CONNECTION POOL ------------
+
+# SMTP errors that mean the connection itself is unusable; every other
+# SMTPException is a rejected message on a good connection. Any other
+# OSError from a send (reset, timeout, TLS) also drops the connection.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+class SMTPConnectionPool:
+    """
+    Reuses logged-in SMTP connections across messages and batches.
+
+    Idle connections are kept (up to ``size``) and handed back out
+    instead of paying a TLS handshake and login per email. A connection
+    is retired after ``max_messages`` sends or ``max_idle`` seconds
+    unused. If a send fails because the connection died, the pool
+    reconnects and retries that message once.
+    """
+
+    def __init__(self, connect=_open_smtp_connection, size=4, max_messages=100, max_idle=60):
+        self._connect = connect
+        self.size = size
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0, "retired": 0, "reconnects": 0, "sent": 0, "failed": 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _open(self):
+        conn = self._connect()
+        self._count("opened")
+        return conn
+
+    def _close(self, conn):
+        self._count("retired")
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        """Return ``(connection, messages_already_sent)``."""
+        while True:
+            try:
+                conn, sent, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open(), 0
+
+            if time.monotonic() - last_used > self.max_idle:
+                self._close(conn)
+                continue
+
+            self._count("reused")
+            return conn, sent
+
+    def _release(self, conn, sent):
+        if sent >= self.max_messages or self._idle.qsize() >= self.size:
+            self._close(conn)
         else:
-            server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
-            if getattr(settings, "EMAIL_USE_TLS", False):
-                server.starttls()
+            self._idle.put((conn, sent, time.monotonic()))
 
-        server.login(settings.EMAIL_USER, settings.EMAIL_PASSWORD)
-        server.sendmail(from_email, [to_email], msg.as_string())
-        server.quit()
+    def send(self, from_addr, to_addrs, payload) -> bool:
+        return self.send_many([(from_addr, to_addrs, payload)])[0]
 
-        return True
+    def send_many(self, messages) -> list[bool]:
+        """
+        Send ``(from_addr, to_addrs, payload)`` messages, rotating to a new
+        connection whenever the per-connection limit is reached.
+        Failing to get the first connection raises; later failures,
+        including failed reconnects, are reported per message.
+        """
+        results = []
+        conn, sent = self._acquire()
+
+        try:
+            for from_addr, to_addrs, payload in messages:
+                if conn is not None and sent >= self.max_messages:
+                    self._close(conn)
+                    conn = None
+
+                ok = False
+                for attempt in range(2):
+                    if conn is None:
+                        try:
+                            conn, sent = self._open(), 0
+                        except (OSError, smtplib.SMTPException) as e:
+                            # Server unreachable mid-batch (DNS, routing,
+                            # login): this message fails, earlier results stand
+                            logger.error(f"SMTP reconnect for {to_addrs} failed: {e}")
+                            break
+                    try:
+                        conn.sendmail(from_addr, to_addrs, payload)
+                        sent += 1
+                        ok = True
+                        break
+                    except smtplib.SMTPException as e:
+                        if not isinstance(e, CONNECTION_ERRORS):
+                            # Rejected message; the connection is still fine
+                            logger.error(f"SMTP send to {to_addrs} failed: {e}")
+                            break
+                        lost = e
+                    except OSError as e:
+                        # Socket-level failure (reset, timeout, TLS): connection unusable
+                        lost = e
+
+                    self._close(conn)
+                    conn = None
+                    if attempt == 0:
+                        self._count("reconnects")
+                    logger.warning(f"SMTP connection lost, reconnecting: {lost}")
+
+                self._count("sent" if ok else "failed")
+                results.append(ok)
+        finally:
+            if conn is not None:
+                self._release(conn, sent)
+
+        return results
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Process-wide pool configured from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool(
+                    size=getattr(settings, "EMAIL_POOL_SIZE", 4),
+                    max_messages=getattr(settings, "EMAIL_MAX_MESSAGES_PER_CONNECTION", 100),
+                    max_idle=getattr(settings, "EMAIL_CONNECTION_MAX_IDLE", 60),
+                )
+    return _pool
+
+
+def send_notification_email(email, title, message):
+    return send_notification_emails([(email, title, message)])[0]
 
+
+def send_notification_emails(messages):
+    """
+    Send many (email, title, message) notifications over pooled SMTP
+    connections. Returns one bool per message, in order.
+    """
+    if not messages:
+        return []
+
+    try:
+        return get_smtp_pool().send_many([
+            (
+                settings.EMAIL_USER,
+                [email],
+                _build_notification_message(email, title, message).as_string(),
+            )
+            for email, title, message in messages
+        ])
     except Exception as e:
-        print("Email error:", str(e))
-        return False
+        logger.error(f"Email error: {e}")
+        return [False] * len(messages)
 
 
 
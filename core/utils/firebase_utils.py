@@ -1,32 +1,248 @@
-
+import json
 import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
 
 logger = logging.getLogger(__name__)
 
+# FCM accepts at most 500 tokens per multicast / messages per batch call
+FCM_BATCH_LIMIT = 500
+
+
+@dataclass
+class PushResult:
+    token: str
+    success: bool
+    error: Optional[str] = None
+    # Token is dead (uninstalled app, wrong project) and should be pruned
+    invalid_token: bool = False
+
+
+# -------------------TRANSPORTS ------------
+
+class FCMTransport:
+    """firebase-admin transport. Each call sends one HTTP batch to FCM."""
+
+    def __init__(self, credentials_path=None):
+        import firebase_admin
+        from firebase_admin import credentials, messaging
+
+        self._messaging = messaging
+        # Not INVALID_ARGUMENT: FCM also returns it for a bad payload (e.g.
+        # reserved or oversize data keys), which says nothing about the token
+        self._invalid_errors = (
+            messaging.UnregisteredError,
+            messaging.SenderIdMismatchError,
+        )
+
+        try:
+            self.app = firebase_admin.get_app()
+        except ValueError:
+            self.app = firebase_admin.initialize_app(
+                credentials.Certificate(credentials_path or settings.FIREBASE_CREDENTIALS_PATH)
+            )
+
+    def send_multicast(self, tokens, title, body, data) -> list[PushResult]:
+        messaging = self._messaging
+        response = messaging.send_each_for_multicast(
+            messaging.MulticastMessage(
+                tokens=list(tokens),
+                notification=messaging.Notification(title=title, body=body),
+                data=data,
+            ),
+            app=self.app,
+        )
+        return [self._result(token, r) for token, r in zip(tokens, response.responses)]
+
+    def send_each(self, messages) -> list[PushResult]:
+        messaging = self._messaging
+        response = messaging.send_each(
+            [
+                messaging.Message(
+                    token=m["token"],
+                    notification=messaging.Notification(title=m["title"], body=m["body"]),
+                    data=m["data"],
+                )
+                for m in messages
+            ],
+            app=self.app,
+        )
+        return [self._result(m["token"], r) for m, r in zip(messages, response.responses)]
+
+    def _result(self, token, response) -> PushResult:
+        if response.success:
+            return PushResult(token=token, success=True)
+        return PushResult(
+            token=token,
+            success=False,
+            error=str(response.exception),
+            invalid_token=isinstance(response.exception, self._invalid_errors),
+        )
+
+
+class LogOnlyTransport:
+    """Used when no Firebase credentials are configured (local development)."""
+
+    def send_multicast(self, tokens, title, body, data) -> list[PushResult]:
+        logger.info(f"Firebase Push (not configured) → {title} x{len(tokens)}")
+        return [PushResult(token=t, success=True) for t in tokens]
+
+    def send_each(self, messages) -> list[PushResult]:
+        for m in messages:
+            logger.info(f"Firebase Push (not configured) → {m['title']}")
+        return [PushResult(token=m["token"], success=True) for m in messages]
+
+
+class FakePushTransport:
+    """
+    In-memory stand-in for tests and benchmarks. Records every call,
+    reports ``invalid_tokens`` as unregistered and can simulate the
+    per-request round trip with ``latency`` seconds.
+    """
+
+    def __init__(self, invalid_tokens=(), latency=0.0):
+        self.invalid_tokens = set(invalid_tokens)
+        self.latency = latency
+        self.calls = []
+
+    def _result(self, token):
+        if token in self.invalid_tokens:
+            return PushResult(token=token, success=False, error="Unregistered", invalid_token=True)
+        return PushResult(token=token, success=True)
+
+    def send_multicast(self, tokens, title, body, data) -> list[PushResult]:
+        self.calls.append(("multicast", len(tokens)))
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._result(t) for t in tokens]
+
+    def send_each(self, messages) -> list[PushResult]:
+        self.calls.append(("each", len(messages)))
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._result(m["token"]) for m in messages]
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_push_transport():
+    """
+    Process-wide transport: ``settings.PUSH_TRANSPORT`` if set, FCM when
+    credentials are configured, otherwise log-only.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                path = getattr(settings, "PUSH_TRANSPORT", None)
+                if path:
+                    _transport = import_string(path)()
+                elif getattr(settings, "FIREBASE_CREDENTIALS_PATH", None):
+                    _transport = FCMTransport()
+                else:
+                    logger.warning("FIREBASE_CREDENTIALS_PATH not set; pushes are only logged")
+                    _transport = LogOnlyTransport()
+    return _transport
+
+
+# -------------------SENDING ------------
+
+def _stringify(data):
+    """FCM data payloads must be str -> str."""
+    return {
+        str(k): v if isinstance(v, str) else ("" if v is None else json.dumps(v, default=str))
+        for k, v in (data or {}).items()
+    }
+
+
+def _chunks(items, size=FCM_BATCH_LIMIT):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 
 def send_firebase_push(*, token, title, body, data=None):
     """
     Firebase Cloud Messaging wrapper
     """
-    try:
-        if not token:
-            return False
+    if not token:
+        return False
+    return send_firebase_push_batch([
+        {"token": token, "title": title, "body": body, "data": data}
+    ])[0]
 
-        logger.info(f"Firebase Push → {title}")
 
-        # Example (pseudo):
-        # message = messaging.Message(
-        #     notification=messaging.Notification(
-        #         title=title,
-        #         body=body,
-        #     ),
-        #     token=token,
-        #     data=data or {},
-        # )
-        # messaging.send(message)
+def send_firebase_push_batch(messages, transport=None):
+    """
+    Send many pushes in as few FCM calls as possible.
+    ``messages``: dicts with ``token``, ``title``, ``body``, ``data``.
 
-        return True
+    Messages sharing a payload go out as multicasts of up to 500 tokens;
+    the rest are packed 500 per ``send_each`` call. Tokens FCM reports
+    as dead are deleted in one query. Returns one bool per message, in order.
+    """
+    transport = transport or get_push_transport()
+    results = [False] * len(messages)
 
-    except Exception as e:
-        logger.error(f"Firebase push failed: {e}")
-        return False
+    # Group identical payloads so they can share a multicast
+    groups = {}
+    for i, m in enumerate(messages):
+        if not m.get("token"):
+            continue
+        data = _stringify(m.get("data"))
+        key = (m["title"], m["body"], tuple(sorted(data.items())))
+        groups.setdefault(key, (data, []))[1].append(i)
+
+    singles = []
+    invalid_tokens = set()
+
+    def record(indexes, outcomes):
+        for i, outcome in zip(indexes, outcomes):
+            results[i] = outcome.success
+            if outcome.invalid_token:
+                invalid_tokens.add(outcome.token)
+
+    for (title, body, _), (data, indexes) in groups.items():
+        if len(indexes) == 1:
+            singles.append((indexes[0], data))
+            continue
+        for chunk in _chunks(indexes):
+            try:
+                outcomes = transport.send_multicast(
+                    [messages[i]["token"] for i in chunk], title, body, data
+                )
+            except Exception as e:
+                logger.error(f"Firebase multicast failed: {e}")
+                continue
+            record(chunk, outcomes)
+
+    for chunk in _chunks(singles):
+        try:
+            outcomes = transport.send_each([
+                {**messages[i], "data": data} for i, data in chunk
+            ])
+        except Exception as e:
+            logger.error(f"Firebase batch send failed: {e}")
+            continue
+        record([i for i, _ in chunk], outcomes)
+
+    if invalid_tokens:
+        prune_device_tokens(invalid_tokens)
+
+    return results
+
+
+def prune_device_tokens(tokens) -> int:
+    """Delete dead device tokens in one query."""
+    from ..models.device_models import DeviceToken
+
+    deleted, _ = DeviceToken.objects.filter(token__in=list(tokens)).delete()
+    if deleted:
+        logger.info(f"Pruned {deleted} invalid device token(s)")
+    return deleted
@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+import httpx
+import requests
+from cachecontrol import CacheControlAdapter
+from cachecontrol.cache import BaseCache
+from cachecontrol.heuristics import BaseHeuristic
+from django.conf import settings
+from django.utils import timezone
+from urllib3 import HTTPResponse
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOLIDAY_API_BASE_URL = "https://date.nager.at/api/v3"
+# Retried with backoff; anything else fails the request straight away
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses whose Retry-After is honoured, as urllib3 does for the sync client
+RETRY_AFTER_STATUSES = (429, 503)
+# A pair asked to wait longer than this is given up instead of holding the batch
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+# -------------------CACHE ------------
+
+class DiskCache(BaseCache):
+    """
+    CacheControl storage in plain files, one per URL. Writes go through a
+    temp file and ``os.replace`` so concurrent workers never read a torn
+    entry (the bundled FileCache needs ``filelock`` for the same thing).
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+
+    def _path(self, key):
+        digest = hashlib.sha224(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, value, expires=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning(f"Could not write holiday API cache entry {path}")
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+
+class DefaultFreshness(BaseHeuristic):
+    """Give responses without caching headers a ``max-age`` of their own."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def update_headers(self, response):
+        if "cache-control" in response.headers or "expires" in response.headers:
+            return {}
+        return {"cache-control": f"max-age={self.seconds}"}
+
+
+# -------------------CLIENT ------------
+
+class _MeteredAdapter(CacheControlAdapter):
+    """Counts cache hits, 304 revalidations and full fetches."""
+
+    def __init__(self, record, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._record = record
+
+    def build_response(self, request, response, from_cache=False, cacheable_methods=None):
+        if from_cache:
+            self._record("hits")
+        elif response.status == 304:
+            self._record("revalidated")
+        else:
+            self._record("fetched")
+        return super().build_response(request, response, from_cache, cacheable_methods)
+
+
+class HolidayApiClient:
+    """
+    Public holiday API client: one pooled session, responses cached on disk
+    per URL (i.e. per country/year), revalidated with
+    If-None-Match / If-Modified-Since once stale, and retried with backoff
+    on connection errors, 429 and 5xx.
+    """
+
+    def __init__(self, base_url=None, cache_dir=None, timeout=None, retries=None,
+                 backoff=None, cache_seconds=None, pool_size=None):
+        self.base_url = (base_url or getattr(settings, "HOLIDAY_API_BASE_URL", DEFAULT_HOLIDAY_API_BASE_URL)).rstrip("/")
+        self.timeout = timeout or getattr(settings, "HOLIDAY_API_TIMEOUT", (3.05, 10))
+        cache_dir = cache_dir or getattr(settings, "HOLIDAY_API_CACHE_DIR", None) \
+            or os.path.join(tempfile.gettempdir(), "holiday_api_cache")
+
+        self._stats = {"requests": 0, "hits": 0, "revalidated": 0, "fetched": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+        retry = Retry(
+            total=getattr(settings, "HOLIDAY_API_RETRIES", 3) if retries is None else retries,
+            backoff_factor=getattr(settings, "HOLIDAY_API_BACKOFF", 0.5) if backoff is None else backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = _MeteredAdapter(
+            self._record,
+            cache=DiskCache(cache_dir),
+            heuristic=DefaultFreshness(
+                getattr(settings, "HOLIDAY_API_CACHE_SECONDS", 86400) if cache_seconds is None else cache_seconds
+            ),
+            max_retries=retry,
+            pool_maxsize=pool_size or getattr(settings, "HOLIDAY_API_POOL_SIZE", 10),
+        )
+        # Shared with AsyncHolidayFetcher, so batches use the same entries
+        self.controller = adapter.controller
+        self.heuristic = adapter.heuristic
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/json"
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _record(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def public_holidays(self, country_code, year) -> list:
+        """Holidays of ``country_code`` in ``year``, or [] when unavailable."""
+        self._record("requests")
+        url = f"{self.base_url}/publicholidays/{year}/{country_code}"
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._record("errors")
+            logger.warning(f"Holiday API request failed for {country_code} {year}: {e}")
+            return []
+
+        if response.status_code != 200:
+            self._record("errors")
+            logger.warning(f"Holiday API returned {response.status_code} for {country_code} {year}")
+            return []
+        try:
+            return response.json()
+        except ValueError:
+            self._record("errors")
+            logger.warning(f"Holiday API returned invalid JSON for {country_code} {year}")
+            return []
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_holiday_client():
+    """Process-wide client, so every fetch shares the connection pool."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HolidayApiClient()
+    return _client
+
+
+# -------------------CONCURRENT FETCHING ------------
+
+def retry_after_seconds(response):
+    """Seconds asked for by a Retry-After header (delay or HTTP date), else None."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - timezone.now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncHolidayFetcher:
+    """
+    Fetches many (country_code, year) pairs at once over one
+    httpx.AsyncClient with at most ``concurrency`` requests in flight.
+    Goes through the HolidayApiClient's disk cache: fresh entries are
+    served without a request, stale ones are revalidated, and hits and
+    fetches count in the client's stats. Each pair is retried with
+    backoff on its own (honouring Retry-After); a pair that still fails
+    comes back as None instead of failing the batch.
+    """
+
+    def __init__(self, base_url=None, concurrency=None, timeout=None, retries=None,
+                 backoff=None, transport=None, client=None):
+        self.base_url = (base_url or getattr(settings, "HOLIDAY_API_BASE_URL", DEFAULT_HOLIDAY_API_BASE_URL)).rstrip("/")
+        self.concurrency = concurrency or getattr(settings, "HOLIDAY_API_CONCURRENCY", 10)
+        connect, read = timeout or getattr(settings, "HOLIDAY_API_TIMEOUT", (3.05, 10))
+        self.timeout = httpx.Timeout(read, connect=connect)
+        self.retries = getattr(settings, "HOLIDAY_API_RETRIES", 3) if retries is None else retries
+        self.backoff = getattr(settings, "HOLIDAY_API_BACKOFF", 0.5) if backoff is None else backoff
+        # For tests: an httpx.MockTransport instead of the network
+        self.transport = transport
+        self.client = client or get_holiday_client()
+
+    def fetch_all(self, pairs) -> dict:
+        """``{(country_code, year): rows or None}`` for every pair."""
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        return asyncio.run(self._fetch_all(pairs))
+
+    async def _fetch_all(self, pairs):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency),
+            headers={"Accept": "application/json"},
+            transport=self.transport,
+        ) as http:
+            results = await asyncio.gather(
+                *(self._fetch_one(http, semaphore, code, year) for code, year in pairs)
+            )
+        return dict(zip(pairs, results))
+
+    async def _fetch_one(self, http, semaphore, country_code, year):
+        self.client._record("requests")
+        url = f"{self.base_url}/publicholidays/{year}/{country_code}"
+        # The cache speaks requests / urllib3; the key is the URL
+        request = requests.Request("GET", url, headers={"Accept": "application/json"}).prepare()
+        controller = self.client.controller
+
+        cached = controller.cached_request(request)
+        if cached:
+            self.client._record("hits")
+            return self._json(cached.read(decode_content=True), country_code, year)
+
+        error = None
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            async with semaphore:
+                try:
+                    response = await http.get(url, headers=controller.conditional_headers(request))
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                    response = None
+
+            if response is not None:
+                if response.status_code == 304:
+                    self.client._record("revalidated")
+                    stored = controller.update_cached_response(request, self._to_urllib3(response))
+                    return self._json(stored.read(decode_content=True), country_code, year)
+                if response.status_code == 200:
+                    self.client._record("fetched")
+                    controller.cache_response(request, self._to_urllib3(response), response.content)
+                    return self._json(response.content, country_code, year)
+
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if response.status_code in RETRY_AFTER_STATUSES:
+                    wait = retry_after_seconds(response)
+                    if wait is not None and wait > MAX_RETRY_AFTER_SECONDS:
+                        error += f", Retry-After {wait:.0f}s"
+                        break
+                    delay = max(delay, wait or 0)
+
+            # Back off without holding a slot other pairs could use
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+
+        self.client._record("errors")
+        logger.warning(f"Holiday API fetch failed for {country_code} {year}: {error}")
+        return None
+
+    def _to_urllib3(self, response):
+        """The httpx response as CacheControl expects it, with freshness applied."""
+        # httpx has already decoded the body
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        # Freshness is counted from Date; stamp responses that lack one
+        if "date" not in response.headers:
+            headers["Date"] = formatdate(usegmt=True)
+        raw = HTTPResponse(
+            body=io.BytesIO(response.content),
+            headers=headers,
+            status=response.status_code,
+            preload_content=False,
+            decode_content=False,
+            request_method="GET",
+        )
+        return self.client.heuristic.apply(raw)
+
+    def _json(self, body, country_code, year):
+        try:
+            return json.loads(body)
+        except ValueError:
+            self.client._record("errors")
+            logger.warning(f"Holiday API returned invalid JSON for {country_code} {year}")
+            return None
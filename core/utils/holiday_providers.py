@@ -0,0 +1,171 @@
+import logging
+import threading
+
+import holidays
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .holiday_client import AsyncHolidayFetcher, get_holiday_client
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------PROVIDERS ------------
+# A provider returns a country's holidays for one year in the Nager shape
+# ({"date": "YYYY-MM-DD", "name": English name, "localName": ...}), or []
+# when it has nothing for that country/year. Providers may also define
+# fetch_many(pairs) -> {(country_code, year): rows} to fetch a batch at once.
+
+class LibraryHolidayProvider:
+    """National holidays generated locally by the ``holidays`` package; no network."""
+
+    name = "library"
+
+    def fetch(self, country_code, year) -> list:
+        try:
+            local = holidays.country_holidays(country_code, years=year)
+        except NotImplementedError:
+            return []
+
+        english = local
+        languages = getattr(local, "supported_languages", ())
+        if "en_US" in languages and local.default_language != "en_US":
+            english = holidays.country_holidays(country_code, years=year, language="en_US")
+
+        rows = []
+        for day in sorted(local):
+            # Several holidays on one date come back joined with "; "
+            local_names = local.get_list(day)
+            english_names = english.get_list(day) if day in english else local_names
+            if len(english_names) != len(local_names):
+                english_names = local_names
+            for name, local_name in zip(english_names, local_names):
+                rows.append({"date": day.isoformat(), "name": name, "localName": local_name})
+        return rows
+
+
+class NagerHolidayProvider:
+    """
+    date.nager.at: single fetches through the shared, cached
+    HolidayApiClient, batches concurrently through AsyncHolidayFetcher
+    on top of the same client's cache.
+    """
+
+    name = "nager"
+
+    def __init__(self, client=None, fetcher=None):
+        self.client = client
+        self.fetcher = fetcher
+
+    def fetch(self, country_code, year) -> list:
+        return (self.client or get_holiday_client()).public_holidays(country_code, year)
+
+    def fetch_many(self, pairs) -> dict:
+        results = (self.fetcher or AsyncHolidayFetcher(client=self.client)).fetch_all(pairs)
+        return {pair: rows or [] for pair, rows in results.items()}
+
+
+HOLIDAY_PROVIDERS = {
+    LibraryHolidayProvider.name: LibraryHolidayProvider,
+    NagerHolidayProvider.name: NagerHolidayProvider,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_provider(name):
+    """Provider by registered name or dotted path, one instance per process."""
+    if name not in _instances:
+        with _instances_lock:
+            if name not in _instances:
+                cls = HOLIDAY_PROVIDERS.get(name) or import_string(name)
+                _instances[name] = cls()
+    return _instances[name]
+
+
+def providers_for(country_code) -> list:
+    """
+    Provider names to try for a country, in order:
+    ``HOLIDAY_PROVIDER_OVERRIDES[country]`` or ``HOLIDAY_PROVIDERS``.
+    """
+    overrides = getattr(settings, "HOLIDAY_PROVIDER_OVERRIDES", {})
+    return list(overrides.get(country_code) or getattr(settings, "HOLIDAY_PROVIDERS", ["library", "nager"]))
+
+
+def _record(provider_name, outcome):
+    with _stats_lock:
+        counts = _stats.setdefault(provider_name, {"served": 0, "empty": 0, "errors": 0})
+        counts[outcome] += 1
+
+
+def provider_stats() -> dict:
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+# -------------------FETCHING ------------
+
+def _fetch_batch(provider, pairs) -> dict:
+    """One provider over many pairs; a failure only loses the pairs it hit."""
+    if len(pairs) > 1 and hasattr(provider, "fetch_many"):
+        try:
+            return provider.fetch_many(pairs)
+        except Exception as e:
+            logger.warning(f"Holiday provider {provider.name} failed for {len(pairs)} pairs: {e}")
+            return {}
+
+    results = {}
+    for country_code, year in pairs:
+        try:
+            results[(country_code, year)] = provider.fetch(country_code, year)
+        except Exception as e:
+            logger.warning(f"Holiday provider {provider.name} failed for {country_code} {year}: {e}")
+    return results
+
+
+def fetch_many_public_holidays(pairs, providers=None) -> dict:
+    """
+    ``{(country_code, year): rows}`` for every pair. Each round asks every
+    still-empty pair's next provider, batched per provider, so pairs only
+    reach a later provider when the earlier ones had nothing or failed.
+    ``providers`` (names or instances) overrides the configured order.
+    """
+    results = {pair: [] for pair in pairs}
+    remaining = {pair: list(providers or providers_for(pair[0])) for pair in results}
+
+    pending = [pair for pair in results if remaining[pair]]
+    while pending:
+        batches = {}
+        for pair in pending:
+            batches.setdefault(remaining[pair].pop(0), []).append(pair)
+
+        for provider, batch in batches.items():
+            if isinstance(provider, str):
+                provider = get_provider(provider)
+            fetched = _fetch_batch(provider, batch)
+            for pair in batch:
+                if pair not in fetched:
+                    _record(provider.name, "errors")
+                elif fetched[pair]:
+                    _record(provider.name, "served")
+                    results[pair] = fetched[pair]
+                else:
+                    _record(provider.name, "empty")
+
+        pending = [pair for pair in pending if not results[pair] and remaining[pair]]
+
+    for country_code, year in (pair for pair, rows in results.items() if not rows):
+        logger.warning(f"No holiday provider had data for {country_code} {year}")
+    return results
+
+
+def fetch_public_holidays(country_code, year, providers=None) -> list:
+    """
+    Holidays of ``country_code`` in ``year`` from the first provider that
+    has any, or [].
+    """
+    return fetch_many_public_holidays([(country_code, year)], providers)[(country_code, year)]
@@ -0,0 +1,36 @@
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# One connection attempt. kombu's default policy (and even retry=False)
+# keeps a publish to an unreachable broker blocked for seconds.
+BOUNDED_RETRY_POLICY = {"max_retries": 0}
+# After a failed publish, bounded publishes skip the broker this long
+BROKER_DOWN_SECONDS = 30
+BROKER_DOWN_KEY = "tasks:broker-down"
+
+
+# -------------------BOUNDED PUBLISH ------------
+
+def publish_bounded(task, args=(), kwargs=None, **options) -> bool:
+    """
+    Queue ``task`` from a request path without waiting on the broker: one
+    connection attempt, and none at all for BROKER_DOWN_SECONDS after a
+    failure. Returns False when nothing was queued; the caller must have
+    a fallback (a periodic job, a later request).
+
+    Declare the task with ``ignore_result=True``, or the publish also
+    subscribes to the result backend and retries that for seconds.
+    """
+    if cache.get(BROKER_DOWN_KEY):
+        return False
+
+    try:
+        task.apply_async(args, kwargs, retry_policy=BOUNDED_RETRY_POLICY, **options)
+    except Exception as e:
+        cache.set(BROKER_DOWN_KEY, 1, timeout=BROKER_DOWN_SECONDS)
+        logger.error(f"Could not queue {task.name}: {e}")
+        return False
+    return True
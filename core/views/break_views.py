@@ -10,8 +10,7 @@ from django.core.paginator import Paginator
 from django.utils import timezone
 from django.utils.timezone import now
 from django.http import Http404
-from datetime import datetime, timedelta, time
-import random
+from datetime import datetime, time
 import traceback
 import logging
 from ..serializers.break_serializers import (
@@ -40,18 +39,14 @@ from ..models.break_models import BreakPlan, BreakSuggestion, LeaveBalance
 from ..serializers.break_serializers import BreakSuggestionSerializer, BreakPlanActionSerializer
 from ..models.score_models import BreakScore, StreakScore 
 from ..models.badge_models import Badge
-from ..models.mood_models import Mood
-from ..models.preference_models import BreakPreferences
-from ..models.working_pattern_models import WorkingPattern
-from ..models.date_models import BlackoutDate, SpecialDate
 from ..utils.responses import success_response, error_response
+from ..services.suggestion_service import SuggestionService, DEFAULT_SUGGESTION_COUNT
 
 logger = logging.getLogger(__name__)
 
 
 
 from ..serializers.break_serializers import BreakRecommendationSerializer
-from ..ml_engine.breaks_engine import generate_break_recommendation
 from core.services.break_action_service import BreakPlanService
 
 
@@ -432,126 +427,40 @@ class BreakSuggestionListCreateView(APIView):
             data=serializer.data
         )
     
+    @recommend_breaks_schema
     def post(self, request):
-        """Generate a break suggestion based on user data"""
+        """Generate ranked break suggestions based on user data"""
         try:
             user = request.user
-            
-            # Get user's mood, preferences, schedule, leave balance, blackout dates, special dates
-            # This would typically come from various models
-            leave_balance = LeaveBalance.objects.filter(user=user).first()
-            if not leave_balance:
+
+            # Balance, pattern, blackouts, special dates, holidays, metrics, mood
+            context = SuggestionService.load_context(user)
+
+            if context.leave_balance is None:
                 return error_response(
                     message="Cannot generate suggestion",
                     errors={"leave_balance": "User has no leave balance set up"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
-                
+
             # Check if user has enough leave balance
-            if leave_balance.anual_leave_balance <= 0:
+            if context.leave_balance <= 0:
                 return error_response(
                     message="Cannot generate suggestion",
                     errors={"leave_balance": "User has no leave days remaining"},
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Get user's break preferences
-            preferences = BreakPreferences.objects.filter(user=user).first()
-            
-            # Get user's working pattern
-            working_pattern = WorkingPattern.objects.filter(user=user).first()
-            
-            # Get blackout dates
-            blackout_dates = BlackoutDate.objects.filter(user=user)
-            
-            # Get special dates
-            special_dates = SpecialDate.objects.filter(user=user)
-            
-            # Get user's recent mood
-            recent_mood = Mood.objects.filter(user=user).order_by('-created_at').first()
-            
-            # Generate a suggestion based on collected data
-            # This is a simplified algorithm - in a real system, this would be more sophisticated
-            today = timezone.now().date()
-            
-            # Start with a date range in the next 30 days
-            start_date = today + timedelta(days=random.randint(7, 14))
-            end_date = start_date + timedelta(days=random.randint(1, 3))
-            
-            # Avoid weekends if working pattern exists
-            if working_pattern:
-                # Adjust to avoid weekends or non-working days based on pattern
-                while start_date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-                    start_date += timedelta(days=1)
-                while end_date.weekday() >= 5:
-                    end_date += timedelta(days=1)
-            
-            # Avoid blackout dates
-            for blackout in blackout_dates:
-                # Convert datetime to date if needed
-                blackout_start = blackout.start_date.date() if isinstance(blackout.start_date, datetime) else blackout.start_date
-                blackout_end = blackout.end_date.date() if isinstance(blackout.end_date, datetime) else blackout.end_date
-                
-                if (blackout_start <= start_date <= blackout_end) or \
-                   (blackout_start <= end_date <= blackout_end):
-                    # Move dates forward past the blackout period
-                    start_date = blackout_end + timedelta(days=1)
-                    end_date = start_date + timedelta(days=random.randint(1, 3))
-            
-            # Prioritize special dates if any are coming up
-            for special in special_dates:
-                # Convert datetime to date if needed
-                special_date = special.date.date() if isinstance(special.date, datetime) else special.date
-                
-                # If special date is within next 30 days, suggest a break around it
-                if today <= special_date <= today + timedelta(days=30):
-                    start_date = special_date - timedelta(days=1)
-                    end_date = special_date + timedelta(days=1)
-                    break
-            
-            # Generate title and description based on data
-            title = "Suggested Break"
-            description = "We recommend taking a break to recharge."
-            reason = "Based on your schedule and preferences"
-            
-            # Adjust based on mood if available
-            based_on_mood = False
-            if recent_mood:
-                based_on_mood = True
-                # Map mood_type to a numeric score since Mood model doesn't have mood_score
-                mood_scores = {
-                    "happy": 8,
-                    "sad": 3,
-                    "angry": 2,
-                    "neutral": 5,
-                    "excited": 9,
-                    "anxious": 3
-                }
-                mood_score = mood_scores.get(recent_mood.mood_type, 5)  # Default to 5 if unknown
-                
-                if mood_score < 5:  # Now using our mapped score
-                    title = "Wellness Break"
-                    description = "Your recent mood indicates you could benefit from some time off."
-                    reason = "Based on your recent mood tracking"
-            
-            # Create the suggestion
-            suggestion = BreakSuggestion.objects.create(
-                user=user,
-                title=title,
-                description=description,
-                start_date=start_date,
-                end_date=end_date,
-                reason=reason,
-                priority=10 if based_on_mood else 5,  # Using numeric values for priority
-                based_on_mood=based_on_mood,
-                based_on_workload=True,
-                based_on_preferences=preferences is not None,
-                based_on_weather=False  # Would require weather API integration
-            )
-            
-            serializer = BreakSuggestionSerializer(suggestion)
+
+            try:
+                limit = max(1, min(int(request.query_params.get('limit', DEFAULT_SUGGESTION_COUNT)), 10))
+            except ValueError:
+                limit = DEFAULT_SUGGESTION_COUNT
+
+            suggestions = SuggestionService.generate(user, limit=limit, context=context)
+
+            serializer = BreakSuggestionSerializer(suggestions, many=True)
             return success_response(
-                message="Break suggestion generated successfully",
+                message="Break suggestions generated successfully",
                 data=serializer.data,
                 status_code=status.HTTP_201_CREATED
             )
@@ -6,15 +6,14 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.utils import timezone
 from django.utils.timezone import now
-from ..serializers.holiday_serializers import PublicHolidaySerializer
-from ..models.holiday_models import PublicHoliday, PublicHolidayCalendar
+from ..serializers.holiday_serializers import HolidaySerializer
+from ..models.holiday_models import PublicHolidayCalendar
+from ..services.holiday_service import HolidayService
 from ..docs.holiday_docs import (
     holiday_detail_get,
     # holiday_detail_post,
 )
-from ..utils.calendar_utils import fetch_public_holidays
 from ..utils.responses import success_response, error_response
-from ..tasks.holiday_tasks import sync_user_holidays
 
 
 # class HolidayView(APIView):
@@ -262,8 +261,8 @@ class HolidayView(APIView):
             calendar.country_code = country_code
             calendar.save(update_fields=["country_code", "updated_at"])
 
-        holidays = calendar.holidays.all().order_by("date")
-        serializer = PublicHolidaySerializer(holidays, many=True)
+        holidays = HolidayService.for_calendar(calendar)
+        serializer = HolidaySerializer(holidays, many=True)
 
         return success_response(
             message="Fetched holidays successfully",
@@ -287,14 +286,13 @@ class HolidayView(APIView):
         calendar.is_enabled = True
         calendar.save(update_fields=["country_code", "is_enabled", "updated_at"])
 
-        # Queue the sync task
-        task = sync_user_holidays.delay(user.id, country_code)
+        # Queued once the save commits, folded into any pending sync
+        HolidayService.schedule_user_sync(user.id)
 
         return success_response(
             message="Holiday calendar updated successfully",
             data={
                 "country_code": country_code,
-                "task_id": task.id,
             },
             status_code=status.HTTP_200_OK
         )
@@ -316,8 +314,8 @@ class UpcomingHolidaysView(APIView):
             )
 
         today = now().date()
-        holidays = calendar.holidays.filter(date__gte=today).order_by("date")
-        serializer = PublicHolidaySerializer(holidays, many=True)
+        holidays = HolidayService.for_calendar(calendar, start=today)
+        serializer = HolidaySerializer(holidays, many=True)
 
         return success_response(
             message="Fetched upcoming holidays successfully",
@@ -339,23 +337,18 @@ class FetchPublicHolidaysView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Served from the shared store; a missing or stale year is fetched
+        # in the background instead of on this request
         year = timezone.now().year
-        holidays_data = fetch_public_holidays(country_code, year)
-
-        for holiday in holidays_data:
-            PublicHoliday.objects.update_or_create(
-                user=user,
-                date=holiday["date"],
-                defaults={
-                    "name": holiday["name"],
-                    "country_code": country_code
-                }
-            )
+        syncing = HolidayService.schedule_country_sync(country_code, [year])
+        holidays = HolidayService.country_holidays(country_code, year)
 
         return Response(
             {
                 "success": True,
-                "country_code": country_code
+                "country_code": country_code,
+                "holidays": HolidaySerializer(holidays, many=True).data,
+                "syncing": bool(syncing),
             },
             status=status.HTTP_200_OK
         )
@@ -366,7 +359,7 @@ class ListPublicHolidaysView(APIView):
         if not request.user.is_authenticated:
             return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        holidays = PublicHoliday.objects.filter(user=request.user)
-        serializer = PublicHolidaySerializer(holidays, many=True)
+        holidays = HolidayService.for_user(request.user)
+        serializer = HolidaySerializer(holidays, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
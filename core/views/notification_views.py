@@ -2,19 +2,57 @@
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from ..models.notification_models import Notification
-from ..services.notification_service import NotificationCRUDService
-from ..serializers.notification_serializers import NotificationSerializer
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from ..services.notification_service import (
+    NotificationCRUDService,
+    NotificationService,
+    NOTIFICATION_PAGE_SIZE,
+)
+from ..services.recipient_cache import recipient_cache_stats
+from ..serializers.notification_serializers import (
+    NotificationSerializer,
+    NotificationListSerializer,
+)
 
 
 class NotificationListAPIView(APIView):
+    """Notification feed, newest first. Pass ``next_cursor`` back as ``?cursor=``."""
     permission_classes = [IsAuthenticated]
-    pass
 
     def get(self, request):
-        qs = NotificationCRUDService.list_for_user(request.user)
-        return Response(NotificationSerializer(qs, many=True).data)
+        try:
+            limit = int(request.query_params.get("limit", NOTIFICATION_PAGE_SIZE))
+        except ValueError:
+            return self._invalid("limit", "Must be an integer")
+
+        try:
+            rows, next_cursor = NotificationCRUDService.page_for_user(
+                request.user,
+                cursor=request.query_params.get("cursor"),
+                limit=limit,
+                fields=NotificationListSerializer.Meta.fields,
+            )
+        except ValueError:
+            return self._invalid("cursor", "Must be a next_cursor value from a previous page")
+
+        return Response({
+            "message": "Notifications",
+            "status": True,
+            "data": {
+                "results": NotificationListSerializer(rows, many=True).data,
+                "next_cursor": next_cursor,
+            },
+            "errors": None,
+        })
+
+    @staticmethod
+    def _invalid(field, error):
+        return Response({
+            "message": f"Invalid {field}",
+            "status": False,
+            "data": None,
+            "errors": {field: [error]},
+        }, status=400)
 
 
 class NotificationDetailAPIView(APIView):
@@ -48,11 +86,7 @@ class UnreadNotificationCountAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(
-            user=request.user,
-            channel="system",
-            is_read=False,
-        ).count()
+        count = NotificationCRUDService.unread_count(request.user)
 
         return Response({
             "message": "Unread notifications count",
@@ -60,3 +94,19 @@ class UnreadNotificationCountAPIView(APIView):
             "data": {"unread_count": count},
             "errors": None,
         })
+
+
+class NotificationOutboxStatsAPIView(APIView):
+    """Outbox queue depth and delivery latency (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "message": "Notification outbox stats",
+            "status": True,
+            "data": {
+                **NotificationService.outbox_stats(),
+                "recipient_cache": recipient_cache_stats(),
+            },
+            "errors": None,
+        })
@@ -1,4 +1,3 @@
-from datetime import date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
@@ -16,7 +15,6 @@ from ..models.recommendation_models import UserMetrics, BreakRecommendation
 from ..serializers.recommendation_serializers import UserMetricsSerializer, BreakRecommendationSerializer
 from ..services.recommendation_service import RecommendationService
 from ..services.user_metrics_service import UserMetricsService
-from ..ml_engine.breaks_engine import generate_break_recommendation
 
 
 class UserMetricsView(APIView):
@@ -44,7 +42,11 @@ class UserMetricsView(APIView):
 
 
     def post(self, request):
-        metrics = UserMetricsService.build(request.user)
+        """Refresh user metrics (rebuilt only if stale, or with ?force=true)"""
+        if request.query_params.get('force', 'false').lower() == 'true':
+            metrics = UserMetricsService.build(request.user)
+        else:
+            metrics = UserMetricsService.get_fresh(request.user)
         serializer = UserMetricsSerializer(metrics)
         return Response(serializer.data, status=200)
 
@@ -67,27 +69,8 @@ class BreakRecommendationView(APIView):
         # Check if force parameter is provided
         force_new = request.query_params.get('force', 'false').lower() == 'true'
 
-        if force_new:
-            # If force is true, bypass the recent recommendation check in the service
-            try:
-                user_metrics = UserMetrics.objects.get(user=request.user)
-                user_input = RecommendationService.get_user_input_dict(user_metrics)
-                recommendation_data = generate_break_recommendation(user_input)
-
-                recommendation = BreakRecommendation.objects.create(
-                    user=request.user,
-                    recommended_start_date=date.fromisoformat(recommendation_data['recommended_start_date']),
-                    recommended_end_date=date.fromisoformat(recommendation_data['recommended_end_date']),
-                    predicted_length_days=recommendation_data['predicted_length_days'],
-                    recommended_season=recommendation_data['recommended_season'],
-                    message=recommendation_data['message']
-                )
-            except Exception as e:
-                return Response({"detail": f"Failed to generate recommendation: {str(e)}"},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        else:
-            # Use the service which includes the recent recommendation check
-            recommendation = RecommendationService.generate_recommendation(request.user)
+        # Without force, a recommendation from the last 7 days is returned
+        recommendation = RecommendationService.generate_recommendation(request.user, force=force_new)
 
         if recommendation:
             serializer = BreakRecommendationSerializer(recommendation)
@@ -18,7 +18,7 @@ from ..models.break_models import BreakPlan
 from dateutil.parser import isoparse as date_parser
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.tokens import default_token_generator
-from core.tasks.holiday_tasks import sync_user_holidays
+from core.services.holiday_service import HolidayService
 from django.utils import timezone
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
@@ -760,12 +760,8 @@ class UpdateProfileView(APIView):
                     calendar.last_synced = timezone.now()
                     calendar.save(update_fields=["country_code", "last_synced"])
 
-                    # Trigger Celery sync
-                    try:
-                        sync_user_holidays.delay(str(updated_user.id), calendar.country_code)
-                    except Exception:
-                        # don't fail the whole request if task scheduling fails
-                        pass
+                    # Debounced with the sync the user's post_save already asked for
+                    HolidayService.schedule_user_sync(updated_user.id)
 
             return success_response(
                 message="Profile updated successfully",
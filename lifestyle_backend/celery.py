@@ -11,7 +11,7 @@ app.autodiscover_tasks()
 # Celery Beat schedule
 app.conf.beat_schedule = {
     "refresh-holidays-every-month": {
-        "task": "core.tasks.refresh_all_user_holidays",
+        "task": "core.tasks.holiday_tasks.refresh_all_user_holidays",
         "schedule": crontab(day_of_month=1, hour=0, minute=0),  # every 1st day of month
     },
     "generate-recommendations-weekly": {
@@ -36,9 +36,21 @@ app.conf.beat_schedule = {
         "task": "core.tasks.optimization_tasks.recalculate_daily_optimization",
         "schedule": crontab(hour=3, minute=0),
     },
-    "break-reminders-every-5-mins": {
-        "task": "core.tasks.notification_tasks.send_break_reminders",
-        "schedule": 300,
+    "queue-due-break-reminders": {
+        "task": "core.tasks.break_reminder_tasks.queue_due_break_reminders",
+        "schedule": 300,  # well inside REMINDER_QUEUE_AHEAD
+    },
+    "deliver-notification-outbox": {
+        "task": "core.tasks.notification_tasks.deliver_pending_notifications",
+        "schedule": 60,  # safety net; commits also kick delivery
+    },
+    "reconcile-unread-notification-counters": {
+        "task": "core.tasks.notification_tasks.reconcile_unread_counters",
+        "schedule": crontab(hour=4, minute=30),
+    },
+    "prune-notifications-daily": {
+        "task": "core.tasks.notification_tasks.prune_notifications",
+        "schedule": crontab(hour=3, minute=30),
     },
     "send-weekly-digest": {
         "task": "core.tasks.notification_tasks.send_weekly_digest",
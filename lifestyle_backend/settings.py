@@ -330,6 +330,74 @@ EMAIL_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "True") == "True"
 EMAIL_USE_TLS=False
 EMAIL_TIMEOUT = 30
+# Pooled SMTP connections (core.utils.email_utils.SMTPConnectionPool)
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 4))
+EMAIL_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("EMAIL_MAX_MESSAGES_PER_CONNECTION", 100))
+EMAIL_CONNECTION_MAX_IDLE = int(os.getenv("EMAIL_CONNECTION_MAX_IDLE", 60))
+
+
+#### PUSH NOTIFICATIONS ####
+# Service-account JSON for firebase-admin; pushes are only logged when unset
+FIREBASE_CREDENTIALS_PATH = os.getenv("FIREBASE_CREDENTIALS_PATH")
+# Optional dotted path overriding the push transport (e.g. a fake for load tests)
+PUSH_TRANSPORT = os.getenv("PUSH_TRANSPORT")
+
+
+#### NOTIFICATION RECIPIENT CACHE ####
+# Preferences / device tokens read during delivery. The local tier is
+# per process; set a cache alias (e.g. a Redis-backed one) to share hits.
+NOTIFICATION_CACHE_LOCAL_TTL = int(os.getenv("NOTIFICATION_CACHE_LOCAL_TTL", 30))
+NOTIFICATION_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("NOTIFICATION_CACHE_LOCAL_MAX_ENTRIES", 10000))
+NOTIFICATION_CACHE_SHARED_ALIAS = os.getenv("NOTIFICATION_CACHE_SHARED_ALIAS") or None
+NOTIFICATION_CACHE_SHARED_TTL = int(os.getenv("NOTIFICATION_CACHE_SHARED_TTL", 300))
+
+
+#### NOTIFICATION RETENTION ####
+# Per event type: days kept once read / regardless of read state, and whether
+# pruned rows are copied to the archive table or just deleted. Events not
+# listed use "default".
+NOTIFICATION_RETENTION = {
+    "default": {"read_days": 30, "max_days": 180, "archive": True},
+    "break_reminder": {"read_days": 7, "max_days": 30, "archive": False},
+    "weekly_digest": {"read_days": 14, "max_days": 60, "archive": False},
+}
+NOTIFICATION_RETENTION_CHUNK_SIZE = int(os.getenv("NOTIFICATION_RETENTION_CHUNK_SIZE", 1000))
+# Pause between chunks so pruning doesn't starve the hot table
+NOTIFICATION_RETENTION_PAUSE_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_PAUSE_SECONDS", 0.2))
+
+
+#### HOLIDAYS ####
+# In-process cache of each (country, year) holiday list
+HOLIDAY_CACHE_TTL_SECONDS = int(os.getenv("HOLIDAY_CACHE_TTL_SECONDS", 3600))
+# A user's calendar sync runs this long after their country / timezone
+# changes; further changes until then share the same run
+HOLIDAY_SYNC_DEBOUNCE_SECONDS = int(os.getenv("HOLIDAY_SYNC_DEBOUNCE_SECONDS", 30))
+# Holiday sources tried in order until one has data: "library" generates
+# them locally with the holidays package (national holidays, no network),
+# "nager" calls date.nager.at. Per-country order in the overrides, e.g.
+# {"XK": ["nager"]}.
+HOLIDAY_PROVIDERS = [p for p in os.getenv("HOLIDAY_PROVIDERS", "library,nager").split(",") if p]
+HOLIDAY_PROVIDER_OVERRIDES = {}
+# Holiday API client: pooled session, on-disk HTTP cache with conditional
+# revalidation, retries with backoff on connection errors / 429 / 5xx
+HOLIDAY_API_BASE_URL = os.getenv("HOLIDAY_API_BASE_URL", "https://date.nager.at/api/v3")
+HOLIDAY_API_TIMEOUT = (
+    float(os.getenv("HOLIDAY_API_CONNECT_TIMEOUT", 3.05)),
+    float(os.getenv("HOLIDAY_API_READ_TIMEOUT", 10)),
+)
+HOLIDAY_API_RETRIES = int(os.getenv("HOLIDAY_API_RETRIES", 3))
+HOLIDAY_API_BACKOFF = float(os.getenv("HOLIDAY_API_BACKOFF", 0.5))
+HOLIDAY_API_POOL_SIZE = int(os.getenv("HOLIDAY_API_POOL_SIZE", 10))
+# Requests in flight when a refresh fetches many (country, year) pairs at once
+HOLIDAY_API_CONCURRENCY = int(os.getenv("HOLIDAY_API_CONCURRENCY", 10))
+HOLIDAY_API_CACHE_DIR = os.getenv("HOLIDAY_API_CACHE_DIR", str(BASE_DIR / ".cache" / "holiday_api"))
+# Freshness for responses that carry no caching headers of their own
+HOLIDAY_API_CACHE_SECONDS = int(os.getenv("HOLIDAY_API_CACHE_SECONDS", 24 * 3600))
+
+
+#### USER METRICS ####
+# Metrics older than this are rebuilt on the next read
+USER_METRICS_TTL_SECONDS = int(os.getenv("USER_METRICS_TTL_SECONDS", 24 * 3600))
 
 
 #### CELERY CONFIGURATION ####
@@ -339,6 +407,12 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+# Outbox delivery can be given dedicated workers: celery worker -Q notifications
+CELERY_TASK_ROUTES = {
+    "core.tasks.notification_tasks.deliver_pending_notifications": {
+        "queue": os.getenv("NOTIFICATION_QUEUE", "celery"),
+    },
+}
 
 
 SOCIALACCOUNT_APPLE_CLIENT_ID="your_apple_service_id" # e.g.com.betterbreaks.app.web-"signin"